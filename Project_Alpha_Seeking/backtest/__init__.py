@@ -0,0 +1,17 @@
+"""
+回测工具模块
+
+fast_engine 提供信号驱动的快速回测内核，parity 用于与 backtrader 结果逐笔对账，
+metrics 对成批资金曲线向量化计算绩效指标，robustness 做蒙特卡洛 / 自助法稳健性分析，
+result_store 把每次回测的参数、数据指纹与指标存入可索引、可续跑的 SQLite 结果库，
+checkpoint 保存回测断点，每日只需处理新增的 bar；
+replay 按分区流式回放长历史，峰值内存与历史长度无关。
+"""
+
+from .fast_engine import run_signals
+from .signals import buy_and_hold_signals, mtf_vwap_channel_signals, vwap_channel_signals
+from .metrics import PerformanceAnalyzer, performance_metrics, fast_results_metrics
+from .robustness import robustness_report
+from .result_store import ResultStore, resumable_sweep
+from .checkpoint import run_incremental
+from .replay import run_replay
@@ -0,0 +1,176 @@
+"""
+回测断点续跑。
+
+每日只新增一根 bar 时，不必从头重跑整段历史：上一次运行结束时把账户资金、持仓、
+未平仓交易、最后一根 bar 上发出的订单、指标内部状态和市值历史保存为断点，
+下一次只把断点之后新增的 bar 喂给 backtrader，并在 start() 中先恢复断点，
+结果与完整重跑逐位一致，耗时只与新增 bar 数有关。
+
+用法（在 Project_Alpha_Seeking 目录下）：
+    strat = run_incremental(data, VWAPChannelStrategy, "checkpoints/600519.pkl",
+                            cash=100000, commission=0.001)
+    strat.value_history_values   # 全部历史的账户市值
+"""
+
+import contextlib
+import io
+import os
+
+import backtrader as bt
+import pandas as pd
+
+from data_processing.cache import atomic_to_pickle
+
+from .feeds import pandas_feed
+from .parity import strategy_params
+from .result_store import param_hash
+
+
+CHECKPOINT_VERSION = 3
+
+
+def capture(strategy) -> dict:
+    """在回测结束后提取断点：策略状态 + 账户资金、持仓与未平仓交易"""
+    data = strategy.datas[0]
+    position = strategy.broker.getposition(data)
+    trades = strategy._trades[data][0]
+    trade = trades[-1] if trades and trades[-1].isopen else None
+    return {
+        "version": CHECKPOINT_VERSION,
+        "last_dt": bt.num2date(data.datetime[0]),
+        "strategy": strategy.get_state(),
+        "broker": {
+            "cash": strategy.broker.getcash(),
+            "startingcash": strategy.broker.startingcash,
+            "position_size": position.size,
+            "position_price": position.price,
+        },
+        "trade": None if trade is None else {
+            "size": trade.size,
+            "price": trade.price,
+            "value": trade.value,
+            "commission": trade.commission,
+            "dtopen": trade.dtopen,
+            "long": trade.long,
+        },
+    }
+
+
+def restore(strategy, checkpoint: dict) -> None:
+    """在 strategy.start() 中调用：broker 已初始化、尚未处理任何 bar"""
+    data = strategy.datas[0]
+    broker = strategy.broker
+    state = checkpoint["broker"]
+    broker.cash = state["cash"]
+    broker.startingcash = state["startingcash"]
+    broker.positions[data] = bt.Position(size=state["position_size"], price=state["position_price"])
+
+    saved = checkpoint["trade"]
+    if saved is not None:
+        trade = bt.Trade(data=data, tradeid=0, historyon=strategy._tradehistoryon,
+                         size=saved["size"], price=saved["price"],
+                         value=saved["value"], commission=saved["commission"])
+        trade.isopen = True
+        trade.status = bt.Trade.Open
+        trade.dtopen = saved["dtopen"]
+        trade.long = saved["long"]
+        strategy._trades[data][0].append(trade)
+
+    strategy.set_state(checkpoint["strategy"])
+
+
+def _resuming(strategy_cls, checkpoint: dict):
+    """生成在 start() 中先恢复断点的策略子类"""
+    def start(self):
+        restore(self, checkpoint)
+        strategy_cls.start(self)
+
+    return type(strategy_cls.__name__, (strategy_cls,), {
+        "start": start,
+        "restored_fast_periods": checkpoint["strategy"]["fast_periods"],
+    })
+
+
+def save_checkpoint(checkpoint: dict, path: str) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    atomic_to_pickle(checkpoint, path)
+
+
+def load_checkpoint(path: str):
+    """读取断点，文件不存在时返回 None"""
+    if not os.path.exists(path):
+        return None
+    return pd.read_pickle(path)
+
+
+def run_incremental(data: pd.DataFrame, strategy_cls, checkpoint_path: str, cash: float = 10000.0, commission: float = 0.0, quiet: bool = True, **params):
+    """
+    从断点续跑策略：只处理断点之后新增的 bar，结束后更新断点。没有断点时从头运行。
+    策略中有指标未实现 get_state / set_state 时不保存断点，每次都完整重跑。
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        完整行情（index 为时间），通常就是加载器返回的、追加了新 bar 的数据
+    strategy_cls : class
+        BaseStrategy 子类
+    checkpoint_path : str
+        断点文件路径
+    cash : float
+        初始资金，只在首次运行时生效
+    commission : float
+        手续费率
+    quiet : bool
+        是否屏蔽策略逐 bar 日志
+    params :
+        策略参数，须与断点保存时一致
+
+    Returns:
+    --------
+    strategy
+        运行结束的策略实例；没有新 bar 时返回 None
+    """
+    # 只保存参数与手续费的哈希：参数可能含 DataFrame（如 MTF 策略的 slow_data），
+    # 直接比较会报错，整份数据写入每个断点也没有必要
+    settings = param_hash(strategy_params(strategy_cls, **params), {"commission": float(commission)})
+    checkpoint = load_checkpoint(checkpoint_path)
+    if checkpoint is not None:
+        if checkpoint.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"断点版本不兼容: {checkpoint.get('version')}")
+        if checkpoint["settings"] != settings:
+            raise ValueError(f"断点的策略参数或手续费与本次运行不一致（参数哈希 {checkpoint['settings'][:12]} != {settings[:12]}）")
+        if any(state is None for state in checkpoint["strategy"]["indicators"]):
+            # 旧版本会把无法保存状态的指标记为 None，从这种断点续跑结果不可信
+            print(f"断点 {checkpoint_path} 缺少部分指标状态，完整重跑")
+            checkpoint = None
+    if checkpoint is not None:
+        data = data[data.index > pd.Timestamp(checkpoint["last_dt"])]
+        if data.empty:
+            print(f"没有 {checkpoint['last_dt']} 之后的新数据，跳过")
+            return None
+        strategy_cls = _resuming(strategy_cls, checkpoint)
+
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.adddata(pandas_feed(data))
+    cerebro.broker.setcash(cash)
+    cerebro.broker.setcommission(commission=commission)
+    cerebro.addstrategy(strategy_cls, **params)
+
+    with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+        strat = cerebro.run()[0]
+
+    stateless = strat.stateless_indicators()
+    if stateless:
+        # 这些指标的内部状态无法保存，不写断点，下次运行仍完整重跑
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        print(f"{stateless} 未实现 get_state / set_state，不保存断点，每次完整重跑")
+        return strat
+
+    new_checkpoint = capture(strat)
+    new_checkpoint["last_dt"] = data.index[-1]
+    new_checkpoint["settings"] = settings
+    save_checkpoint(new_checkpoint, checkpoint_path)
+    return strat
@@ -0,0 +1,120 @@
+"""
+信号驱动的快速回测内核。
+
+适用于"只做多、满仓进出、市价单"类策略（BuyAndHoldStrategy、VWAPChannelStrategy 等）：
+输入预先计算好的买入/卖出信号数组，按 backtrader 默认撮合规则复现结果——
+信号 bar 收盘后下单，下一根 bar 开盘价成交，按 BaseStrategy.buy_with_sizing 的
+target_percent 计算下单数量，按成交额百分比收取手续费。
+
+只在信号出现的 bar 上做 Python 循环，资金与持仓曲线整体向量化计算，
+适合参数扫描；最终结果仍建议用 backtrader 复核（见 backtest.parity）。
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def run_signals(
+    open_,
+    close,
+    entries,
+    exits,
+    cash: float = 10000.0,
+    target_percent: float = 0.95,
+    commission: float = 0.0,
+) -> dict:
+    """
+    按信号数组运行一次回测。
+
+    Parameters:
+    -----------
+    open_, close : array-like
+        开盘价、收盘价
+    entries, exits : array-like of bool
+        第 i 根 bar 收盘时的买入 / 卖出信号（空仓时只看买入，持仓时只看卖出）
+    cash : float
+        初始资金，与 cerebro.broker.setcash 一致（backtrader 默认 10000）
+    target_percent : float
+        买入时使用的账户市值比例，与 BaseStrategy.buy_with_sizing 一致
+    commission : float
+        手续费率，与 cerebro.broker.setcommission(commission=...) 一致
+
+    Returns:
+    --------
+    dict
+        equity : np.ndarray，每根 bar 收盘后的账户市值（对应 value_history_values）
+        trades : pd.DataFrame，成交记录，列为 bar / size / price / commission
+        positions : np.ndarray，每根 bar 收盘时的持仓数量
+        final_value : float，最终市值
+        cash : float，最终现金
+        position : int，最终持仓
+    """
+    open_ = np.asarray(open_, dtype=float)
+    close = np.asarray(close, dtype=float)
+    entries = np.asarray(entries, dtype=bool)
+    exits = np.asarray(exits, dtype=bool)
+    n = len(close)
+
+    initial_cash = cash
+    position = 0
+    entry_price = 0.0
+    fills = []  # (bar, size, price, commission, 成交后现金)
+
+    # 只遍历有信号的 bar；最后一根 bar 上的订单没有下一根开盘价可成交
+    for i in np.flatnonzero(entries | exits):
+        if i >= n - 1:
+            break
+        fill_price = open_[i + 1]
+        if position == 0 and entries[i]:
+            value = cash
+            size = max(1, int((value * target_percent) / close[i]))
+            # 提交检查：按信号 bar 收盘价预估，现金不足则订单被拒（Margin）
+            check = cash - size * close[i]
+            check -= size * commission * close[i]
+            if check < 0.0:
+                continue
+            # 成交：按下一根开盘价扣除成交额与手续费，现金不足同样被拒
+            new_cash = cash - size * fill_price
+            comm = size * commission * fill_price
+            new_cash -= comm
+            if new_cash < 0.0:
+                continue
+            cash = new_cash
+            position = size
+            entry_price = fill_price
+            fills.append((i + 1, size, fill_price, comm, cash))
+        elif position > 0 and exits[i]:
+            closed_value = position * entry_price
+            pnl = position * (fill_price - entry_price) * 1.0
+            cash += closed_value + pnl
+            comm = position * commission * fill_price
+            cash -= comm
+            fills.append((i + 1, -position, fill_price, comm, cash))
+            position = 0
+
+    # 按成交点把现金和持仓展开成逐 bar 序列（成交发生在 bar 开盘，当根收盘即反映）
+    trades = pd.DataFrame(fills, columns=["bar", "size", "price", "commission", "cash"])
+    cash_path = np.full(n, float(initial_cash))
+    pos_path = np.zeros(n)
+    cost_path = np.zeros(n)
+    if fills:
+        seg = np.searchsorted(trades["bar"].to_numpy(), np.arange(n), side="right") - 1
+        filled = seg >= 0
+        cash_path[filled] = trades["cash"].to_numpy()[seg[filled]]
+        pos_path[filled] = np.cumsum(trades["size"].to_numpy())[seg[filled]]
+        cost_path[filled] = trades["price"].to_numpy()[seg[filled]]
+
+    # 与 BackBroker._get_value 相同的运算顺序：市值 - 浮盈 + 浮盈，保证逐位一致
+    market_value = pos_path * close
+    unrealized = pos_path * (close - cost_path) * 1.0
+    position_value = np.where(pos_path > 0, (0.0 + (market_value - unrealized) / 1.0) + unrealized, 0.0)
+    equity = cash_path + position_value
+
+    return {
+        "equity": equity,
+        "trades": trades.drop(columns="cash"),
+        "positions": pos_path,
+        "final_value": float(equity[-1]) if n else cash,
+        "cash": cash,
+        "position": position,
+    }
@@ -0,0 +1,22 @@
+"""
+backtrader 数据源。
+
+逐笔成交聚合出的K线（data_processing.trades）额外带有每根 bar 的精确成交额 notional，
+PandasData 只认 OHLCV，这里增加一条 notional 线供 VWAP(use_notional=True) 使用。
+"""
+
+import backtrader as bt
+import pandas as pd
+
+
+class PandasNotionalData(bt.feeds.PandasData):
+    """在 PandasData 基础上增加 notional 线，-1 表示按列名自动识别"""
+    lines = ("notional",)
+    params = (("notional", -1),)
+
+
+def pandas_feed(data: pd.DataFrame):
+    """数据带 notional 列时使用 PandasNotionalData，否则使用普通 PandasData"""
+    if "notional" in data.columns:
+        return PandasNotionalData(dataname=data)
+    return bt.feeds.PandasData(dataname=data)
@@ -0,0 +1,204 @@
+"""
+向量化绩效指标。
+
+performance_metrics 对 (runs × bars) 的资金曲线矩阵一次性计算全部指标，
+每个指标都是沿 bar 维度的 NumPy 归约，适合参数扫描 / 全市场回测的成千上万次结果；
+PerformanceAnalyzer 把同一套计算包装成 backtrader Analyzer，单次回测也可直接使用。
+"""
+
+import backtrader as bt
+import numpy as np
+import pandas as pd
+
+
+METRIC_NAMES = (
+    "total_return", "cagr", "annual_volatility", "sharpe", "sortino",
+    "max_drawdown", "max_drawdown_duration", "calmar",
+    "exposure", "turnover", "win_rate",
+)
+
+
+def _as_matrix(values) -> np.ndarray:
+    arr = np.asarray(values, dtype=float)
+    return arr[np.newaxis, :] if arr.ndim == 1 else arr
+
+
+def drawdown(equity) -> np.ndarray:
+    """逐 bar 回撤（非正数），形状与输入相同"""
+    equity = _as_matrix(equity)
+    peak = np.maximum.accumulate(equity, axis=1)
+    return equity / peak - 1.0
+
+
+def max_drawdown_duration(equity) -> np.ndarray:
+    """每条曲线最长的水下持续 bar 数（从前高到重新创新高）"""
+    equity = _as_matrix(equity)
+    peak = np.maximum.accumulate(equity, axis=1)
+    bars = np.arange(equity.shape[1])
+    # 每个位置最近一次处于新高的 bar 序号
+    last_peak = np.maximum.accumulate(np.where(equity >= peak, bars, 0), axis=1)
+    return (bars - last_peak).max(axis=1)
+
+
+def round_trip_returns(trades: pd.DataFrame) -> np.ndarray:
+    """
+    把 run_signals 的成交记录配对成一买一卖的完整交易，返回每笔交易扣费后的收益率。
+    未平仓的最后一笔买入不计入。
+    """
+    size = trades["size"].to_numpy()
+    notional = np.abs(size) * trades["price"].to_numpy()
+    comm = trades["commission"].to_numpy()
+    buys = np.flatnonzero(size > 0)
+    sells = np.flatnonzero(size < 0)
+    buys = buys[:len(sells)]
+    cost = notional[buys] + comm[buys]
+    proceeds = notional[sells] - comm[sells]
+    return proceeds / cost - 1.0
+
+
+def performance_metrics(
+    equity,
+    weights=None,
+    trade_returns=None,
+    periods_per_year: int = 252,
+    risk_free: float = 0.0,
+) -> dict:
+    """
+    一次性计算多条资金曲线的绩效指标。
+
+    Parameters:
+    -----------
+    equity : array-like
+        资金曲线，形状 (runs, bars)；一维数组视为单条曲线
+    weights : array-like
+        每根 bar 的持仓市值占账户市值的比例，形状同 equity；
+        用于计算 exposure（持仓时间占比）与 turnover（年化双边换手率），不提供时为 NaN
+    trade_returns : array-like
+        每条曲线的逐笔交易收益率，形状 (runs, max_trades)，不足处用 NaN 填充；
+        用于计算 win_rate，不提供时为 NaN
+    periods_per_year : int
+        每年的 bar 数，日线 252，A股 30 分钟线 252 * 8
+    risk_free : float
+        年化无风险利率
+
+    Returns:
+    --------
+    dict
+        指标名 -> 长度为 runs 的 np.ndarray，指标名见 METRIC_NAMES；
+        max_drawdown 为正数表示的最大回撤幅度
+    """
+    equity = _as_matrix(equity)
+    runs, bars = equity.shape
+    years = max(bars - 1, 1) / periods_per_year
+
+    returns = equity[:, 1:] / equity[:, :-1] - 1.0
+    excess = returns - risk_free / periods_per_year
+    ann = np.sqrt(periods_per_year)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        total_return = equity[:, -1] / equity[:, 0] - 1.0
+        cagr = np.power(equity[:, -1] / equity[:, 0], 1.0 / years) - 1.0
+        vol = returns.std(axis=1, ddof=1) if bars > 2 else np.full(runs, np.nan)
+        sharpe = excess.mean(axis=1) / vol * ann
+        downside = np.sqrt(np.mean(np.minimum(excess, 0.0) ** 2, axis=1))
+        sortino = excess.mean(axis=1) / downside * ann
+        mdd = -drawdown(equity).min(axis=1)
+        calmar = cagr / mdd
+
+    if weights is not None:
+        weights = _as_matrix(weights)
+        exposure = np.mean(weights != 0, axis=1)
+        turnover = np.abs(np.diff(weights, axis=1)).sum(axis=1) / years
+    else:
+        exposure = turnover = np.full(runs, np.nan)
+
+    if trade_returns is not None:
+        trade_returns = _as_matrix(trade_returns)
+        counts = np.sum(~np.isnan(trade_returns), axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            win_rate = np.sum(trade_returns > 0, axis=1) / counts
+    else:
+        win_rate = np.full(runs, np.nan)
+
+    return {
+        "total_return": total_return,
+        "cagr": cagr,
+        "annual_volatility": vol * ann,
+        "sharpe": sharpe,
+        "sortino": sortino,
+        "max_drawdown": mdd,
+        "max_drawdown_duration": max_drawdown_duration(equity),
+        "calmar": calmar,
+        "exposure": exposure,
+        "turnover": turnover,
+        "win_rate": win_rate,
+    }
+
+
+def fast_results_metrics(results: list, close, periods_per_year: int = 252, risk_free: float = 0.0) -> dict:
+    """
+    对同一份行情上多次 run_signals 的结果批量计算指标：
+    资金曲线堆叠为 (runs × bars) 矩阵，持仓比例由 positions × close / equity 得到，
+    逐笔收益率按最长交易数用 NaN 补齐。
+    """
+    close = np.asarray(close, dtype=float)
+    equity = np.vstack([r["equity"] for r in results])
+    weights = np.vstack([r["positions"] for r in results]) * close / equity
+    per_run = [round_trip_returns(r["trades"]) for r in results]
+    width = max(1, max(len(x) for x in per_run))
+    trade_returns = np.full((len(results), width), np.nan)
+    for row, x in enumerate(per_run):
+        trade_returns[row, :len(x)] = x
+    return performance_metrics(equity, weights, trade_returns, periods_per_year, risk_free)
+
+
+def metrics_frame(metrics: dict, index=None) -> pd.DataFrame:
+    """把 performance_metrics 的结果整理成每行一次回测的 DataFrame"""
+    return pd.DataFrame(metrics, index=index)
+
+
+class PerformanceAnalyzer(bt.Analyzer):
+    """
+    backtrader 绩效分析器：逐 bar 记录账户市值与持仓比例，回测结束后调用
+    performance_metrics 计算与批量版本完全相同的指标。
+
+    用法：
+        cerebro.addanalyzer(PerformanceAnalyzer, _name="perf", periods_per_year=252)
+        strat.analyzers.perf.get_analysis()
+    """
+    params = (
+        ("periods_per_year", 252),
+        ("risk_free", 0.0),
+    )
+
+    def start(self):
+        self.values = []
+        self.weights = []
+        self.trade_returns = []
+        self._open_value = {}
+
+    def next(self):
+        value = self.strategy.broker.getvalue()
+        position_value = self.strategy.position.size * self.data.close[0]
+        self.values.append(value)
+        self.weights.append(position_value / value if value else 0.0)
+
+    def notify_trade(self, trade):
+        if trade.justopened:
+            self._open_value[trade.ref] = abs(trade.value)
+        elif trade.isclosed:
+            cost = self._open_value.pop(trade.ref, 0.0)
+            if cost:
+                self.trade_returns.append(trade.pnlcomm / cost)
+
+    def stop(self):
+        trade_returns = self.trade_returns if self.trade_returns else [np.nan]
+        metrics = performance_metrics(
+            self.values,
+            weights=self.weights,
+            trade_returns=trade_returns,
+            periods_per_year=self.p.periods_per_year,
+            risk_free=self.p.risk_free,
+        )
+        for name, values in metrics.items():
+            self.rets[name] = float(values[0])
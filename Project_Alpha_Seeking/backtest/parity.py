@@ -0,0 +1,97 @@
+"""
+快速回测内核与 backtrader 的一致性校验。
+
+用同一份数据分别跑 backtrader 策略与 run_signals，逐笔比较成交（bar、数量、价格）、
+逐 bar 比较账户市值，并比较最终市值；任何不一致都会抛出 AssertionError。
+"""
+
+import contextlib
+import io
+
+import backtrader as bt
+import numpy as np
+import pandas as pd
+
+from strategies import BuyAndHoldStrategy, MTFVWAPChannelStrategy, VWAPChannelStrategy
+
+from .fast_engine import run_signals
+from .feeds import pandas_feed
+from .signals import buy_and_hold_signals, mtf_vwap_channel_signals, vwap_channel_signals
+
+
+# 策略类 -> 向量化信号函数
+SIGNAL_BUILDERS = {
+    BuyAndHoldStrategy: buy_and_hold_signals,
+    VWAPChannelStrategy: vwap_channel_signals,
+    MTFVWAPChannelStrategy: mtf_vwap_channel_signals,
+}
+
+
+def strategy_params(strategy_cls, **overrides) -> dict:
+    """策略的默认参数并覆盖调用方传入的值"""
+    params = dict(strategy_cls.params._getpairs())
+    params.update(overrides)
+    return params
+
+
+def run_backtrader(data: pd.DataFrame, strategy_cls, cash: float = 10000.0, commission: float = 0.0, quiet: bool = True, **params) -> dict:
+    """
+    用 backtrader 运行策略，返回与 run_signals 相同结构的结果。
+    quiet=True 时屏蔽策略逐 bar 的日志输出。
+    """
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.adddata(pandas_feed(data))
+    cerebro.broker.setcash(cash)
+    cerebro.broker.setcommission(commission=commission)
+    cerebro.addstrategy(strategy_cls, **params)
+    cerebro.addanalyzer(bt.analyzers.Transactions, _name="transactions")
+
+    with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+        strat = cerebro.run()[0]
+
+    rows = []
+    positions = data.index.get_indexer(pd.DatetimeIndex(list(strat.analyzers.transactions.get_analysis())))
+    for bar, txs in zip(positions, strat.analyzers.transactions.get_analysis().values()):
+        for amount, price, *_ in txs:
+            rows.append((bar, amount, price))
+    return {
+        "equity": np.asarray(strat.value_history_values, dtype=float),
+        "trades": pd.DataFrame(rows, columns=["bar", "size", "price"]),
+        "final_value": strat.broker.getvalue(),
+        "cash": strat.broker.getcash(),
+        "position": strat.position.size,
+    }
+
+
+def run_fast(data: pd.DataFrame, strategy_cls, cash: float = 10000.0, commission: float = 0.0, **params) -> dict:
+    """用快速内核运行策略：先按策略参数计算信号，再调用 run_signals"""
+    params = strategy_params(strategy_cls, **params)
+    entries, exits = SIGNAL_BUILDERS[strategy_cls](data, **params)
+    return run_signals(
+        data["open"], data["close"], entries, exits,
+        cash=cash, target_percent=params["target_percent"], commission=commission,
+    )
+
+
+def check_parity(data: pd.DataFrame, strategy_cls, cash: float = 10000.0, commission: float = 0.0, **params):
+    """
+    两个引擎跑同一策略并断言结果完全一致。
+
+    Returns:
+    --------
+    tuple
+        (backtrader 结果, 快速内核结果)
+    """
+    ref = run_backtrader(data, strategy_cls, cash=cash, commission=commission, **params)
+    fast = run_fast(data, strategy_cls, cash=cash, commission=commission, **params)
+
+    ref_trades = ref["trades"][["bar", "size", "price"]].reset_index(drop=True)
+    fast_trades = fast["trades"][["bar", "size", "price"]].reset_index(drop=True)
+    if len(ref_trades) != len(fast_trades) or not (ref_trades.to_numpy() == fast_trades.to_numpy()).all():
+        raise AssertionError(f"成交记录不一致:\nbacktrader:\n{ref_trades}\nfast:\n{fast_trades}")
+    if not np.array_equal(ref["equity"], fast["equity"]):
+        bar = int(np.flatnonzero(ref["equity"] != fast["equity"])[0])
+        raise AssertionError(f"第 {bar} 根 bar 市值不一致: backtrader={ref['equity'][bar]!r}, fast={fast['equity'][bar]!r}")
+    if ref["final_value"] != fast["final_value"]:
+        raise AssertionError(f"最终市值不一致: backtrader={ref['final_value']!r}, fast={fast['final_value']!r}")
+    return ref, fast
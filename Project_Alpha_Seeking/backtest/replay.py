@@ -0,0 +1,230 @@
+"""
+流式K线回放。
+
+PandasData 需要先把整段历史读进内存再启动 Cerebro，分钟级长历史因此受限于内存。
+这里把行情按分区（缓存条目或分区文件）逐块读取：后台线程预读并转换分区，
+通过有界队列交给 StreamingFeed，Cerebro 以 preload=False / runonce=False / exactbars=1
+逐 bar 拉取数据，各条 line 只保留指标窗口需要的长度；已结束的订单与交易定期清理，
+峰值内存与历史长度无关。
+
+用法（在 Project_Alpha_Seeking 目录下）：
+    strat = run_replay(file_partitions(paths), VWAPChannelStrategy,
+                       timeframe=bt.TimeFrame.Minutes, cash=100000, commission=0.001)
+"""
+
+import contextlib
+import os
+import queue
+import threading
+
+import backtrader as bt
+import numpy as np
+import pandas as pd
+
+
+# 分区之间的结束标记
+_END = object()
+
+
+def file_partitions(paths):
+    """按顺序逐个读取分区文件（pickle，压缩格式按后缀自动识别）"""
+    for path in paths:
+        yield pd.read_pickle(path)
+
+
+def cache_partitions(cache, keys):
+    """按顺序逐个读取缓存条目，缺失的条目跳过"""
+    for key in keys:
+        df = cache.get(key)
+        if df is not None:
+            yield df
+
+
+class StreamingFeed(bt.feed.DataBase):
+    """
+    从分区生成器流式读取的 backtrader 数据源。
+
+    Parameters:
+    -----------
+    partitions : iterable
+        按时间顺序产出 DataFrame 的可迭代对象，每个 DataFrame 为一段连续K线
+    readahead : int
+        后台线程最多预读的分区数
+    datetime : str
+        时间列名，为 None 时使用 DataFrame 的 index
+    open, high, low, close, volume : str
+        对应字段的列名
+    notional : str
+        精确成交额列名（见 data_processing.trades），分区中没有该列时 notional 线为 NaN
+    """
+    lines = ("notional",)
+    params = (
+        ("partitions", None),
+        ("readahead", 2),
+        ("datetime", None),
+        ("open", "open"),
+        ("high", "high"),
+        ("low", "low"),
+        ("close", "close"),
+        ("volume", "volume"),
+        ("notional", "notional"),
+    )
+
+    def qbuffer(self, savemem=0, replaying=False):
+        # 多留一个位置：数据结束时 backtrader 会回退一格，exactbars=1 下否则会把最后一根 bar
+        # 从缓冲区弹出，stop() 中再读取当前 bar 就会越界
+        for line in self.lines:
+            line.qbuffer(savemem=savemem, extrasize=1)
+
+    def start(self):
+        super().start()
+        self._queue = queue.Queue(maxsize=max(1, self.p.readahead))
+        self._stop_event = threading.Event()
+        self._block = None
+        self._pos = 0
+        self._thread = threading.Thread(target=self._produce, name="StreamingFeed", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        # 取走积压的分区，让可能阻塞在 put 上的后台线程退出
+        while self._thread.is_alive():
+            with contextlib.suppress(queue.Empty):
+                self._queue.get_nowait()
+            self._thread.join(timeout=0.05)
+        super().stop()
+
+    def _put(self, item) -> bool:
+        while not self._stop_event.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _convert(self, df: pd.DataFrame):
+        """分区 DataFrame -> (datetime 数值, open, high, low, close, volume, notional) 数组"""
+        stamps = df.index if self.p.datetime is None else pd.DatetimeIndex(df[self.p.datetime])
+        # 与 PandasData 完全相同的时间转换，保证两种数据源的回测结果逐位一致
+        dtnum = np.array([bt.date2num(ts) for ts in stamps.to_pydatetime()], dtype=float)
+        cols = (self.p.open, self.p.high, self.p.low, self.p.close, self.p.volume)
+        if self.p.notional in df.columns:
+            notional = df[self.p.notional].to_numpy(dtype=float)
+        else:
+            notional = np.full(len(df), np.nan)
+        return (dtnum,) + tuple(df[col].to_numpy(dtype=float) for col in cols) + (notional,)
+
+    def _produce(self):
+        try:
+            for df in self.p.partitions:
+                if self._stop_event.is_set():
+                    return
+                if df is None or df.empty:
+                    continue
+                if not self._put(self._convert(df)):
+                    return
+            self._put(_END)
+        except BaseException as exc:  # 在回测线程中重新抛出
+            self._put(exc)
+
+    def _load(self):
+        while self._block is None or self._pos >= len(self._block[0]):
+            block = self._queue.get()
+            if block is _END:
+                return False
+            if isinstance(block, BaseException):
+                raise block
+            self._block, self._pos = block, 0
+
+        i = self._pos
+        self._pos += 1
+        dtnum, open_, high, low, close, volume, notional = self._block
+        self.lines.datetime[0] = dtnum[i]
+        self.lines.open[0] = open_[i]
+        self.lines.high[0] = high[i]
+        self.lines.low[0] = low[i]
+        self.lines.close[0] = close[i]
+        self.lines.volume[0] = volume[i]
+        self.lines.openinterest[0] = 0.0
+        self.lines.notional[0] = notional[i]
+        return True
+
+
+# 已结束的订单累计超过该数量时清理一次
+PRUNE_ORDERS = 256
+
+
+def prune_history(strategy) -> None:
+    """
+    丢弃 broker 与策略中已经结束的订单、已平仓的交易。
+    backtrader 会永久保留全部订单与交易对象，长历史回放时内存随交易次数增长；
+    回放只关心当前状态，这些历史可以安全丢弃（未结束的订单与未平仓交易不受影响）。
+    """
+    broker = strategy.broker
+    broker.orders = [o for o in broker.orders if o.alive()]
+    alive = {o.ref for o in broker.orders}
+    for registry in (broker._ocos, broker._pchildren):
+        for ref in [ref for ref in registry if ref not in alive]:
+            del registry[ref]
+    # 策略收到的是各状态下的订单副本，按 ref 判断对应订单是否仍未结束
+    strategy._orders = [o for o in strategy._orders if o.ref in alive]
+    for trades_by_id in strategy._trades.values():
+        for trades in trades_by_id.values():
+            trades[:] = [t for t in trades if not t.isclosed]
+
+
+def _replaying(strategy_cls, value_history_maxlen):
+    """生成限制市值历史长度、并定期清理订单与交易历史的策略子类"""
+    def next(self):
+        strategy_cls.next(self)
+        if len(self.broker.orders) > PRUNE_ORDERS:
+            prune_history(self)
+
+    return type(strategy_cls.__name__, (strategy_cls,), {
+        "value_history_maxlen": value_history_maxlen,
+        "next": next,
+    })
+
+
+def run_replay(partitions, strategy_cls, cash: float = 10000.0, commission: float = 0.0, readahead: int = 2, value_history_maxlen: int = 0, timeframe=bt.TimeFrame.Days, compression: int = 1, quiet: bool = True, **params):
+    """
+    用流式数据源运行策略。
+
+    Parameters:
+    -----------
+    partitions : iterable
+        按时间顺序产出分区 DataFrame，见 file_partitions / cache_partitions
+    strategy_cls : class
+        BaseStrategy 子类
+    cash, commission : float
+        初始资金与手续费率
+    readahead : int
+        后台预读的分区数
+    value_history_maxlen : int
+        策略市值历史只保留最近多少条；0 表示不保留，None 表示全部保留（内存随历史增长）
+    timeframe, compression :
+        K线周期，分钟线为 bt.TimeFrame.Minutes
+    quiet : bool
+        是否屏蔽策略逐 bar 日志
+    params :
+        策略参数
+
+    Returns:
+    --------
+    strategy
+        运行结束的策略实例
+    """
+    cerebro = bt.Cerebro(stdstats=False, preload=False, runonce=False, exactbars=1)
+    cerebro.adddata(StreamingFeed(
+        partitions=partitions, readahead=readahead,
+        timeframe=timeframe, compression=compression,
+    ))
+    cerebro.broker.setcash(cash)
+    cerebro.broker.setcommission(commission=commission)
+    cerebro.addstrategy(_replaying(strategy_cls, value_history_maxlen), **params)
+
+    # 日志直接丢弃而不是写入 StringIO，否则长历史下日志本身会占满内存
+    with open(os.devnull, "w") as sink:
+        with contextlib.redirect_stdout(sink) if quiet else contextlib.nullcontext():
+            return cerebro.run()[0]
@@ -0,0 +1,327 @@
+"""
+回测结果库。
+
+每次回测记录为 SQLite 中 runs 表的一行：策略名、参数哈希、参数 JSON、行情数据指纹、
+全部绩效指标（metrics.METRIC_NAMES）以及成交笔数与最终市值；参数另拆成 run_params 表
+按 (name, value) 建索引，便于按参数取值筛选；资金曲线可选地以压缩 float64 存入 equity 表。
+
+(strategy, param_hash, data_fingerprint) 唯一；param_hash 同时涵盖回测设置（初始资金、
+手续费、年化周期数等，存于 settings 列），参数扫描中断后以相同设置重新运行时，
+resumable_sweep 会跳过已经完成的参数组合，设置改变后则全部重新运行。
+
+用法（在 Project_Alpha_Seeking 目录下）：
+    store = ResultStore("results/runs.db")
+    resumable_sweep(store, data, VWAPChannelStrategy,
+                    {"vwap_period": [10, 20, 40], "std_dev_mult": [1.5, 2.0, 2.5]},
+                    cash=100000, commission=0.001)
+    store.query("VWAPChannelStrategy", order_by="sharpe", limit=10)
+"""
+
+import datetime
+import hashlib
+import itertools
+import json
+import os
+import sqlite3
+import time
+import zlib
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from .metrics import METRIC_NAMES, fast_results_metrics
+from .parity import run_fast, strategy_params
+
+
+# 建索引的指标列，排序 / 筛选最常用
+INDEXED_METRICS = ("sharpe", "total_return", "max_drawdown", "calmar")
+
+
+def data_fingerprint(data: pd.DataFrame) -> str:
+    """行情数据指纹：索引与全部数值的哈希，数据有任何变化都会得到不同的指纹"""
+    hashed = pd.util.hash_pandas_object(data, index=True).to_numpy()
+    return hashlib.sha1(hashed.tobytes()).hexdigest()
+
+
+def canonical(value):
+    """
+    参数值 -> 可稳定 JSON 序列化的形式。DataFrame / ndarray 等按内容取指纹，类与函数取完整路径；
+    其他对象无法唯一表示，直接报错，避免不同对象因 str 相同而得到相同的哈希
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return [canonical(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): canonical(v) for k, v in value.items()}
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return {"__data__": data_fingerprint(value)}
+    if isinstance(value, np.ndarray):
+        digest = hashlib.sha1(np.ascontiguousarray(value).tobytes()).hexdigest()
+        return {"__array__": digest, "dtype": str(value.dtype), "shape": list(value.shape)}
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (datetime.timedelta, pd.Timedelta)):
+        return str(pd.Timedelta(value))
+    if isinstance(value, type) or (callable(value) and hasattr(value, "__qualname__")):
+        return f"{value.__module__}.{value.__qualname__}"
+    raise TypeError(f"参数值无法稳定序列化，不能用于结果库: {value!r}（{type(value).__name__}）")
+
+
+def _dumps(value) -> str:
+    return json.dumps(canonical(value), sort_keys=True)
+
+
+def param_hash(params: dict, settings: dict = None) -> str:
+    """
+    一次回测的稳定哈希：参数（键排序后的 JSON），以及影响结果的回测设置
+    （初始资金、手续费、年化周期数等）；settings 为 None 时只哈希参数
+    """
+    payload = params if settings is None else {"params": params, "settings": settings}
+    return hashlib.sha1(_dumps(payload).encode("utf-8")).hexdigest()
+
+
+class ResultStore:
+    """
+    基于 SQLite 的回测结果库。
+
+    Parameters:
+    -----------
+    path : str
+        数据库文件路径，所在目录不存在时自动创建
+    """
+
+    def __init__(self, path: str = "results/runs.db"):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._init_schema()
+
+    @contextmanager
+    def _connect(self):
+        """打开连接，正常退出时提交事务，始终关闭连接"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_schema(self):
+        metric_cols = ", ".join(f"{name} REAL" for name in METRIC_NAMES)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, strategy TEXT NOT NULL, param_hash TEXT NOT NULL, "
+                "params TEXT NOT NULL, settings TEXT, data_fingerprint TEXT NOT NULL, created REAL NOT NULL, "
+                f"trades INTEGER, final_value REAL, {metric_cols}, "
+                "UNIQUE (strategy, param_hash, data_fingerprint))"
+            )
+            # 旧版结果库没有 settings 列；旧记录的 settings 为空，其哈希不含设置，不会被当作已完成
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(runs)")}
+            if "settings" not in columns:
+                conn.execute("ALTER TABLE runs ADD COLUMN settings TEXT")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS run_params ("
+                "run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE, "
+                "name TEXT NOT NULL, value, PRIMARY KEY (run_id, name))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS equity ("
+                "run_id INTEGER PRIMARY KEY REFERENCES runs(id) ON DELETE CASCADE, data BLOB NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_data ON runs (strategy, data_fingerprint)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_params_value ON run_params (name, value)")
+            for name in INDEXED_METRICS:
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_runs_{name} ON runs (strategy, {name})")
+
+    def completed(self, strategy: str, fingerprint: str) -> set:
+        """该策略在这份数据上已完成的参数哈希集合"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT param_hash FROM runs WHERE strategy = ? AND data_fingerprint = ?",
+                (strategy, fingerprint),
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def record(self, strategy: str, params: dict, fingerprint: str, metrics: dict, trades: int = None, final_value: float = None, equity=None, settings: dict = None) -> int:
+        """
+        写入一次回测结果，同一 (策略, 参数, 设置, 数据) 重复写入时覆盖旧记录。
+
+        Parameters:
+        -----------
+        strategy : str
+            策略名
+        params : dict
+            完整参数（含默认值）
+        fingerprint : str
+            data_fingerprint 的结果
+        metrics : dict
+            指标名 -> 标量
+        trades : int
+            成交笔数
+        final_value : float
+            最终市值
+        equity : array-like
+            资金曲线，为 None 时不保存
+        settings : dict
+            影响结果的回测设置（如 cash / commission / periods_per_year），计入哈希
+
+        Returns:
+        --------
+        int
+            run id
+        """
+        values = [float(metrics[name]) if metrics.get(name) is not None else None for name in METRIC_NAMES]
+        columns = ", ".join(METRIC_NAMES)
+        marks = ", ".join("?" for _ in METRIC_NAMES)
+        run_hash = param_hash(params, settings)
+        with self._connect() as conn:
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.execute(
+                "DELETE FROM runs WHERE strategy = ? AND param_hash = ? AND data_fingerprint = ?",
+                (strategy, run_hash, fingerprint),
+            )
+            cur = conn.execute(
+                "INSERT INTO runs (strategy, param_hash, params, settings, data_fingerprint, created, trades, "
+                f"final_value, {columns}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, {marks})",
+                [strategy, run_hash, _dumps(params), None if settings is None else _dumps(settings), fingerprint,
+                 time.time(), trades, final_value, *values],
+            )
+            run_id = cur.lastrowid
+            conn.executemany(
+                "INSERT INTO run_params (run_id, name, value) VALUES (?, ?, ?)",
+                [(run_id, name, value if isinstance(value, (int, float, str)) else _dumps(value))
+                 for name, value in params.items()],
+            )
+            if equity is not None:
+                blob = zlib.compress(np.asarray(equity, dtype=np.float64).tobytes(), 1)
+                conn.execute("INSERT INTO equity (run_id, data) VALUES (?, ?)", (run_id, blob))
+        return run_id
+
+    def load_equity(self, run_id: int):
+        """读取资金曲线，未保存时返回 None"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT data FROM equity WHERE run_id = ?", (run_id,)).fetchone()
+        if row is None:
+            return None
+        return np.frombuffer(zlib.decompress(row[0]), dtype=np.float64)
+
+    def query(self, strategy: str = None, fingerprint: str = None, where: str = None, order_by: str = None, ascending: bool = False, limit: int = None, settings: dict = None, **param_filters) -> pd.DataFrame:
+        """
+        查询回测结果。
+
+        Parameters:
+        -----------
+        strategy : str
+            只看某个策略
+        fingerprint : str
+            只看某份数据
+        where : str
+            额外的 SQL 条件，作用于 runs 表的列，如 "sharpe > 1 AND max_drawdown < 0.2"
+        order_by : str
+            排序列，如 "sharpe"
+        ascending : bool
+            是否升序
+        limit : int
+            最多返回的行数
+        settings : dict
+            只看某组回测设置（与 record 时传入的 settings 相同）
+        param_filters :
+            按参数取值筛选，如 vwap_period=20
+
+        Returns:
+        --------
+        pd.DataFrame
+            每行一次回测，包含 runs 表全部列，参数展开为同名列
+        """
+        clauses, args = [], []
+        if strategy is not None:
+            clauses.append("r.strategy = ?")
+            args.append(strategy)
+        if fingerprint is not None:
+            clauses.append("r.data_fingerprint = ?")
+            args.append(fingerprint)
+        if settings is not None:
+            clauses.append("r.settings = ?")
+            args.append(_dumps(settings))
+        if where:
+            clauses.append(f"({where})")
+        for i, (name, value) in enumerate(param_filters.items()):
+            clauses.append(f"EXISTS (SELECT 1 FROM run_params p{i} WHERE p{i}.run_id = r.id AND p{i}.name = ? AND p{i}.value = ?)")
+            args.extend([name, value])
+        sql = "SELECT r.* FROM runs r"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        if order_by:
+            if order_by not in METRIC_NAMES + ("id", "created", "trades", "final_value"):
+                raise ValueError(f"不支持的排序列: {order_by}")
+            sql += f" ORDER BY r.{order_by} {'ASC' if ascending else 'DESC'}"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+
+        with self._connect() as conn:
+            df = pd.read_sql_query(sql, conn, params=args)
+        if df.empty:
+            return df
+        params = pd.DataFrame([json.loads(p) for p in df["params"]], index=df.index)
+        return pd.concat([df.drop(columns="params"), params], axis=1)
+
+
+def resumable_sweep(store: ResultStore, data: pd.DataFrame, strategy_cls, param_grid: dict, cash: float = 10000.0, commission: float = 0.0, periods_per_year: int = 252, save_equity: bool = False) -> pd.DataFrame:
+    """
+    用快速回测内核做参数扫描，每完成一组参数立即写入结果库；
+    重新运行时跳过已完成的参数组合，因此中断后可以直接续跑。
+
+    Parameters:
+    -----------
+    store : ResultStore
+        结果库
+    data : pd.DataFrame
+        行情数据（open / high / low / close / volume）
+    strategy_cls : class
+        策略类，须在 parity.SIGNAL_BUILDERS 中有对应的向量化信号函数
+    param_grid : dict
+        参数名 -> 候选值列表，取笛卡尔积
+    cash, commission : float
+        初始资金与手续费率
+    periods_per_year : int
+        每年的 bar 数，用于年化指标
+    save_equity : bool
+        是否同时保存资金曲线
+
+    Returns:
+    --------
+    pd.DataFrame
+        本策略在这份数据、这组设置下的全部结果（含之前已完成的）
+    """
+    strategy = strategy_cls.__name__
+    fingerprint = data_fingerprint(data)
+    settings = {"cash": float(cash), "commission": float(commission), "periods_per_year": periods_per_year}
+    done = store.completed(strategy, fingerprint)
+    names = list(param_grid)
+    combos = [dict(zip(names, values)) for values in itertools.product(*param_grid.values())]
+    todo = [p for p in combos if param_hash(strategy_params(strategy_cls, **p), settings) not in done]
+    print(f"{strategy}: 共 {len(combos)} 组参数，已完成 {len(combos) - len(todo)} 组，待运行 {len(todo)} 组")
+
+    for i, overrides in enumerate(todo, 1):
+        params = strategy_params(strategy_cls, **overrides)
+        result = run_fast(data, strategy_cls, cash=cash, commission=commission, **overrides)
+        metrics = fast_results_metrics([result], data["close"], periods_per_year)
+        store.record(
+            strategy, params, fingerprint,
+            {name: values[0] for name, values in metrics.items()},
+            trades=len(result["trades"]),
+            final_value=result["final_value"],
+            equity=result["equity"] if save_equity else None,
+            settings=settings,
+        )
+        if i % 100 == 0 or i == len(todo):
+            print(f"  已完成 {i}/{len(todo)}")
+
+    return store.query(strategy, fingerprint, settings=settings)
@@ -0,0 +1,299 @@
+"""
+蒙特卡洛 / 自助法稳健性分析。
+
+对一次回测的收益序列或成交记录做成千上万次重采样，观察最终市值、最大回撤与 Sharpe 的分布：
+    block_bootstrap_equity   收益序列分块自助重采样（保留块内自相关）
+    trade_shuffle_equity     打乱逐笔交易顺序（可选有放回抽样）
+    entry_delay_equity       每笔交易入场随机推迟 0..max_delay 根 bar
+所有重采样都是 (resamples × bars) 的 NumPy 矩阵运算，按 batch_size 分批以控制内存；
+同一 seed 与 batch_size 下结果完全可复现。
+"""
+
+import numpy as np
+import pandas as pd
+
+from .metrics import performance_metrics, round_trip_returns
+
+
+SUMMARY_METRICS = ("final_equity", "max_drawdown", "sharpe")
+SUMMARY_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def _batches(n_resamples: int, batch_size: int):
+    for start in range(0, n_resamples, batch_size):
+        yield min(batch_size, n_resamples - start)
+
+
+def _equity_from_returns(returns: np.ndarray, cash: float) -> np.ndarray:
+    """(runs, bars) 收益率矩阵 -> 以 cash 起始、多一列的资金曲线"""
+    equity = np.empty((returns.shape[0], returns.shape[1] + 1))
+    equity[:, 0] = cash
+    np.cumprod(1.0 + returns, axis=1, out=equity[:, 1:])
+    equity[:, 1:] *= cash
+    return equity
+
+
+def _collect(batches, periods_per_year: int) -> dict:
+    """逐批计算指标并拼接，只保留稳健性报告需要的三项"""
+    parts = {name: [] for name in SUMMARY_METRICS}
+    for equity in batches:
+        metrics = performance_metrics(equity, periods_per_year=periods_per_year)
+        parts["final_equity"].append(equity[:, -1])
+        parts["max_drawdown"].append(metrics["max_drawdown"])
+        parts["sharpe"].append(metrics["sharpe"])
+    return {name: np.concatenate(values) for name, values in parts.items()}
+
+
+def block_bootstrap_equity(
+    returns,
+    n_resamples: int = 10000,
+    block_size: int = 20,
+    cash: float = 10000.0,
+    seed=None,
+    batch_size: int = 2000,
+):
+    """
+    收益序列的循环分块自助法：随机选取起点，拼接长度为 block_size 的连续收益块，
+    直到与原序列等长。
+
+    Parameters:
+    -----------
+    returns : array-like
+        逐 bar 收益率，可由资金曲线 equity[1:] / equity[:-1] - 1 得到
+    n_resamples : int
+        重采样次数
+    block_size : int
+        块长度，日线常用 5~20
+    cash : float
+        重采样资金曲线的起始资金
+    seed : int
+        随机种子
+    batch_size : int
+        每批重采样条数
+
+    Yields:
+    -------
+    np.ndarray
+        形状 (batch, len(returns) + 1) 的资金曲线
+    """
+    returns = np.asarray(returns, dtype=float)
+    n = len(returns)
+    n_blocks = -(-n // block_size)
+    offsets = np.arange(block_size)
+    rng = np.random.default_rng(seed)
+    for size in _batches(n_resamples, batch_size):
+        starts = rng.integers(0, n, size=(size, n_blocks, 1))
+        idx = ((starts + offsets) % n).reshape(size, -1)[:, :n]
+        yield _equity_from_returns(returns[idx], cash)
+
+
+def trade_shuffle_equity(
+    trade_returns,
+    n_resamples: int = 10000,
+    replace: bool = False,
+    cash: float = 10000.0,
+    seed=None,
+    batch_size: int = 2000,
+):
+    """
+    打乱逐笔交易顺序，得到按交易计的资金曲线。
+
+    复利下不放回打乱不改变最终市值，只改变路径（回撤、连续亏损）；
+    replace=True 时改为有放回抽样，最终市值也随之变化。
+
+    Parameters:
+    -----------
+    trade_returns : array-like
+        逐笔交易收益率，可由 metrics.round_trip_returns 得到
+    n_resamples : int
+        重采样次数
+    replace : bool
+        是否有放回抽样
+    cash : float
+        起始资金
+    seed : int
+        随机种子
+    batch_size : int
+        每批重采样条数
+
+    Yields:
+    -------
+    np.ndarray
+        形状 (batch, len(trade_returns) + 1) 的资金曲线
+    """
+    trade_returns = np.asarray(trade_returns, dtype=float)
+    k = len(trade_returns)
+    rng = np.random.default_rng(seed)
+    for size in _batches(n_resamples, batch_size):
+        if replace:
+            idx = rng.integers(0, k, size=(size, k))
+        else:
+            idx = rng.permuted(np.broadcast_to(np.arange(k), (size, k)), axis=1)
+        yield _equity_from_returns(trade_returns[idx], cash)
+
+
+def entry_delay_equity(
+    open_,
+    close,
+    trades: pd.DataFrame,
+    max_delay: int = 3,
+    n_resamples: int = 10000,
+    target_percent: float = 0.95,
+    commission: float = 0.0,
+    cash: float = 10000.0,
+    seed=None,
+    batch_size: int = 2000,
+):
+    """
+    每笔交易的入场成交 bar 随机推迟 0..max_delay 根，出场不变，重建逐 bar 资金曲线。
+
+    持仓期间按 target_percent 的固定仓位比例计收益：入场 bar 计开盘到收盘，
+    持有 bar 计收盘到收盘，出场 bar 计前收盘到开盘；入场、出场各扣一次 commission。
+    推迟到出场当根或之后的交易视为未成交。该模型忽略整数股与现金拖累，
+    max_delay=0 时与 run_signals 的资金曲线近似而非逐位相同。
+
+    Parameters:
+    -----------
+    open_, close : array-like
+        开盘价、收盘价
+    trades : pd.DataFrame
+        run_signals 的成交记录（bar / size 列）
+    max_delay : int
+        最大推迟 bar 数
+    n_resamples : int
+        重采样次数
+    target_percent : float
+        持仓占账户市值比例
+    commission : float
+        手续费率
+    cash : float
+        起始资金
+    seed : int
+        随机种子
+    batch_size : int
+        每批重采样条数
+
+    Yields:
+    -------
+    np.ndarray
+        形状 (batch, len(close)) 的资金曲线，第 0 根 bar 为起始资金
+    """
+    open_ = np.asarray(open_, dtype=float)
+    close = np.asarray(close, dtype=float)
+    n = len(close)
+    size = trades["size"].to_numpy()
+    bars = trades["bar"].to_numpy(dtype=np.int64)
+    entry = bars[size > 0]
+    exit_ = np.full(len(entry), n, dtype=np.int64)
+    sells = bars[size < 0]
+    exit_[:len(sells)] = sells
+    k = len(entry)
+
+    # 三类单 bar 资产收益，下标 t 表示第 t 根 bar 上的收益
+    intrabar = close / open_ - 1.0
+    hold = np.zeros(n)
+    hold[1:] = close[1:] / close[:-1] - 1.0
+    gap = np.zeros(n)
+    gap[1:] = open_[1:] / close[:-1] - 1.0
+
+    rng = np.random.default_rng(seed)
+    for batch in _batches(n_resamples, batch_size):
+        start = entry + rng.integers(0, max_delay + 1, size=(batch, k))
+        row, col = np.nonzero(start < exit_)
+        begin, end = start[row, col], exit_[col]
+
+        # 差分数组标记 (start, exit) 之间的持有 bar；同一行内各笔交易的起点、终点互不重复
+        marks = np.zeros((batch, n + 1))
+        marks[row, begin + 1] += 1.0
+        marks[row, end] -= 1.0
+        holding = np.cumsum(marks[:, :n], axis=1)
+
+        entered = np.zeros((batch, n + 1))
+        entered[row, begin] = 1.0
+        exited = np.zeros((batch, n + 1))
+        exited[row, end] = 1.0
+        entered, exited = entered[:, :n], exited[:, :n]
+
+        returns = target_percent * (
+            holding * hold
+            + entered * (intrabar - commission)
+            + exited * (gap - commission)
+        )
+        equity = np.empty((batch, n))
+        equity[:, 0] = cash
+        np.cumprod(1.0 + returns[:, 1:], axis=1, out=equity[:, 1:])
+        equity[:, 1:] *= cash
+        # 第 0 根 bar 上的入场收益并入起始资金
+        equity *= (1.0 + returns[:, :1])
+        yield equity
+
+
+def summarize(samples: dict) -> pd.DataFrame:
+    """每个指标的均值、标准差与分位数，行是指标，列是统计量"""
+    rows = {}
+    for name, values in samples.items():
+        stats = {"mean": np.nanmean(values), "std": np.nanstd(values)}
+        for q, v in zip(SUMMARY_QUANTILES, np.nanquantile(values, SUMMARY_QUANTILES)):
+            stats[f"p{int(q * 100)}"] = v
+        rows[name] = stats
+    return pd.DataFrame(rows).T
+
+
+def robustness_report(
+    data: pd.DataFrame,
+    result: dict,
+    n_resamples: int = 10000,
+    block_size: int = 20,
+    max_delay: int = 3,
+    target_percent: float = 0.95,
+    commission: float = 0.0,
+    periods_per_year: int = 252,
+    seed=None,
+    batch_size: int = 2000,
+) -> dict:
+    """
+    对一次 run_signals 回测结果跑三种重采样并汇总。
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        回测所用行情（open / close 列）
+    result : dict
+        run_signals 的返回值
+    其余参数见各重采样函数；逐笔交易的年化按回测期内平均每年交易次数计算
+
+    Returns:
+    --------
+    dict
+        {"block_bootstrap" | "trade_shuffle" | "entry_delay": summarize 的 DataFrame，
+         "samples": 各方法的原始指标数组}
+    """
+    equity = np.asarray(result["equity"], dtype=float)
+    cash = equity[0]
+    rng = np.random.default_rng(seed)
+    seeds = rng.integers(0, 2**32, size=3)
+
+    trade_returns = round_trip_returns(result["trades"])
+    years = max(len(equity) - 1, 1) / periods_per_year
+    trades_per_year = max(1, int(round(len(trade_returns) / years)))
+
+    samples = {
+        "block_bootstrap": _collect(
+            block_bootstrap_equity(equity[1:] / equity[:-1] - 1.0, n_resamples, block_size, cash, seeds[0], batch_size),
+            periods_per_year,
+        ),
+        "trade_shuffle": _collect(
+            trade_shuffle_equity(trade_returns, n_resamples, False, cash, seeds[1], batch_size),
+            trades_per_year,
+        ),
+        "entry_delay": _collect(
+            entry_delay_equity(
+                data["open"], data["close"], result["trades"], max_delay, n_resamples,
+                target_percent, commission, cash, seeds[2], batch_size,
+            ),
+            periods_per_year,
+        ),
+    }
+    report = {name: summarize(values) for name, values in samples.items()}
+    report["samples"] = samples
+    return report
@@ -0,0 +1,415 @@
+"""
+命令行实验入口：按 YAML 实验配置运行回测，可由 cron 定时调度。
+
+流程：
+1. 读取配置，校验数据源、策略类与参数名；
+2. 在主进程中逐个品种调用 data_processing 的加载函数，预热本地缓存，
+   行情只加载一次，通过进程池的 initializer 交给各工作进程；
+3. 参数网格 × 品种展开为任务，跳过结果库中已经完成的组合，按 workers 并行运行，
+   定期输出进度与吞吐；
+4. 每个结果由主进程写入结果库（ResultStore），并在输出目录写出 metrics.csv、
+   可选的逐次资金曲线 equity/*.csv 与本次运行摘要 run.json。
+
+退出码：0 全部成功；1 部分品种加载失败或部分回测出错；2 配置错误。
+
+用法（在 Project_Alpha_Seeking 目录下）：
+    python -m backtest.runner experiments/vwap_channel.yaml --workers 4
+
+配置示例见 experiments/vwap_channel.yaml。
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+import yaml
+
+
+EXIT_OK = 0
+EXIT_FAILURES = 1
+EXIT_CONFIG = 2
+
+ENGINES = ("fast", "backtrader")
+
+
+class ConfigError(ValueError):
+    """实验配置有误"""
+
+
+def load_spec(path: str) -> dict:
+    """读取并校验实验配置，补齐默认值"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            spec = yaml.safe_load(f)
+    except (OSError, yaml.YAMLError) as exc:
+        raise ConfigError(f"无法读取配置 {path}: {exc}") from exc
+    if not isinstance(spec, dict):
+        raise ConfigError("配置顶层必须是映射")
+
+    data = spec.get("data") or {}
+    for key in ("provider", "symbols", "start", "end"):
+        if key not in data:
+            raise ConfigError(f"data.{key} 未配置")
+    if isinstance(data["symbols"], str):
+        data["symbols"] = [data["symbols"]]
+    data.setdefault("interval", None)
+    data.setdefault("kwargs", {})
+
+    from data_processing import available_providers
+    if data["provider"] not in available_providers():
+        raise ConfigError(f"未注册的数据源: {data['provider']}，可选值: {available_providers()}")
+
+    if "strategy" not in spec:
+        raise ConfigError("strategy 未配置")
+    strategy_cls = resolve_strategy(spec["strategy"])
+    params = spec.get("params") or {}
+    unknown = set(params) - set(strategy_cls.params._getkeys())
+    if unknown:
+        raise ConfigError(f"{spec['strategy']} 没有参数: {sorted(unknown)}")
+
+    engine = spec.setdefault("engine", "fast")
+    if engine not in ENGINES:
+        raise ConfigError(f"engine 只能是 {ENGINES}")
+    if engine == "fast":
+        from .parity import SIGNAL_BUILDERS
+        if strategy_cls not in SIGNAL_BUILDERS:
+            raise ConfigError(f"{spec['strategy']} 没有向量化信号函数，请使用 engine: backtrader")
+
+    spec["data"] = data
+    spec["params"] = params
+    spec.setdefault("name", os.path.splitext(os.path.basename(path))[0])
+    spec["broker"] = {"cash": 10000.0, "commission": 0.0, **(spec.get("broker") or {})}
+    spec.setdefault("periods_per_year", 252)
+    spec.setdefault("workers", 1)
+    spec["output"] = {
+        "dir": os.path.join("results", spec["name"]),
+        "store": os.path.join("results", "runs.db"),
+        "save_equity": False,
+        **(spec.get("output") or {}),
+    }
+    return spec
+
+
+def resolve_strategy(name: str):
+    """按类名在 strategies 包中查找策略类"""
+    import strategies
+    from strategies.base_strategy import BaseStrategy
+
+    cls = getattr(strategies, name, None)
+    if not (isinstance(cls, type) and issubclass(cls, BaseStrategy)):
+        raise ConfigError(f"strategies 中没有策略类: {name}")
+    return cls
+
+
+def param_combos(params: dict) -> list:
+    """取值为列表的参数取笛卡尔积，标量视为只有一个取值"""
+    names = list(params)
+    values = [v if isinstance(v, list) else [v] for v in params.values()]
+    return [dict(zip(names, combo)) for combo in itertools.product(*values)]
+
+
+_OHLCV = ("open", "high", "low", "close", "volume")
+
+
+def normalize_frame(df: pd.DataFrame, provider: str) -> pd.DataFrame:
+    """
+    各数据源的原始返回统一为策略所需的形状：小写的 open / high / low / close / volume 列，
+    升序、无时区的 DatetimeIndex。yf 的 MultiIndex 列先扁平化，ts 的 vol / trade_date、
+    bybit 的 datetime 列等时间列转为索引
+    """
+    from data_processing.validation import _TIME_COLUMNS, _timestamps
+    from data_processing.yahoo_finance import flatten_yf_columns, standardize_columns
+
+    df = df.copy()
+    if provider == "yf":
+        df = standardize_columns(flatten_yf_columns(df))
+    else:
+        df.columns = [str(col).lower() for col in df.columns]
+    if "volume" not in df.columns and "vol" in df.columns:
+        df = df.rename(columns={"vol": "volume"})
+
+    if not isinstance(df.index, pd.DatetimeIndex):
+        stamps = _timestamps(df)
+        if stamps is None:
+            raise ValueError(f"找不到时间列，需要 DatetimeIndex 或以下任一列: {_TIME_COLUMNS}")
+        df.index = pd.DatetimeIndex(stamps)
+        df = df.drop(columns=[col for col in _TIME_COLUMNS if col in df.columns])
+    if df.index.tz is not None:
+        df.index = df.index.tz_localize(None)
+    df.index.name = "datetime"
+
+    missing = [col for col in _OHLCV if col not in df.columns]
+    if missing:
+        raise ValueError(f"缺少行情列: {missing}，实际列: {list(df.columns)}")
+    for col in _OHLCV:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df.sort_index()
+
+
+def warm_data(spec: dict) -> tuple:
+    """
+    主进程中逐个品种加载行情（命中缓存时直接读本地，否则下载并写入缓存）。
+
+    Returns:
+    --------
+    tuple
+        ({symbol: DataFrame}, {symbol: 错误信息})
+    """
+    from data_processing import load
+
+    data = spec["data"]
+    start = pd.Timestamp(data["start"]).to_pydatetime()
+    end = pd.Timestamp(data["end"]).to_pydatetime()
+    frames, errors = {}, {}
+    for symbol in data["symbols"]:
+        try:
+            df = load(data["provider"], symbol, start, end, data["interval"], **data["kwargs"])
+        except Exception as exc:  # 单个品种失败不影响其他品种
+            errors[symbol] = f"{type(exc).__name__}: {exc}"
+            continue
+        if df is None or df.empty:
+            errors[symbol] = "没有数据"
+            continue
+        # 分发给工作进程前统一一次形状，策略与两种引擎都只接受标准列名与时间索引
+        try:
+            df = normalize_frame(df, data["provider"])
+        except Exception as exc:
+            errors[symbol] = f"{type(exc).__name__}: {exc}"
+            continue
+        frames[symbol] = df
+        print(f"[数据] {symbol}: {len(df)} 根 bar, {df.index[0]} ~ {df.index[-1]}", flush=True)
+    return frames, errors
+
+
+# 工作进程内的行情，由 initializer 设置一次
+_FRAMES = {}
+
+
+def _init_worker(frames: dict):
+    global _FRAMES
+    _FRAMES = frames
+
+
+def run_task(task: dict) -> dict:
+    """
+    在工作进程中运行一次回测。出错时不抛出，而是把异常信息放在结果的 error 字段。
+    """
+    try:
+        data = _FRAMES[task["symbol"]]
+        strategy_cls = resolve_strategy(task["strategy"])
+        if task["engine"] == "fast":
+            outcome = _run_fast(data, strategy_cls, task)
+        else:
+            outcome = _run_backtrader(data, strategy_cls, task)
+        return {**task, **outcome, "error": None}
+    except Exception:
+        return {**task, "error": traceback.format_exc()}
+
+
+def _run_fast(data, strategy_cls, task) -> dict:
+    from .metrics import fast_results_metrics
+    from .parity import run_fast
+
+    result = run_fast(data, strategy_cls, cash=task["cash"], commission=task["commission"], **task["overrides"])
+    metrics = fast_results_metrics([result], data["close"], task["periods_per_year"])
+    return {
+        "metrics": {name: float(values[0]) for name, values in metrics.items()},
+        "trades": len(result["trades"]),
+        "final_value": float(result["final_value"]),
+        "equity": result["equity"],
+    }
+
+
+def _run_backtrader(data, strategy_cls, task) -> dict:
+    import contextlib
+    import io
+
+    import backtrader as bt
+    import numpy as np
+
+    from .feeds import pandas_feed
+    from .metrics import PerformanceAnalyzer
+
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.adddata(pandas_feed(data))
+    cerebro.broker.setcash(task["cash"])
+    cerebro.broker.setcommission(commission=task["commission"])
+    cerebro.addstrategy(strategy_cls, **task["overrides"])
+    cerebro.addanalyzer(PerformanceAnalyzer, _name="perf", periods_per_year=task["periods_per_year"])
+    cerebro.addanalyzer(bt.analyzers.Transactions, _name="transactions")
+    with contextlib.redirect_stdout(io.StringIO()):
+        strat = cerebro.run()[0]
+    return {
+        "metrics": dict(strat.analyzers.perf.get_analysis()),
+        "trades": sum(len(txs) for txs in strat.analyzers.transactions.get_analysis().values()),
+        "final_value": float(strat.broker.getvalue()),
+        "equity": np.asarray(strat.analyzers.perf.values, dtype=float),
+    }
+
+
+class Progress:
+    """按固定时间间隔输出进度、吞吐与预计剩余时间（逐行输出，便于写入 cron 日志）"""
+
+    def __init__(self, total: int, interval: float = 2.0):
+        self.total = total
+        self.interval = interval
+        self.done = 0
+        self.failed = 0
+        self.start = time.perf_counter()
+        self._last = 0.0
+
+    def update(self, ok: bool):
+        self.done += 1
+        self.failed += not ok
+        now = time.perf_counter()
+        if now - self._last >= self.interval or self.done == self.total:
+            self._last = now
+            elapsed = now - self.start
+            rate = self.done / elapsed if elapsed > 0 else 0.0
+            eta = (self.total - self.done) / rate if rate > 0 else 0.0
+            print(f"[进度] {self.done}/{self.total} ({self.done / self.total:.0%}) "
+                  f"失败 {self.failed}  {rate:.1f} 次/秒  预计剩余 {eta:.0f}s", flush=True)
+
+
+def run_experiment(spec: dict, workers: int = None) -> int:
+    """
+    运行一份已经校验过的实验配置，返回退出码。
+
+    Parameters:
+    -----------
+    spec : dict
+        load_spec 的结果
+    workers : int
+        并行进程数，为 None 时使用配置中的 workers
+    """
+    from .result_store import ResultStore, data_fingerprint, param_hash
+    from .parity import strategy_params
+
+    started = time.time()
+    workers = max(1, int(workers or spec["workers"]))
+    strategy_cls = resolve_strategy(spec["strategy"])
+    output = spec["output"]
+    os.makedirs(output["dir"], exist_ok=True)
+    if output["save_equity"]:
+        os.makedirs(os.path.join(output["dir"], "equity"), exist_ok=True)
+    store = ResultStore(output["store"])
+
+    frames, data_errors = warm_data(spec)
+    for symbol, error in data_errors.items():
+        print(f"[错误] {symbol} 数据加载失败: {error}", file=sys.stderr, flush=True)
+
+    combos = param_combos(spec["params"])
+    # 回测设置与 resumable_sweep 一致，属于结果身份的一部分：改了资金、手续费或年化周期数就重新运行
+    settings = {
+        "cash": float(spec["broker"]["cash"]),
+        "commission": float(spec["broker"]["commission"]),
+        "periods_per_year": spec["periods_per_year"],
+    }
+    fingerprints = {symbol: data_fingerprint(df) for symbol, df in frames.items()}
+    tasks, hashes, skipped = [], set(), 0
+    for symbol in frames:
+        done = store.completed(strategy_cls.__name__, fingerprints[symbol])
+        for overrides in combos:
+            h = param_hash(strategy_params(strategy_cls, **overrides), settings)
+            hashes.add(h)
+            if h in done:
+                skipped += 1
+                continue
+            tasks.append({
+                "symbol": symbol,
+                "strategy": spec["strategy"],
+                "engine": spec["engine"],
+                "overrides": overrides,
+                **settings,
+            })
+    print(f"[任务] {spec['strategy']} × {len(frames)} 个品种 × {len(combos)} 组参数，"
+          f"已完成 {skipped}，待运行 {len(tasks)}，进程数 {workers}", flush=True)
+
+    failures = []
+    progress = Progress(len(tasks))
+
+    def handle(result):
+        if result["error"] is not None:
+            failures.append({"symbol": result["symbol"], "params": result["overrides"], "error": result["error"]})
+            print(f"[错误] {result['symbol']} {result['overrides']}\n{result['error']}", file=sys.stderr, flush=True)
+            progress.update(False)
+            return
+        params = strategy_params(strategy_cls, **result["overrides"])
+        store.record(
+            strategy_cls.__name__, params, fingerprints[result["symbol"]], result["metrics"],
+            trades=result["trades"], final_value=result["final_value"],
+            equity=result["equity"] if output["save_equity"] else None,
+            settings=settings,
+        )
+        if output["save_equity"]:
+            data = frames[result["symbol"]]
+            path = os.path.join(output["dir"], "equity", f"{result['symbol']}_{param_hash(params, settings)[:12]}.csv")
+            pd.Series(result["equity"], index=data.index[-len(result["equity"]):], name="equity").to_csv(path)
+        progress.update(True)
+
+    if workers == 1 or len(tasks) <= 1:
+        _init_worker(frames)
+        for task in tasks:
+            handle(run_task(task))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(frames,)) as pool:
+            for future in as_completed([pool.submit(run_task, task) for task in tasks]):
+                handle(future.result())
+
+    # 汇总本次实验全部参数组合的结果（含之前已完成的）
+    parts = []
+    for symbol, fingerprint in fingerprints.items():
+        df = store.query(strategy_cls.__name__, fingerprint, settings=settings)
+        if not df.empty:
+            parts.append(df[df["param_hash"].isin(hashes)].assign(symbol=symbol))
+    if parts:
+        pd.concat(parts, ignore_index=True).to_csv(os.path.join(output["dir"], "metrics.csv"), index=False)
+
+    exit_code = EXIT_FAILURES if data_errors or failures else EXIT_OK
+    summary = {
+        "name": spec["name"],
+        "strategy": spec["strategy"],
+        "engine": spec["engine"],
+        "started": started,
+        "elapsed": time.time() - started,
+        "symbols": sorted(frames),
+        "data_errors": data_errors,
+        "tasks": len(tasks),
+        "skipped": skipped,
+        "failed": len(failures),
+        "failures": failures,
+        "exit_code": exit_code,
+    }
+    with open(os.path.join(output["dir"], "run.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2, default=str)
+    print(f"[完成] 成功 {len(tasks) - len(failures)}，失败 {len(failures)}，跳过 {skipped}，"
+          f"数据失败 {len(data_errors)}，耗时 {summary['elapsed']:.1f}s，结果写入 {output['dir']}", flush=True)
+    return exit_code
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="按 YAML 配置运行回测实验")
+    parser.add_argument("spec", help="实验配置文件路径")
+    parser.add_argument("--workers", type=int, help="并行进程数，覆盖配置中的 workers")
+    parser.add_argument("--output", help="输出目录，覆盖配置中的 output.dir")
+    args = parser.parse_args(argv)
+
+    try:
+        spec = load_spec(args.spec)
+    except ConfigError as exc:
+        print(f"[配置错误] {exc}", file=sys.stderr)
+        return EXIT_CONFIG
+    if args.output:
+        spec["output"]["dir"] = args.output
+    return run_experiment(spec, args.workers)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+"""
+把策略的逐 bar 判断改写成向量化信号，供快速回测内核使用。
+
+每个函数返回 (entries, exits) 两个布尔数组，含义与对应策略 next 中的条件一一对应。
+"""
+
+import numpy as np
+import pandas as pd
+
+from indicators.timeframes import HigherTimeframe
+from indicators.vwap import vwap_channel
+from strategies.mtf_vwap_channel import slow_vwap_bands
+
+
+def buy_and_hold_signals(data: pd.DataFrame, **params):
+    """BuyAndHoldStrategy：空仓即买入，从不卖出"""
+    n = len(data)
+    return np.ones(n, dtype=bool), np.zeros(n, dtype=bool)
+
+
+def vwap_channel_signals(data: pd.DataFrame, vwap_period=20, reset_daily=False, use_typical=True, std_dev_mult=2.0, use_notional=False, **params):
+    """VWAPChannelStrategy：收盘价跌破 VWAP 下轨买入，升破上轨卖出"""
+    dates = data.index.date if reset_daily else None
+    _, upper, lower = vwap_channel(
+        data["high"], data["low"], data["close"], data["volume"],
+        period=vwap_period, use_typical=use_typical, std_dev_mult=std_dev_mult, dates=dates,
+        notional=data["notional"] if use_notional else None,
+    )
+    close = data["close"].to_numpy(dtype=float)
+    return close < lower, close > upper
+
+
+def mtf_vwap_channel_signals(data: pd.DataFrame, slow_data=None, slow_period=None, fast_period=None, vwap_period=20, use_typical=True, std_dev_mult=2.0, **params):
+    """MTFVWAPChannelStrategy：收盘价跌破已结束的慢周期 VWAP 下轨买入，升破上轨卖出"""
+    bands = slow_vwap_bands(slow_data, vwap_period, use_typical, std_dev_mult)
+    slow = HigherTimeframe(bands, data.index, fast_period, slow_period)
+    close = data["close"].to_numpy(dtype=float)
+    return close < slow.aligned("vwap_lower"), close > slow.aligned("vwap_upper")
@@ -0,0 +1,102 @@
+"""
+断点续跑：与完整重跑的一致性校验与耗时对比。
+
+对 BuyAndHoldStrategy、VWAPChannelStrategy、MTFVWAPChannelStrategy（参数含慢周期 DataFrame）
+分别在若干切分点上先运行前一段保存断点，再用完整数据续跑，与一次性完整运行比较
+账户市值历史、现金与持仓是否逐位一致。切分点包含“只新增一根 bar”的日常增量场景，
+此时无法从新 bar 推断快周期，MTF 策略沿用断点中保存的值。
+
+用法（在 Project_Alpha_Seeking 目录下）：
+    python benchmarks/bench_checkpoint.py --days 60
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    from backtest import run_incremental  # noqa: E402
+    from indicators import resample_bars  # noqa: E402
+    from strategies import BuyAndHoldStrategy, MTFVWAPChannelStrategy, VWAPChannelStrategy  # noqa: E402
+
+
+def synthetic_intraday(days: int, seed: int = 0) -> pd.DataFrame:
+    """全天候交易的随机游走 5 分钟线"""
+    n = days * 288
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    spread = np.abs(rng.normal(0, 0.001, n)) * close
+    return pd.DataFrame({
+        "open": open_,
+        "high": np.maximum(open_, close) + spread,
+        "low": np.minimum(open_, close) - spread,
+        "close": close,
+        "volume": rng.integers(100, 10_000, n).astype(float),
+    }, index=pd.date_range("2024-01-01", periods=n, freq="5min"))
+
+
+def snapshot(strat) -> tuple:
+    position = strat.broker.getposition(strat.datas[0])
+    return (list(strat.value_history_values), strat.broker.getcash(), position.size, position.price)
+
+
+def check(data: pd.DataFrame, strategy_cls, splits, commission: float, **params) -> tuple:
+    """返回 (是否全部一致, 完整运行耗时, 最后一次续跑耗时)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "full.pkl")
+        start = time.perf_counter()
+        full = snapshot(run_incremental(data, strategy_cls, path, cash=100000, commission=commission, **params))
+        t_full = time.perf_counter() - start
+
+        ok, t_resume = True, 0.0
+        for split in splits:
+            path = os.path.join(tmp, f"split_{split}.pkl")
+            first = run_incremental(data.iloc[:split], strategy_cls, path, cash=100000, commission=commission, **params)
+            start = time.perf_counter()
+            resumed = run_incremental(data, strategy_cls, path, cash=100000, commission=commission, **params)
+            t_resume = time.perf_counter() - start
+            # 市值历史：断点保存前一段，续跑实例在恢复后追加新的部分
+            history = list(resumed.value_history_values)
+            ok &= history[:len(first.value_history_values)] == list(first.value_history_values)
+            ok &= snapshot(resumed) == full
+    return ok, t_full, t_resume
+
+
+def main():
+    parser = argparse.ArgumentParser(description="断点续跑与完整重跑的一致性")
+    parser.add_argument("--days", type=int, default=60)
+    args = parser.parse_args()
+
+    data = synthetic_intraday(args.days)
+    slow = resample_bars(data, "1D")
+    n = len(data)
+    splits = sorted({n // 3, n // 2, n - 288, n - 1})
+    cases = [
+        ("BuyAndHoldStrategy", BuyAndHoldStrategy, {}),
+        ("VWAPChannelStrategy", VWAPChannelStrategy, {}),
+        ("MTFVWAPChannelStrategy", MTFVWAPChannelStrategy, {"slow_data": slow}),
+    ]
+
+    ok = True
+    print(f"K线: {n} 根，切分点: {splits}")
+    print(f"{'策略':<26s} {'手续费':>8s} {'完整(s)':>9s} {'续跑1根(s)':>11s} {'一致':>6s}")
+    for name, strategy_cls, params in cases:
+        for commission in (0.0, 0.001):
+            match, t_full, t_resume = check(data, strategy_cls, splits, commission, **params)
+            ok &= match
+            print(f"{name:<26s} {commission:>8.3f} {t_full:>9.2f} {t_resume:>11.3f} {'是' if match else '否':>6s}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+快速回测内核 vs backtrader：在合成数据上做一致性校验并对比耗时。
+
+用法（在 Project_Alpha_Seeking 目录下）：
+    python benchmarks/bench_fast_engine.py --bars 20000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backtest.parity import check_parity, run_fast  # noqa: E402
+from strategies import BuyAndHoldStrategy, VWAPChannelStrategy  # noqa: E402
+
+
+def synthetic_bars(n: int, seed: int = 0) -> pd.DataFrame:
+    """几何随机游走生成的 30 分钟K线"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    open_ = close * (1 + rng.normal(0, 0.003, n))
+    return pd.DataFrame({
+        "open": open_,
+        "high": np.maximum(open_, close) * 1.005,
+        "low": np.minimum(open_, close) * 0.995,
+        "close": close,
+        "volume": rng.integers(100, 10000, n).astype(float),
+    }, index=pd.date_range("2020-01-01", periods=n, freq="30min"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="快速回测内核一致性与耗时")
+    parser.add_argument("--bars", type=int, default=20000)
+    parser.add_argument("--commission", type=float, default=0.001)
+    args = parser.parse_args()
+
+    data = synthetic_bars(args.bars)
+    for strategy_cls in (BuyAndHoldStrategy, VWAPChannelStrategy):
+        start = time.perf_counter()
+        ref, _ = check_parity(data, strategy_cls, cash=100000, commission=args.commission)
+        bt_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        run_fast(data, strategy_cls, cash=100000, commission=args.commission)
+        fast_time = time.perf_counter() - start
+        print(f"{strategy_cls.__name__:<22s} 成交 {len(ref['trades']):4d} 笔，最终市值 {ref['final_value']:.2f} 一致；"
+              f"backtrader+校验 {bt_time:.2f}s，快速内核 {fast_time * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
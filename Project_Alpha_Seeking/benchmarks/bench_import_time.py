@@ -0,0 +1,57 @@
+"""
+冷启动导入耗时基准：对比惰性注册表与旧版"全量导入所有数据源 SDK"的开销。
+
+用法（在 Project_Alpha_Seeking 目录下）：
+    python benchmarks/bench_import_time.py --repeat 10
+"""
+
+import argparse
+import importlib.util
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _eager_snippet() -> str:
+    """模拟旧版 __init__：导入全部数据源依赖（仅包含本机已安装的库）"""
+    modules = ["pandas", "requests", "yfinance", "tushare"]
+    installed = [m for m in modules if importlib.util.find_spec(m) is not None]
+    return "; ".join(f"import {m}" for m in installed) or "pass"
+
+
+CASES = {
+    "旧版全量导入": _eager_snippet(),
+    "import data_processing": "import data_processing",
+    "registry + 读缓存所需 pandas": "import data_processing, pandas",
+}
+
+
+def time_import(snippet: str, repeat: int) -> list:
+    """每次都在全新子进程里执行，测得真实的冷启动耗时（秒）"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", snippet], cwd=PROJECT_DIR, check=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="data_processing 冷启动导入耗时基准")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    baseline = time_import("pass", args.repeat)
+    base = statistics.median(baseline)
+    print(f"解释器启动基线: {base * 1000:.1f} ms")
+    for name, snippet in CASES.items():
+        med = statistics.median(time_import(snippet, args.repeat))
+        print(f"{name:<32s} {med * 1000:8.1f} ms  (扣除基线 {max(med - base, 0) * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+多周期策略：预计算对齐表 vs backtrader 原生 resampledata。
+
+同一份合成 5 分钟线上运行“5 分钟线交易、日线 VWAP 通道”的策略：
+- 预计算：日线通道向量化算好，MTFVWAPChannelStrategy 在 next 中按对齐表 O(1) 读取；
+- 原生：cerebro.resampledata 运行时合成日线，VWAP 指标逐 bar 计算，由 backtrader 同步两路数据。
+原生方式须关闭 runonce 并逐 bar 同步；两者对“日线何时算结束”的约定不同（原生在下一天
+第一根 bar 到来时才交付日线），成交不要求逐笔相同，这里只比较耗时并列出结果供参考。
+
+用法（在 Project_Alpha_Seeking 目录下）：
+    python benchmarks/bench_mtf.py --days 120
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+import backtrader as bt
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from indicators import VWAP, resample_bars  # noqa: E402
+from strategies import MTFVWAPChannelStrategy  # noqa: E402
+from strategies.base_strategy import BaseStrategy  # noqa: E402
+
+
+class OncePerBarVWAP(VWAP):
+    """
+    VWAP 在队列中累积状态，而 backtrader 在主时钟（5 分钟线）每走一步都会调用慢周期指标的 next，
+    同一根日线会被重复计入；这里只在日线真正前进时计算一次，保证原生方式的结果有意义
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._seen = 0
+
+    def next(self):
+        if len(self.data) != self._seen:
+            self._seen = len(self.data)
+            super().next()
+
+
+class NativeMTFVWAPChannel(BaseStrategy):
+    """与 MTFVWAPChannelStrategy 相同的交易逻辑，通道来自 resampledata 合成的 datas[1]"""
+    params = (
+        ('target_percent', 0.95),
+        ('vwap_period', 20),
+        ('std_dev_mult', 2.0),
+    )
+
+    def __init__(self):
+        super().__init__()
+        self.vwap = OncePerBarVWAP(self.datas[1], period=self.p.vwap_period, std_dev_mult=self.p.std_dev_mult)
+
+    def next(self):
+        if self.order:
+            return
+        close = self.dataclose[0]
+        if not self.position and close < self.vwap.vwap_lower[0]:
+            self.buy_with_sizing()
+        elif self.position and close > self.vwap.vwap_upper[0]:
+            self.order = self.sell(size=self.position.size)
+        self.value_history_values.append(self.broker.getvalue())
+
+
+def synthetic_bars(days: int, seed: int = 0) -> pd.DataFrame:
+    """连续交易（加密货币式）的 5 分钟随机游走K线"""
+    n = days * 288
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    open_ = close * (1 + rng.normal(0, 0.0005, n))
+    return pd.DataFrame({
+        "open": open_,
+        "high": np.maximum(open_, close) * 1.001,
+        "low": np.minimum(open_, close) * 0.999,
+        "close": close,
+        "volume": rng.integers(100, 10000, n).astype(float),
+    }, index=pd.date_range("2022-01-01", periods=n, freq="5min"))
+
+
+def run(data, strategy_cls, native: bool, **params):
+    cerebro = bt.Cerebro(stdstats=False, runonce=not native)
+    feed = bt.feeds.PandasData(dataname=data, timeframe=bt.TimeFrame.Minutes, compression=5)
+    cerebro.adddata(feed)
+    if native:
+        cerebro.resampledata(feed, timeframe=bt.TimeFrame.Days, compression=1)
+    cerebro.broker.setcash(100000)
+    cerebro.broker.setcommission(commission=0.001)
+    cerebro.addstrategy(strategy_cls, **params)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        strat = cerebro.run()[0]
+    return time.perf_counter() - start, strat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多周期策略耗时对比")
+    parser.add_argument("--days", type=int, default=120)
+    parser.add_argument("--vwap-period", type=int, default=10)
+    parser.add_argument("--std-dev-mult", type=float, default=1.0)
+    args = parser.parse_args()
+
+    data = synthetic_bars(args.days)
+    params = dict(vwap_period=args.vwap_period, std_dev_mult=args.std_dev_mult)
+
+    start = time.perf_counter()
+    slow = resample_bars(data, "1D")
+    t_prep = time.perf_counter() - start
+    t_pre, strat_pre = run(data, MTFVWAPChannelStrategy, native=False, slow_data=slow, **params)
+    t_nat, strat_nat = run(data, NativeMTFVWAPChannel, native=True, **params)
+
+    print(f"5 分钟线: {len(data)} 根, 日线: {len(slow)} 根")
+    print(f"{'方式':<14s} {'耗时(s)':>10s} {'bars/s':>10s} {'交易笔数':>10s} {'最终市值':>14s}")
+    for name, elapsed, strat in (("预计算对齐表", t_pre + t_prep, strat_pre), ("resampledata", t_nat, strat_nat)):
+        trades = sum(len(t) for by_id in strat._trades.values() for t in by_id.values())
+        print(f"{name:<14s} {elapsed:>10.2f} {len(data) / elapsed:>10.0f} {trades:>10d} {strat.broker.getvalue():>14.2f}")
+    print(f"加速比: {t_nat / (t_pre + t_prep):.2f}x")
+
+
+if __name__ == "__main__":
+    main()
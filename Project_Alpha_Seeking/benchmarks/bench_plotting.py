@@ -0,0 +1,100 @@
+"""
+降采样绘图耗时与内存：合成千万根 1 分钟线与资金曲线，用 plot_backtest 绘制并保存 PNG，
+再模拟几次缩放（每次重新降采样并重绘），对比直接用 ax.plot / ax.scatter 全量绘制。
+
+用法（在 Project_Alpha_Seeking 目录下）：
+    python benchmarks/bench_plotting.py --bars 10000000
+    python benchmarks/bench_plotting.py --bars 1000000 --naive   # 同时测全量绘制（很慢）
+"""
+
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from plotting import plot_backtest  # noqa: E402
+from plotting.charts import to_plot_x  # noqa: E402
+
+
+def synthetic_results(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 1e-4, n)))
+    buys = rng.random(n) < 0.001
+    return pd.DataFrame({
+        "close": close,
+        "equity": 100000 * close / close[0],
+        "buy_execute": buys,
+        "sell_execute": np.roll(buys, 5),
+    }, index=pd.date_range("2000-01-01", periods=n, freq="min"))
+
+
+def peak_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="降采样绘图耗时")
+    parser.add_argument("--bars", type=int, default=10_000_000)
+    parser.add_argument("--zooms", type=int, default=5)
+    parser.add_argument("--naive", action="store_true", help="同时测全量绘制")
+    args = parser.parse_args()
+
+    results = synthetic_results(args.bars)
+    out = os.path.join(tempfile.gettempdir(), "alpha_plot_bench.png")
+    # 预热：字体缓存等一次性开销不计入两种方式的耗时
+    fig, _ = plt.subplots()
+    fig.savefig(out)
+    plt.close(fig)
+    base_mb = peak_mb()
+
+    start = time.perf_counter()
+    fig, axes = plot_backtest(results["close"], results["equity"],
+                              buys=results["buy_execute"], sells=results["sell_execute"])
+    fig.savefig(out)
+    t_full = time.perf_counter() - start
+
+    # 每次把可见区间缩小到原来的 1/5，中心随机
+    x = to_plot_x(results.index)
+    rng = np.random.default_rng(1)
+    lo, hi = x[0], x[-1]
+    start = time.perf_counter()
+    for _ in range(args.zooms):
+        width = (hi - lo) / 5
+        lo = rng.uniform(lo, hi - width)
+        hi = lo + width
+        axes[0].set_xlim(lo, hi)
+        fig.savefig(out)
+    t_zoom = (time.perf_counter() - start) / max(args.zooms, 1)
+    points = sum(len(line.get_xdata()) for ax in axes for line in ax.lines)
+    plt.close(fig)
+
+    print(f"bars: {args.bars}")
+    print(f"降采样绘制并保存: {t_full:.2f}s, 每次缩放重绘: {t_zoom:.2f}s, 当前绘制点数: {points}")
+    print(f"峰值RSS增量: {peak_mb() - base_mb:.0f} MB")
+
+    if args.naive:
+        start = time.perf_counter()
+        fig, axes = plt.subplots(2, 1, figsize=(14, 10), sharex=True, gridspec_kw={'height_ratios': [2, 1]})
+        axes[0].plot(results.index, results["close"])
+        axes[0].scatter(results.index[results["buy_execute"]], results.loc[results["buy_execute"], "close"], marker="^", s=100)
+        axes[0].scatter(results.index[results["sell_execute"]], results.loc[results["sell_execute"], "close"], marker="v", s=100)
+        axes[1].plot(results.index, results["equity"])
+        fig.savefig(out)
+        plt.close(fig)
+        print(f"全量绘制并保存: {time.perf_counter() - start:.2f}s, 峰值RSS增量: {peak_mb() - base_mb:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+流式回放的内存占用：生成不同长度的合成 1 分钟线分区文件，分别在独立子进程中用 run_replay
+回放 VWAPChannelStrategy，比较峰值 RSS。峰值应与历史长度无关。
+
+默认规模包含 1 亿根 bar，分区文件约 5GB、回放耗时以小时计；
+快速检查可用较小规模（在 Project_Alpha_Seeking 目录下）：
+    python benchmarks/bench_replay_memory.py --bars 200000 2000000
+"""
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from data_processing.cache import atomic_to_pickle  # noqa: E402
+
+
+def write_partitions(directory: str, bars: int, partition_bars: int, seed: int = 0) -> list:
+    """逐分区生成连续的随机游走 1 分钟线并写盘，任何时刻内存里只有一个分区"""
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    last_close = 100.0
+    start = pd.Timestamp("2000-01-03")
+    paths = []
+    for i, lo in enumerate(range(0, bars, partition_bars)):
+        n = min(partition_bars, bars - lo)
+        path = os.path.join(directory, f"part_{i:05d}.pkl")
+        paths.append(path)
+        close = last_close * np.exp(np.cumsum(rng.normal(0, 0.0005, n)))
+        last_close = close[-1]
+        if os.path.exists(path):
+            continue
+        open_ = close * (1 + rng.normal(0, 0.0002, n))
+        df = pd.DataFrame({
+            "open": open_,
+            "high": np.maximum(open_, close) * 1.0003,
+            "low": np.minimum(open_, close) * 0.9997,
+            "close": close,
+            "volume": rng.integers(100, 10000, n).astype(float),
+        }, index=start + pd.to_timedelta(np.arange(lo, lo + n), unit="min"))
+        atomic_to_pickle(df, path)
+    return paths
+
+
+def replay(directory: str) -> None:
+    """子进程入口：回放目录下全部分区，输出 bar 数、耗时与峰值 RSS（MB）"""
+    import backtrader as bt
+
+    from backtest.replay import file_partitions, run_replay
+    from strategies import VWAPChannelStrategy
+
+    paths = sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.startswith("part_"))
+    start = time.perf_counter()
+    strat = run_replay(file_partitions(paths), VWAPChannelStrategy, cash=100000, commission=0.001,
+                       timeframe=bt.TimeFrame.Minutes)
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{len(strat)} {elapsed:.1f} {peak_mb:.1f} {strat.broker.getvalue():.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="流式回放峰值内存")
+    parser.add_argument("--bars", type=int, nargs="+", default=[1_000_000, 10_000_000, 100_000_000])
+    parser.add_argument("--partition-bars", type=int, default=500_000)
+    parser.add_argument("--dir", default=os.path.join(tempfile.gettempdir(), "alpha_replay_bench"))
+    parser.add_argument("--replay-only", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.replay_only:
+        replay(args.replay_only)
+        return
+
+    print(f"{'bars':>12s} {'耗时(s)':>10s} {'bars/s':>10s} {'峰值RSS(MB)':>12s}")
+    for bars in args.bars:
+        directory = os.path.join(args.dir, f"{bars}_{args.partition_bars}")
+        write_partitions(directory, bars, args.partition_bars)
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--replay-only", directory],
+            check=True, capture_output=True, text=True,
+        ).stdout.strip().splitlines()[-1].split()
+        processed, elapsed, peak_mb = int(out[0]), float(out[1]), float(out[2])
+        print(f"{processed:>12d} {elapsed:>10.1f} {processed / elapsed:>10.0f} {peak_mb:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+信号规则引擎：与 notebooks 中 pandas 策略函数的一致性校验与耗时对比。
+
+- 一致性：三个策略（strategy_ma_volume / strategy_obv_ma / strategy_volume_ratio_breakout，
+  原样照抄自 notebooks/1_Initial_Strategies.ipynb）与 strategies.rules 中对应规则的
+  buy_signal / sell_signal 逐位比较；分别在 dropna 后的数据（notebook 的做法）与
+  保留指标预热期 NaN 的数据上检查，覆盖 shift 产生的缺失值语义；
+- 批量变体：strategy_ma_volume 的 (成交量倍数 × 萎缩天数) 参数网格，逐个调用 pandas 函数
+  vs evaluate_variants 一次求值。
+
+用法（在 Project_Alpha_Seeking 目录下）：
+    python benchmarks/bench_rules.py --bars 500000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    from strategies.rules import (  # noqa: E402
+        RuleEngine, evaluate_variants, ma_volume_rules, obv_ma_rules, volume_ratio_breakout_rules,
+    )
+
+
+def calculate_indicators(data):
+    """notebook 中的 calculate_indicators，OBV 改为向量化写法（结果相同）"""
+    df = data.copy()
+    df['ma5'] = df['close'].rolling(window=5).mean()
+    df['ma10'] = df['close'].rolling(window=10).mean()
+    df['ma20'] = df['close'].rolling(window=20).mean()
+    df['ma60'] = df['close'].rolling(window=60).mean()
+    df['vol_ma5'] = df['vol'].rolling(window=5).mean()
+    df['vol_ma10'] = df['vol'].rolling(window=10).mean()
+    df['vol_ma20'] = df['vol'].rolling(window=20).mean()
+    step = np.sign(df['close'].diff().fillna(0.0)) * df['vol']
+    df['obv'] = step.cumsum()
+    df['obv_ma10'] = df['obv'].rolling(window=10).mean()
+    df['vol_ratio'] = df['vol'] / df['vol'].rolling(window=5).mean().shift(1)
+    return df
+
+
+def strategy_ma_volume(data, vol_mult=1.0, shrink_days=3):
+    df = data.copy()
+    df['ma5_gt_ma10'] = df['ma5'] > df['ma10']
+    df['golden_cross'] = (df['ma5_gt_ma10'] != df['ma5_gt_ma10'].shift(1)) & df['ma5_gt_ma10']
+    df['death_cross'] = (df['ma5_gt_ma10'] != df['ma5_gt_ma10'].shift(1)) & ~df['ma5_gt_ma10']
+    df['vol_surge'] = df['vol'] > df['vol_ma5'] * vol_mult
+    df['vol_below_ma'] = df['vol'] < df['vol_ma5']
+    shrink = df['vol_below_ma']
+    for k in range(1, shrink_days):
+        shrink = shrink & df['vol_below_ma'].shift(k)
+    df['vol_shrink_3d'] = shrink
+    df['buy_signal'] = df['golden_cross'] & df['vol_surge']
+    df['sell_signal'] = df['death_cross'] | df['vol_shrink_3d']
+    return df
+
+
+def strategy_obv_ma(data):
+    df = data.copy()
+    df['price_gt_ma20'] = (df['close'] > df['ma20'])
+    df['obv_gt_ma10'] = (df['obv'] > df['obv_ma10'])
+    df['buy_signal'] = df['price_gt_ma20'] & df['obv_gt_ma10']
+    df['sell_signal'] = (~df['price_gt_ma20'] | ~df['obv_gt_ma10'])
+    return df
+
+
+def strategy_volume_ratio_breakout(data):
+    df = data.copy()
+    df['vol_ratio_gt2'] = df['vol_ratio'] > 2
+    df['price_cross_ma60'] = (df['close'] > df['ma60']) & (df['close'].shift(1) <= df['ma60'].shift(1))
+    df['price_below_ma10'] = df['close'] < df['ma10']
+    df['vol_below_ma'] = df['vol'] < df['vol_ma5']
+    df['vol_shrink_3d'] = df['vol_below_ma'] & df['vol_below_ma'].shift(1) & df['vol_below_ma'].shift(2)
+    df['buy_signal'] = df['vol_ratio_gt2'] & df['price_cross_ma60']
+    df['sell_signal'] = df['price_below_ma10'] | df['vol_shrink_3d']
+    return df
+
+
+def synthetic_daily(n: int, seed: int = 0) -> pd.DataFrame:
+    """tushare 日线风格（成交量列为 vol）的随机游走K线"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    # 成交量取整数并制造持平的收盘价，覆盖 OBV 的三个分支
+    close = np.round(close, 1)
+    return pd.DataFrame({
+        "close": close,
+        "vol": rng.integers(1_000, 100_000, n).astype(float),
+    }, index=pd.date_range("1990-01-01", periods=n, freq="D"))
+
+
+def same(reference: pd.DataFrame, entries, exits) -> bool:
+    return (np.array_equal(reference['buy_signal'].to_numpy(dtype=bool), entries)
+            and np.array_equal(reference['sell_signal'].to_numpy(dtype=bool), exits)
+            and reference['buy_signal'].dtype == bool and reference['sell_signal'].dtype == bool)
+
+
+def timed(func, repeat: int = 3):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="信号规则引擎一致性与耗时")
+    parser.add_argument("--bars", type=int, default=500_000)
+    args = parser.parse_args()
+
+    raw = calculate_indicators(synthetic_daily(args.bars))
+    datasets = {"dropna": raw.dropna(), "含预热 NaN": raw}
+    cases = [
+        ("strategy_ma_volume", strategy_ma_volume, ma_volume_rules()),
+        ("strategy_obv_ma", strategy_obv_ma, obv_ma_rules()),
+        ("strategy_volume_ratio_breakout", strategy_volume_ratio_breakout, volume_ratio_breakout_rules()),
+    ]
+
+    ok = True
+    print(f"K线: {args.bars} 根")
+    print(f"{'策略':<32s} {'数据':<10s} {'pandas(ms)':>11s} {'规则(ms)':>10s} {'加速比':>8s} {'一致':>6s}")
+    for name, func, (buy, sell) in cases:
+        for label, data in datasets.items():
+            t_pd, reference = timed(lambda: func(data))
+            t_rule, (entries, exits) = timed(lambda: RuleEngine(data).signals(buy, sell))
+            match = same(reference, entries, exits)
+            ok &= match
+            print(f"{name:<32s} {label:<10s} {t_pd * 1e3:>11.1f} {t_rule * 1e3:>10.1f} {t_pd / t_rule:>7.1f}x {'是' if match else '否':>6s}")
+
+    grid = {"vol_mult": [1.0, 1.2, 1.5, 2.0], "shrink_days": [2, 3, 4, 5]}
+    data = datasets["dropna"]
+    combos = [dict(vol_mult=m, shrink_days=d) for m in grid["vol_mult"] for d in grid["shrink_days"]]
+    t_pd, references = timed(lambda: [strategy_ma_volume(data, **params) for params in combos], repeat=1)
+    t_rule, variants = timed(lambda: evaluate_variants(data, ma_volume_rules, grid))
+    match = all(same(ref, entries, exits) for ref, (_, entries, exits) in zip(references, variants))
+    ok &= match
+    print(f"参数变体 {len(combos)} 组: pandas {t_pd * 1e3:.1f}ms, evaluate_variants {t_rule * 1e3:.1f}ms "
+          f"({t_pd / t_rule:.1f}x), 一致: {'是' if match else '否'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+逐笔成交聚合吞吐：生成 Bybit 格式的合成逐笔成交 csv.gz，比较三个耗时——
+只解压、只解析 csv（read_csv 按块读取）、完整聚合成K线（load_trade_bars），
+聚合耗时应接近解析耗时，即瓶颈在读盘与解析而不在聚合。
+
+用法（在 Project_Alpha_Seeking 目录下）：
+    python benchmarks/bench_trade_bars.py --trades 20000000 --files 4
+"""
+
+import argparse
+import gzip
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from data_processing.trades import load_trade_bars  # noqa: E402
+
+
+def write_trades(directory: str, trades: int, files: int, seed: int = 0) -> list:
+    """每个文件一天，时间升序的随机游走成交"""
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2024-01-01").timestamp()
+    per_file = trades // files
+    last = 40000.0
+    paths = []
+    for day in range(files):
+        path = os.path.join(directory, f"BTCUSDT_{day:03d}.csv.gz")
+        paths.append(path)
+        if os.path.exists(path):
+            continue
+        price = np.round(last * np.exp(np.cumsum(rng.normal(0, 1e-5, per_file))), 1)
+        last = price[-1]
+        pd.DataFrame({
+            "timestamp": np.round(start + day * 86400 + np.sort(rng.uniform(0, 86400, per_file)), 4),
+            "symbol": "BTCUSDT",
+            "side": np.where(rng.random(per_file) < 0.5, "Buy", "Sell"),
+            "size": np.round(rng.exponential(0.05, per_file), 4) + 0.0001,
+            "price": price,
+        }).to_csv(path, index=False, compression={"method": "gzip", "compresslevel": 1})
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="逐笔成交聚合吞吐")
+    parser.add_argument("--trades", type=int, default=20_000_000)
+    parser.add_argument("--files", type=int, default=4)
+    parser.add_argument("--interval", default="1min")
+    parser.add_argument("--chunksize", type=int, default=5_000_000)
+    parser.add_argument("--dir", default=os.path.join(tempfile.gettempdir(), "alpha_trade_bench"))
+    args = parser.parse_args()
+
+    paths = write_trades(os.path.join(args.dir, f"{args.trades}_{args.files}"), args.trades, args.files)
+    total = args.trades // args.files * args.files
+
+    start = time.perf_counter()
+    for path in paths:
+        with gzip.open(path, "rb") as f, open(os.devnull, "wb") as sink:
+            shutil.copyfileobj(f, sink, 1 << 20)
+    t_read = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for path in paths:
+        for _ in pd.read_csv(path, usecols=["timestamp", "price", "size", "side"], chunksize=args.chunksize):
+            pass
+    t_parse = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bars = load_trade_bars(paths, args.interval, chunksize=args.chunksize)
+    t_bars = time.perf_counter() - start
+
+    print(f"成交笔数: {total}, 生成K线: {len(bars)}")
+    print(f"{'阶段':<12s} {'耗时(s)':>10s} {'笔/秒':>14s}")
+    for name, elapsed in (("解压", t_read), ("解析csv", t_parse), ("聚合K线", t_bars)):
+        print(f"{name:<12s} {elapsed:>10.2f} {total / elapsed:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+缓存并发压力测试：多进程同时请求同一批 key，验证
+1. 每个 key 只被下载一次（按 key 的跨进程锁生效）；
+2. 所有进程读到的数据完全一致，没有任何一次读取失败（原子写入生效）；
+3. 无锁的并发覆盖写期间，读者也不会读到写了一半的文件。
+
+用法（在 Project_Alpha_Seeking 目录下）：
+    python benchmarks/stress_cache_concurrency.py --processes 32 --keys 4
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from data_processing.cache import CacheManager  # noqa: E402
+
+
+def _make_frame(key: str, rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(zlib.crc32(key.encode()))
+    return pd.DataFrame(rng.standard_normal((rows, 5)), columns=["open", "high", "low", "close", "volume"])
+
+
+def _fetch_worker(cache_dir: str, keys: list, rows: int, log_path: str, queue):
+    """模拟 load_data_xx：加锁 -> 读缓存 -> 未命中则"下载"并写入"""
+    cache = CacheManager(cache_dir)
+    checksums = {}
+    for key in keys:
+        with cache.lock(key):
+            df = cache.get(key)
+            if df is None:
+                time.sleep(0.2)  # 模拟网络下载耗时
+                df = _make_frame(key, rows)
+                with open(log_path, "a") as f:
+                    f.write(f"{key}\n")
+                cache.put(key, df)
+        checksums[key] = float(df.to_numpy().sum())
+    queue.put(checksums)
+
+
+def _writer(cache_dir: str, key: str, rows: int, rounds: int):
+    cache = CacheManager(cache_dir)
+    for i in range(rounds):
+        cache.put(key, _make_frame(f"{key}-{i % 2}", rows))
+
+
+def _reader(cache_dir: str, key: str, rounds: int, queue):
+    cache = CacheManager(cache_dir)
+    failures = 0
+    for _ in range(rounds):
+        path = None
+        for suffix in (".pkl.zst", ".pkl.gz", ".pkl"):
+            if os.path.exists(os.path.join(cache_dir, key + suffix)):
+                path = os.path.join(cache_dir, key + suffix)
+                break
+        if path is None:
+            continue
+        try:
+            pd.read_pickle(path, compression=cache.compression)
+        except Exception:
+            failures += 1
+    queue.put(failures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="缓存并发压力测试")
+    parser.add_argument("--processes", type=int, default=32)
+    parser.add_argument("--keys", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    ctx = mp.get_context("spawn")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        keys = [f"stress_{i}" for i in range(args.keys)]
+        log_path = os.path.join(cache_dir, "fetch_log.txt")
+        queue = ctx.Queue()
+
+        start = time.perf_counter()
+        procs = [ctx.Process(target=_fetch_worker, args=(cache_dir, keys[i % len(keys):] + keys[:i % len(keys)], args.rows, log_path, queue))
+                 for i in range(args.processes)]
+        for p in procs:
+            p.start()
+        results = [queue.get() for _ in procs]
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - start
+
+        with open(log_path) as f:
+            fetched = [line.strip() for line in f]
+        assert sorted(fetched) == sorted(keys), f"存在重复下载: {fetched}"
+        for key in keys:
+            assert len({r[key] for r in results}) == 1, f"{key} 各进程读到的数据不一致"
+        print(f"[通过] {args.processes} 个进程 x {len(keys)} 个 key，每个 key 仅下载 1 次，耗时 {elapsed:.2f}s")
+
+        # 无锁并发覆盖写 + 并发读：验证原子替换
+        writers = [ctx.Process(target=_writer, args=(cache_dir, "overwrite", args.rows, 20)) for _ in range(4)]
+        readers = [ctx.Process(target=_reader, args=(cache_dir, "overwrite", 200, queue)) for _ in range(8)]
+        for p in writers + readers:
+            p.start()
+        failures = sum(queue.get() for _ in readers)
+        for p in writers + readers:
+            p.join()
+        assert failures == 0, f"读到 {failures} 次不完整的缓存文件"
+        print("[通过] 并发覆盖写期间读者未读到任何不完整文件")
+
+
+if __name__ == "__main__":
+    main()
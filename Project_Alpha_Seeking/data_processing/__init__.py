@@ -1,9 +1,42 @@
 """
 data_processing 包：聚合各主流数据源的加载与标准化接口。
+
+各数据源模块按需导入：访问 data_processing.load_data_yf 等属性时才加载对应模块，
+统一入口见 registry.load(provider, symbol, start, end, interval)。
 """
 
-from .yahoo_finance import load_data_yf, flatten_yf_columns, standardize_columns
-from .alpha_vantage import load_data_av, load_data_year
-from .tu_share import load_data_ts, get_ts_data, standardize_ts_columns
-from .bybit import load_data_bybit
+import importlib
+
+from .registry import load, register_provider, available_providers
+
+# 对外导出的名称 -> 所在子模块
+_LAZY_EXPORTS = {
+    "load_data_yf": ".yahoo_finance",
+    "flatten_yf_columns": ".yahoo_finance",
+    "standardize_columns": ".yahoo_finance",
+    "load_data_av": ".alpha_vantage",
+    "load_data_year": ".alpha_vantage",
+    "load_data_ts": ".tu_share",
+    "get_ts_data": ".tu_share",
+    "standardize_ts_columns": ".tu_share",
+    "ingest_daily_by_trade_date": ".tu_share",
+    "load_daily_partition": ".tu_share",
+    "load_data_bybit": ".bybit",
+    "validate_bars": ".validation",
+    "load_trade_bars": ".trades",
+    "iter_trade_bars": ".trades",
+    "get_cache": ".cache",
+    "CacheManager": ".cache",
+    "Catalog": ".catalog",
+}
+
+__all__ = ["load", "register_provider", "available_providers", *_LAZY_EXPORTS]
+
 
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
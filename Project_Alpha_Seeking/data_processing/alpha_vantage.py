@@ -1,9 +1,9 @@
 import datetime
 import pandas as pd
 import os
-import requests
-from datetime import timedelta
-import calendar
+
+from .cache import get_cache
+from .validation import validate_bars
 
 
 def load_data_av(ticker: str, start_date: datetime.datetime, end_date: datetime.datetime, interval: str = "5min", api_key: str = None) -> pd.DataFrame:
@@ -35,81 +35,79 @@ def load_data_av(ticker: str, start_date: datetime.datetime, end_date: datetime.
         if api_key is None:
             raise ValueError("需要提供Alpha Vantage API key")
     
-    # 定义缓存目录和缓存文件名
-    cache_dir = "cache"
-    if not os.path.exists(cache_dir):
-        os.makedirs(cache_dir)
-    
-    cache_filename = f"a v_{ticker}_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}_{interval}.pkl"
-    cache_path = os.path.join(cache_dir, cache_filename)
+    # 缓存键（沿用原有的缓存文件命名）
+    cache = get_cache()
+    cache_key = f"a v_{ticker}_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}_{interval}"
     
-    # 尝试从本地缓存加载数据
-    if os.path.exists(cache_path):
-        try:
-            df = pd.read_pickle(cache_path)
+    with cache.lock(cache_key):
+        # 尝试从本地缓存加载数据
+        df = cache.get(cache_key)
+        if df is not None:
             print("从本地缓存加载数据")
             return df
-        except Exception as e:
-            print("加载缓存失败，准备重新下载数据:", e)
-    
-    # 构建API URL
-    function = "TIME_SERIES_INTRADAY" if interval.endswith("min") else "TIME_SERIES_DAILY"
-    interval_param = interval if interval.endswith("min") else None
-    
-    base_url = "https://www.alphavantage.co/query"
-    params = {
-        "function": function,
-        "symbol": ticker,
-        "apikey": api_key,
-        "outputsize": "full"  # 获取完整数据集
-    }
-    if interval_param:
-        params["interval"] = interval_param
-    
-    # 发送请求获取数据
-    response = requests.get(base_url, params=params)
-    data = response.json()
-    
-    # 解析返回的数据
-    if function == "TIME_SERIES_INTRADAY":
-        time_series_key = f"Time Series ({interval})"
-    else:
-        time_series_key = "Time Series (Daily)"
-    
-    if time_series_key not in data:
-        raise ValueError(f"API返回错误: {data.get('Note', data)}")
-    
-    # 将数据转换为DataFrame
-    df = pd.DataFrame.from_dict(data[time_series_key], orient="index")
-    
-    # 重命名列
-    column_map = {
-        "1. open": "open",
-        "2. high": "high",
-        "3. low": "low",
-        "4. close": "close",
-        "5. volume": "volume"
-    }
-    df.rename(columns=column_map, inplace=True)
-    
-    # 转换数据类型
-    for col in ["open", "high", "low", "close"]:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
-    df["volume"] = pd.to_numeric(df["volume"], errors="coerce")
-    
-    # 设置日期索引
-    df.index = pd.to_datetime(df.index)
-    df = df.sort_index()
     
-    # 过滤日期范围
-    df = df[start_date:end_date]
-    
-    # 保存数据到本地缓存
-    try:
-        df.to_pickle(cache_path)
-        print("数据已保存到本地缓存")
-    except Exception as e:
-        print("保存缓存失败:", e)
+        # 构建API URL
+        function = "TIME_SERIES_INTRADAY" if interval.endswith("min") else "TIME_SERIES_DAILY"
+        interval_param = interval if interval.endswith("min") else None
+    
+        base_url = "https://www.alphavantage.co/query"
+        params = {
+            "function": function,
+            "symbol": ticker,
+            "apikey": api_key,
+            "outputsize": "full"  # 获取完整数据集
+        }
+        if interval_param:
+            params["interval"] = interval_param
+    
+        # 发送请求获取数据（requests 仅在真正联网时导入）
+        import requests
+        response = requests.get(base_url, params=params)
+        data = response.json()
+    
+        # 解析返回的数据
+        if function == "TIME_SERIES_INTRADAY":
+            time_series_key = f"Time Series ({interval})"
+        else:
+            time_series_key = "Time Series (Daily)"
+    
+        if time_series_key not in data:
+            raise ValueError(f"API返回错误: {data.get('Note', data)}")
+    
+        # 将数据转换为DataFrame
+        df = pd.DataFrame.from_dict(data[time_series_key], orient="index")
+    
+        # 重命名列
+        column_map = {
+            "1. open": "open",
+            "2. high": "high",
+            "3. low": "low",
+            "4. close": "close",
+            "5. volume": "volume"
+        }
+        df.rename(columns=column_map, inplace=True)
+    
+        # 转换数据类型
+        for col in ["open", "high", "low", "close"]:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+        df["volume"] = pd.to_numeric(df["volume"], errors="coerce")
+    
+        # 设置日期索引
+        df.index = pd.to_datetime(df.index)
+        df = df.sort_index()
+    
+        # 过滤日期范围
+        df = df[start_date:end_date]
+    
+        # 入库前统一校验与清洗
+        df = validate_bars(df, interval, market="us")
+
+        # 保存数据到本地缓存
+        try:
+            cache.put(cache_key, df, meta={"provider": "av", "symbol": ticker, "interval": interval})
+            print("数据已保存到本地缓存")
+        except Exception as e:
+            print("保存缓存失败:", e)
     
     return df
 
@@ -143,71 +141,69 @@ def load_data_month(ticker: str, month: str, interval: str = "5min", api_key: st
         if api_key is None:
             raise ValueError("需要提供Alpha Vantage API key")
     
-    # 定义缓存目录和缓存文件名
-    cache_dir = "cache"
-    if not os.path.exists(cache_dir):
-        os.makedirs(cache_dir)
+    # 缓存键（沿用原有的缓存文件命名）
+    cache = get_cache()
+    cache_key = f"av_{ticker}_{month}_{interval}"
     
-    cache_filename = f"av_{ticker}_{month}_{interval}.pkl"
-    cache_path = os.path.join(cache_dir, cache_filename)
-    
-    # 尝试从本地缓存加载数据
-    if os.path.exists(cache_path):
-        try:
-            df = pd.read_pickle(cache_path)
+    with cache.lock(cache_key):
+        # 尝试从本地缓存加载数据
+        df = cache.get(cache_key)
+        if df is not None:
             print(f"从本地缓存加载{month}的数据")
             return df
-        except Exception as e:
-            print(f"加载{month}缓存失败，准备重新下载数据:", e)
-    
-    # 构建API URL
-    base_url = "https://www.alphavantage.co/query"
-    params = {
-        "function": "TIME_SERIES_INTRADAY",
-        "symbol": ticker,
-        "interval": interval,
-        "month": month,
-        "outputsize": "full",
-        "apikey": api_key
-    }
-    
-    # 发送请求获取数据
-    response = requests.get(base_url, params=params)
-    data = response.json()
-    
-    # 解析返回的数据
-    time_series_key = f"Time Series ({interval})"
-    if time_series_key not in data:
-        raise ValueError(f"API返回错误: {data.get('Note', data)}")
-    
-    # 将数据转换为DataFrame
-    df = pd.DataFrame.from_dict(data[time_series_key], orient="index")
-    
-    # 重命名列
-    column_map = {
-        "1. open": "open",
-        "2. high": "high",
-        "3. low": "low",
-        "4. close": "close",
-        "5. volume": "volume"
-    }
-    df.rename(columns=column_map, inplace=True)
-    
-    # 转换数据类型
-    for col in ["open", "high", "low", "close"]:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
-    df["volume"] = pd.to_numeric(df["volume"], errors="coerce")
-    
-    # 设置日期索引
-    df.index = pd.to_datetime(df.index)
-    df = df.sort_index()
     
-    # 保存数据到本地缓存
-    try:
-        df.to_pickle(cache_path)
-        print(f"{month}的数据已保存到本地缓存")
-    except Exception as e:
-        print(f"保存{month}缓存失败:", e)
+        # 构建API URL
+        base_url = "https://www.alphavantage.co/query"
+        params = {
+            "function": "TIME_SERIES_INTRADAY",
+            "symbol": ticker,
+            "interval": interval,
+            "month": month,
+            "outputsize": "full",
+            "apikey": api_key
+        }
+    
+        # 发送请求获取数据（requests 仅在真正联网时导入）
+        import requests
+        response = requests.get(base_url, params=params)
+        data = response.json()
+    
+        # 解析返回的数据
+        time_series_key = f"Time Series ({interval})"
+        if time_series_key not in data:
+            raise ValueError(f"API返回错误: {data.get('Note', data)}")
+    
+        # 将数据转换为DataFrame
+        df = pd.DataFrame.from_dict(data[time_series_key], orient="index")
+    
+        # 重命名列
+        column_map = {
+            "1. open": "open",
+            "2. high": "high",
+            "3. low": "low",
+            "4. close": "close",
+            "5. volume": "volume"
+        }
+        df.rename(columns=column_map, inplace=True)
+    
+        # 转换数据类型
+        for col in ["open", "high", "low", "close"]:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+        df["volume"] = pd.to_numeric(df["volume"], errors="coerce")
+    
+        # 设置日期索引
+        df.index = pd.to_datetime(df.index)
+        df = df.sort_index()
+    
+        # 入库前统一校验与清洗
+        df = validate_bars(df, interval, market="us")
+
+        # 保存数据到本地缓存
+        try:
+            cache.put(cache_key, df, meta={"provider": "av", "symbol": ticker, "interval": interval})
+            print(f"{month}的数据已保存到本地缓存")
+        except Exception as e:
+            print(f"保存{month}缓存失败:", e)
     
     return df
 
@@ -242,49 +238,49 @@ def load_data_year(ticker: str, year: int, interval: str = "5min", api_key: str
         if api_key is None:
             raise ValueError("需要提供Alpha Vantage API key")
     
-    # 定义缓存目录和缓存文件名
-    cache_dir = "cache"
-    cache_filename = f"av_{ticker}_{year}_{interval}.pkl"
-    cache_path = os.path.join(cache_dir, cache_filename)
+    # 缓存键（沿用原有的缓存文件命名）
+    cache = get_cache()
+    cache_key = f"av_{ticker}_{year}_{interval}"
     
-    # 尝试从本地缓存加载数据
-    if os.path.exists(cache_path):
-        try:
-            df = pd.read_pickle(cache_path)
+    with cache.lock(cache_key):
+        # 尝试从本地缓存加载数据
+        df = cache.get(cache_key)
+        if df is not None:
             print(f"从本地缓存加载{year}年的数据")
             return df
-        except Exception as e:
-            print(f"加载{year}年缓存失败，准备重新下载数据:", e)
     
-    # 获取每个月的数据
-    monthly_data = []
-    for month in range(1, 13):
-        month_str = f"{year}-{month:02d}"
+        # 获取每个月的数据
+        monthly_data = []
+        for month in range(1, 13):
+            month_str = f"{year}-{month:02d}"
+            try:
+                print(f"获取{month_str}的数据...")
+                df_month = load_data_month(ticker, month_str, interval, api_key)
+                if not df_month.empty:
+                    monthly_data.append(df_month)
+                # Alpha Vantage API有访问频率限制，添加延时
+                import time
+                time.sleep(12)  # 每分钟最多5个请求
+            except Exception as e:
+                print(f"获取{month_str}数据失败: {e}")
+    
+        # 合并所有月份的数据
+        if not monthly_data:
+            print(f"警告：{year}年没有获取到任何数据")
+            return pd.DataFrame()
+    
+        df = pd.concat(monthly_data)
+        df = df.sort_index()
+    
+        # 入库前统一校验与清洗
+        df = validate_bars(df, interval, market="us")
+
+        # 保存数据到本地缓存
         try:
-            print(f"获取{month_str}的数据...")
-            df_month = load_data_month(ticker, month_str, interval, api_key)
-            if not df_month.empty:
-                monthly_data.append(df_month)
-            # Alpha Vantage API有访问频率限制，添加延时
-            import time
-            time.sleep(12)  # 每分钟最多5个请求
+            cache.put(cache_key, df, meta={"provider": "av", "symbol": ticker, "interval": interval})
+            print(f"{year}年的数据已保存到本地缓存")
         except Exception as e:
-            print(f"获取{month_str}数据失败: {e}")
-    
-    # 合并所有月份的数据
-    if not monthly_data:
-        print(f"警告：{year}年没有获取到任何数据")
-        return pd.DataFrame()
-    
-    df = pd.concat(monthly_data)
-    df = df.sort_index()
-    
-    # 保存数据到本地缓存
-    try:
-        df.to_pickle(cache_path)
-        print(f"{year}年的数据已保存到本地缓存")
-    except Exception as e:
-        print(f"保存{year}年缓存失败:", e)
+            print(f"保存{year}年缓存失败:", e)
     
     return df 
 
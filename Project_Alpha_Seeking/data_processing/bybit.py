@@ -1,8 +1,9 @@
 import time
 import pandas as pd
-import requests
 from datetime import datetime
-import os
+
+from .cache import get_cache
+from .validation import validate_bars
 
 def load_data_bybit(
     symbol: str,
@@ -12,84 +13,84 @@ def load_data_bybit(
     category: str = "linear",
 ) -> pd.DataFrame:
     
-     # 定义缓存目录和缓存文件名
-    cache_dir = "cache"
-    if not os.path.exists(cache_dir):
-        os.makedirs(cache_dir)
-    
-    cache_filename = f"a v_{ticker}_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}_{interval}.pkl"
-    cache_path = os.path.join(cache_dir, cache_filename)
+    # 缓存键（沿用原有的缓存文件命名）
+    cache = get_cache()
+    cache_key = f"a v_{symbol}_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}_{interval}"
     
-    # 尝试从本地缓存加载数据
-    if os.path.exists(cache_path):
-        try:
-            df = pd.read_pickle(cache_path)
+    with cache.lock(cache_key):
+        # 尝试从本地缓存加载数据
+        df = cache.get(cache_key)
+        if df is not None:
             print("从本地缓存加载数据")
             return df
-        except Exception as e:
-            print("加载缓存失败，准备重新下载数据:", e)
 
-    if not isinstance(start_date, datetime):
-        start_date = datetime.combine(start_date, datetime.min.time())
-    if not isinstance(end_date, datetime):
-        end_date = datetime.combine(end_date, datetime.max.time())
+        if not isinstance(start_date, datetime):
+            start_date = datetime.combine(start_date, datetime.min.time())
+        if not isinstance(end_date, datetime):
+            end_date = datetime.combine(end_date, datetime.max.time())
 
-    interval_map = {"1d": "D", "240": "240", "60": "60", "30": "30", "15": "15", "5": "5", "1": "1"}
-    if interval not in interval_map:
-        raise ValueError(f"不支持的interval: {interval}")
-    bybit_interval = interval_map[interval]
+        interval_map = {"1d": "D", "240": "240", "60": "60", "30": "30", "15": "15", "5": "5", "1": "1"}
+        if interval not in interval_map:
+            raise ValueError(f"不支持的interval: {interval}")
+        bybit_interval = interval_map[interval]
 
-    url = "https://api.bybit.com/v5/market/kline"
-    limit = 1000
-    all_data = []
-    start_ms = int(start_date.timestamp() * 1000)
-    end_ms = int(end_date.timestamp() * 1000)
-    cur_end = end_ms
+        # requests 仅在真正联网时导入
+        import requests
 
-    while cur_end > start_ms:
-        params = {
-            "category": category,
-            "symbol": symbol,
-            "interval": bybit_interval,
-            "start": start_ms,
-            "end": cur_end,
-            "limit": limit
-        }
-        resp = requests.get(url, params=params)
-        data = resp.json()
-        klines = data.get("result", {}).get("list", [])
-        if not klines:
-            break
-        # 按时间升序
-        klines = sorted(klines, key=lambda x: int(x[0]))
-        all_data.extend(klines)
-        # 用本批次最早K线的时间戳推进
-        earliest_ts = int(klines[0][0])
-        if earliest_ts <= start_ms:
-            break
-        cur_end = earliest_ts - 1
-        if len(klines) < limit:
-            break
-        time.sleep(0.2)
+        url = "https://api.bybit.com/v5/market/kline"
+        limit = 1000
+        all_data = []
+        start_ms = int(start_date.timestamp() * 1000)
+        end_ms = int(end_date.timestamp() * 1000)
+        cur_end = end_ms
 
-    if not all_data:
-        raise ValueError("未获取到任何K线数据")
+        while cur_end > start_ms:
+            params = {
+                "category": category,
+                "symbol": symbol,
+                "interval": bybit_interval,
+                "start": start_ms,
+                "end": cur_end,
+                "limit": limit
+            }
+            resp = requests.get(url, params=params)
+            data = resp.json()
+            klines = data.get("result", {}).get("list", [])
+            if not klines:
+                break
+            # 按时间升序
+            klines = sorted(klines, key=lambda x: int(x[0]))
+            all_data.extend(klines)
+            # 用本批次最早K线的时间戳推进
+            earliest_ts = int(klines[0][0])
+            if earliest_ts <= start_ms:
+                break
+            cur_end = earliest_ts - 1
+            if len(klines) < limit:
+                break
+            time.sleep(0.2)
 
-    df = pd.DataFrame(all_data, columns=[
-        "timestamp", "open", "high", "low", "close", "volume", "turnover"
-    ])
-    df["datetime"] = pd.to_datetime(df["timestamp"].astype(int), unit="ms")
-    df = df.sort_values("datetime").drop_duplicates("datetime").reset_index(drop=True)
-    for col in ["open", "high", "low", "close", "volume"]:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
-    df = df[["datetime", "open", "high", "low", "close", "volume"]]
-    df = df[(df["datetime"] >= start_date) & (df["datetime"] <= end_date)]
+        if not all_data:
+            raise ValueError("未获取到任何K线数据")
 
-    # 保存数据到本地缓存
-    try:
-        df.to_pickle(cache_path)
-        print("数据已保存到本地缓存")
-    except Exception as e:
-        print("保存缓存失败:", e)
+        df = pd.DataFrame(all_data, columns=[
+            "timestamp", "open", "high", "low", "close", "volume", "turnover"
+        ])
+        df["datetime"] = pd.to_datetime(df["timestamp"].astype(int), unit="ms")
+        df = df.sort_values("datetime").drop_duplicates("datetime").reset_index(drop=True)
+        for col in ["open", "high", "low", "close", "volume"]:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+        df = df[["datetime", "open", "high", "low", "close", "volume"]]
+        df = df[(df["datetime"] >= start_date) & (df["datetime"] <= end_date)]
+
+        # 入库前统一校验与清洗
+        df = validate_bars(df, interval, market="crypto").reset_index(drop=True)
+
+        # 保存数据到本地缓存
+        try:
+            cache.put(cache_key, df, meta={"provider": "bybit", "symbol": symbol, "interval": interval})
+            print("数据已保存到本地缓存")
+        except Exception as e:
+            print("保存缓存失败:", e)
 
     return df
\ No newline at end of file
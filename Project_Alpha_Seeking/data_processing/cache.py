@@ -0,0 +1,373 @@
+"""
+本地行情缓存管理。
+
+- 压缩存储：优先使用 zstd（需要安装 zstandard），否则退回 gzip 低压缩级别；
+  读取时按文件后缀自动识别，旧版未压缩的 .pkl 缓存依然可以直接读取。
+- 容量上限：按字节预算淘汰条目，支持 LRU（最近最少使用）与 LFU（最不经常使用）两种策略。
+- 访问日志：每个条目的大小、最近访问时间、命中次数以及全局命中/未命中计数
+  记录在缓存目录下的 SQLite 索引中。
+- 进程安全：写入先落到临时文件再原子重命名，读者永远看不到写了一半的文件；
+  lock(key) 提供按 key 的跨进程文件锁，并行回测时同一份数据只会被一个进程下载，
+  其它进程等待后直接读取结果。
+- 数据目录：每次写入同时在索引中登记数据源、代码、频率、覆盖区间、行数与校验和，
+  按品种查询已有数据见 cache.catalog.find(...)（data_processing.catalog）。
+
+命令行用法（在 Project_Alpha_Seeking 目录下）：
+    python -m data_processing.cache stats
+    python -m data_processing.cache scan
+    python -m data_processing.cache evict --max-bytes 2GB --policy lfu
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+import pandas as pd
+
+from .catalog import Catalog, init_catalog, record_entry
+
+
+DEFAULT_CACHE_DIR = "cache"
+INDEX_FILENAME = "_cache_index.db"
+LOCK_DIRNAME = "_locks"
+
+# 后缀 -> pandas 压缩参数；按读取优先级排列，最后一项为旧版未压缩缓存
+_FORMATS = [
+    (".pkl.zst", {"method": "zstd", "level": 3}),
+    (".pkl.gz", {"method": "gzip", "compresslevel": 1}),
+    (".pkl", None),
+]
+
+_UNITS = {"B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3, "TB": 1024 ** 4}
+
+
+def parse_size(text) -> Optional[int]:
+    """把 "500MB"、"2GB"、"1048576" 这类写法转换为字节数；空值表示不限制"""
+    if text is None or text == "":
+        return None
+    if isinstance(text, (int, float)):
+        return int(text)
+    text = str(text).strip().upper()
+    for unit in sorted(_UNITS, key=len, reverse=True):
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * _UNITS[unit])
+    return int(text)
+
+
+def format_size(n: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024:
+            return f"{n:.1f}{unit}"
+        n /= 1024
+    return f"{n:.1f}TB"
+
+
+if os.name == "nt":
+    import msvcrt
+
+    def _lock_file(f):
+        f.seek(0)
+        while True:
+            try:
+                # LK_LOCK 每秒重试一次、10 次后抛错，这里无限重试直到拿到锁
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+
+    def _unlock_file(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock_file(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+    def _unlock_file(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def atomic_to_pickle(df: pd.DataFrame, path: str, compression=None) -> None:
+    """先写同目录下的临时文件，再用 os.replace 原子替换目标文件"""
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=".pkl")
+    os.close(fd)
+    try:
+        pd.to_pickle(df, tmp_path, compression=compression)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _default_format():
+    """zstd 可用时用 zstd（zstandard 已列入 requirements.txt），否则用 gzip"""
+    try:
+        import zstandard  # noqa: F401
+        return _FORMATS[0]
+    except ImportError:
+        return _FORMATS[1]
+
+
+class CacheManager:
+    """
+    带字节预算与淘汰策略的 DataFrame 缓存。
+
+    Parameters:
+    -----------
+    cache_dir : str
+        缓存目录
+    max_bytes : int
+        缓存总字节预算，为 None 时不淘汰
+    policy : str
+        淘汰策略，"lru" 或 "lfu"
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: Optional[int] = None, policy: str = "lru"):
+        if policy not in ("lru", "lfu"):
+            raise ValueError(f"不支持的淘汰策略: {policy}")
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.suffix, self.compression = _default_format()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._init_index()
+
+    # ------------------------------------------------------------------
+    # 索引（访问日志）
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _connect(self):
+        """打开索引连接，正常退出时提交事务，始终关闭连接"""
+        conn = sqlite3.connect(os.path.join(self.cache_dir, INDEX_FILENAME), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_index(self):
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, file TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created REAL NOT NULL, last_access REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.executemany("INSERT OR IGNORE INTO counters VALUES (?, 0)", [("hits",), ("misses",)])
+            init_catalog(conn)
+
+    @property
+    def catalog(self) -> Catalog:
+        """缓存目录的查询接口"""
+        return Catalog(self)
+
+    def _bump(self, conn, counter: str):
+        conn.execute("UPDATE counters SET value = value + 1 WHERE name = ?", (counter,))
+
+    def _record(self, conn, key: str, filename: str, now: float):
+        size = os.path.getsize(os.path.join(self.cache_dir, filename))
+        conn.execute(
+            "INSERT INTO entries (key, file, size, created, last_access, hits) VALUES (?, ?, ?, ?, ?, 0) "
+            "ON CONFLICT(key) DO UPDATE SET file = excluded.file, size = excluded.size, last_access = excluded.last_access",
+            (key, filename, size, now, now),
+        )
+
+    # ------------------------------------------------------------------
+    # 读写
+    # ------------------------------------------------------------------
+
+    def _find(self, key: str):
+        for suffix, compression in _FORMATS:
+            filename = key + suffix
+            if os.path.exists(os.path.join(self.cache_dir, filename)):
+                return filename, compression
+        return None, None
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """读取缓存，未命中或文件损坏时返回 None"""
+        filename, compression = self._find(key)
+        with self._connect() as conn:
+            if filename is None:
+                self._bump(conn, "misses")
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                conn.execute("DELETE FROM catalog WHERE key = ?", (key,))
+                return None
+            try:
+                df = pd.read_pickle(os.path.join(self.cache_dir, filename), compression=compression)
+            except Exception as e:
+                print("加载缓存失败，准备重新下载数据:", e)
+                self._bump(conn, "misses")
+                return None
+            now = time.time()
+            self._record(conn, key, filename, now)
+            conn.execute("UPDATE entries SET hits = hits + 1 WHERE key = ?", (key,))
+            self._bump(conn, "hits")
+        return df
+
+    @contextmanager
+    def lock(self, key: str):
+        """
+        按 key 加跨进程排它锁。典型用法：
+
+            with cache.lock(cache_key):
+                df = cache.get(cache_key)
+                if df is None:
+                    df = download()
+                    cache.put(cache_key, df)
+
+        第一个进程下载期间，其它进程阻塞在 lock 上，拿到锁后即可命中缓存。
+        """
+        lock_dir = os.path.join(self.cache_dir, LOCK_DIRNAME)
+        os.makedirs(lock_dir, exist_ok=True)
+        with open(os.path.join(lock_dir, key + ".lock"), "a+b") as f:
+            _lock_file(f)
+            try:
+                yield
+            finally:
+                _unlock_file(f)
+
+    def put(self, key: str, df: pd.DataFrame, meta: Optional[dict] = None) -> None:
+        """
+        压缩写入缓存（临时文件 + 原子重命名）并登记到数据目录，超出预算时淘汰旧条目。
+        meta 为 {"provider", "symbol", "interval"}，为 None 时从 key 按旧命名规则解析
+        """
+        filename = key + self.suffix
+        atomic_to_pickle(df, os.path.join(self.cache_dir, filename), compression=self.compression)
+        # 同一 key 的其它格式（如旧版 .pkl）已过期，删除以免占用空间
+        for suffix, _ in _FORMATS:
+            if suffix != self.suffix:
+                stale = os.path.join(self.cache_dir, key + suffix)
+                if os.path.exists(stale):
+                    os.remove(stale)
+        with self._connect() as conn:
+            self._record(conn, key, filename, time.time())
+            size = conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()[0]
+            record_entry(conn, key, filename, size, df, meta)
+        self.evict(keep=key)
+
+    def evict(self, max_bytes: Optional[int] = None, keep: Optional[str] = None) -> list:
+        """按淘汰策略删除条目直到总大小不超过预算，返回被删除的 key"""
+        budget = self.max_bytes if max_bytes is None else max_bytes
+        if budget is None:
+            return []
+        order = "last_access ASC" if self.policy == "lru" else "hits ASC, last_access ASC"
+        evicted = []
+        with self._connect() as conn:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= budget:
+                return []
+            for key, filename, size in conn.execute(f"SELECT key, file, size FROM entries ORDER BY {order}").fetchall():
+                if total <= budget:
+                    break
+                if key == keep:
+                    continue
+                path = os.path.join(self.cache_dir, filename)
+                if os.path.exists(path):
+                    os.remove(path)
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                conn.execute("DELETE FROM catalog WHERE key = ?", (key,))
+                total -= size
+                evicted.append(key)
+        return evicted
+
+    def scan(self) -> int:
+        """
+        把目录中尚未登记的缓存文件（如旧版 .pkl）补登记到索引，返回新增条目数。
+        只登记大小与访问时间，不读取文件；补录数据目录见 data_processing.catalog.migrate
+        """
+        added = 0
+        with self._connect() as conn:
+            known = {row[0] for row in conn.execute("SELECT file FROM entries")}
+            for filename in sorted(os.listdir(self.cache_dir)):
+                if filename in known or filename.startswith(".tmp_"):
+                    continue
+                for suffix, _ in _FORMATS:
+                    if filename.endswith(suffix):
+                        path = os.path.join(self.cache_dir, filename)
+                        self._record(conn, filename[:-len(suffix)], filename, os.path.getmtime(path))
+                        added += 1
+                        break
+        return added
+
+    def clear(self) -> None:
+        """删除全部缓存条目并重置计数"""
+        with self._connect() as conn:
+            for (filename,) in conn.execute("SELECT file FROM entries").fetchall():
+                path = os.path.join(self.cache_dir, filename)
+                if os.path.exists(path):
+                    os.remove(path)
+            conn.execute("DELETE FROM entries")
+            conn.execute("DELETE FROM catalog")
+            conn.execute("UPDATE counters SET value = 0")
+
+    def stats(self) -> dict:
+        """缓存使用情况与命中率"""
+        with self._connect() as conn:
+            entries, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+            counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "policy": self.policy,
+            "hits": counters["hits"],
+            "misses": counters["misses"],
+            "hit_rate": counters["hits"] / lookups if lookups else 0.0,
+        }
+
+
+_MANAGERS = {}
+
+
+def get_cache(cache_dir: str = DEFAULT_CACHE_DIR) -> CacheManager:
+    """
+    返回缓存目录对应的共享 CacheManager。
+    预算与策略可通过环境变量 ALPHA_CACHE_MAX_BYTES（如 "2GB"）与 ALPHA_CACHE_POLICY 配置。
+    """
+    path = os.path.abspath(cache_dir)
+    manager = _MANAGERS.get(path)
+    if manager is None:
+        manager = CacheManager(
+            cache_dir,
+            max_bytes=parse_size(os.getenv("ALPHA_CACHE_MAX_BYTES")),
+            policy=os.getenv("ALPHA_CACHE_POLICY", "lru"),
+        )
+        _MANAGERS[path] = manager
+    return manager
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="本地行情缓存管理")
+    parser.add_argument("command", choices=["stats", "scan", "evict", "clear"])
+    parser.add_argument("--dir", default=DEFAULT_CACHE_DIR, help="缓存目录")
+    parser.add_argument("--max-bytes", default=os.getenv("ALPHA_CACHE_MAX_BYTES"), help="字节预算，如 500MB、2GB")
+    parser.add_argument("--policy", default=os.getenv("ALPHA_CACHE_POLICY", "lru"), choices=["lru", "lfu"])
+    args = parser.parse_args(argv)
+
+    cache = CacheManager(args.dir, max_bytes=parse_size(args.max_bytes), policy=args.policy)
+    if args.command == "scan":
+        print(f"新登记 {cache.scan()} 个缓存文件")
+    elif args.command == "evict":
+        evicted = cache.evict()
+        print(f"淘汰 {len(evicted)} 个条目")
+    elif args.command == "clear":
+        cache.clear()
+        print("缓存已清空")
+
+    s = cache.stats()
+    budget = format_size(s["max_bytes"]) if s["max_bytes"] else "不限"
+    print(f"条目数: {s['entries']}  占用: {format_size(s['bytes'])} / {budget}  策略: {s['policy']}")
+    print(f"命中: {s['hits']}  未命中: {s['misses']}  命中率: {s['hit_rate']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
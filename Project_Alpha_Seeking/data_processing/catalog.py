@@ -0,0 +1,306 @@
+"""
+缓存目录（catalog）：记录缓存中每份数据是什么。
+
+缓存文件名是各加载函数各自拼出来的 key（yf_{ticker}_{start}_{end}_{interval}、
+av_{ticker}_{month}_{interval}、ts_{code}-{start}-{end}-{freq}、ts_win_{code}-...，以及 load_data_av /
+load_data_bybit 共用的 "a v_" 前缀），要找某个品种已有的数据只能按命名规则去猜，
+覆盖区间重叠的文件也无从发现。
+
+catalog 与缓存索引存放在同一个 SQLite 文件中，每个条目记录数据源、代码、频率、
+实际覆盖的起止时间、行数、文件字节数和内容校验和；CacheManager.put 每次写入时同步更新，
+淘汰 / 清空时同步删除。查询按 (symbol, freq) 建索引：
+
+    get_cache().catalog.find("600519.SH", "30min")
+    get_cache().catalog.covering("BTCUSDT", "1h", "2024-01-01", "2024-06-30")
+
+已有的缓存文件用一次性迁移补录（读取每个文件并从旧文件名解析元数据）：
+    python -m data_processing.catalog migrate
+    python -m data_processing.catalog find 600519.SH --interval 30min
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import time
+from typing import Optional
+
+import pandas as pd
+
+from .validation import _timestamps, interval_to_freq
+
+
+# Bybit 的 interval 写法（load_data_bybit 的 interval_map），用于区分 "a v_" 前缀的两个来源
+_BYBIT_INTERVALS = {"1d", "240", "60", "30", "15", "5", "1"}
+
+_DATE8 = r"\d{8}"
+
+# (数据源, 文件名 key 的正则)；按顺序匹配，symbol 用非贪婪匹配以容纳代码中的下划线
+_KEY_PATTERNS = [
+    ("yf", re.compile(rf"^yf_(?P<symbol>.+?)_{_DATE8}_{_DATE8}_(?P<interval>[^_]+)$")),
+    ("yf", re.compile(r"^yf_(?P<symbol>.+?)_\d{4}_\d{4}_(?P<interval>1d)$")),
+    ("yf", re.compile(r"^yf_(?P<symbol>.+?)_\d{4}(?:\d{2})?_(?P<interval>1d)$")),
+    ("av", re.compile(r"^av_(?P<symbol>.+?)_\d{4}(?:-\d{2})?_(?P<interval>[^_]+)$")),
+    ("a v", re.compile(rf"^a v_(?P<symbol>.+?)_{_DATE8}_{_DATE8}_(?P<interval>[^_]+)$")),
+    ("ts", re.compile(rf"^ts_(?P<symbol>.+?)_{_DATE8}_{_DATE8}_(?P<interval>[^_]+)$")),
+    # 分钟线整区间 / 窗口缓存：起止日期中带 "-"，tushare 代码本身不含 "-"
+    ("ts", re.compile(r"^ts_win_(?P<symbol>[^-_]+)-.+-(?P<interval>[^-]+)$")),
+    ("ts", re.compile(r"^ts_(?P<symbol>[^-_]+)-.+-(?P<interval>[^-]+)$")),
+]
+
+
+def parse_cache_key(key: str) -> Optional[dict]:
+    """
+    从旧的缓存文件名（不含后缀）解析数据源、代码与频率，无法识别时返回 None。
+    "a v_" 前缀被 Alpha Vantage 与 Bybit 共用，按 interval 的写法区分。
+    """
+    for provider, pattern in _KEY_PATTERNS:
+        m = pattern.match(key)
+        if m is None:
+            continue
+        interval = m.group("interval")
+        if provider == "a v":
+            provider = "bybit" if interval in _BYBIT_INTERVALS else "av"
+        return {"provider": provider, "symbol": m.group("symbol"), "interval": interval}
+    return None
+
+
+def normalize_interval(interval) -> Optional[str]:
+    """
+    各数据源的频率写法统一为一种（"30" / "30m" / "30min" -> "30min"，"1d" / "D" / "daily" -> "1D"），
+    使查询不必关心数据来自哪个数据源
+    """
+    if interval is None:
+        return None
+    delta = interval_to_freq(str(interval))
+    if delta is None:
+        return str(interval).lower()
+    if delta % pd.Timedelta(days=1) == pd.Timedelta(0):
+        return f"{delta.days}D"
+    if delta % pd.Timedelta(minutes=1) == pd.Timedelta(0):
+        return f"{int(delta / pd.Timedelta(minutes=1))}min"
+    return f"{int(delta.total_seconds())}s"
+
+
+def content_checksum(df: pd.DataFrame) -> str:
+    """数据内容的校验和，与 backtest.result_store.data_fingerprint 的定义相同"""
+    hashed = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    return hashlib.sha1(hashed.tobytes()).hexdigest()
+
+
+def describe(df: pd.DataFrame) -> dict:
+    """数据的实际覆盖区间与行数"""
+    stamps = _timestamps(df) if len(df) else None
+    if stamps is None or len(stamps) == 0:
+        return {"start": None, "end": None, "rows": len(df)}
+    stamps = pd.to_datetime(stamps)
+    return {
+        "start": stamps.min().strftime("%Y-%m-%d %H:%M:%S"),
+        "end": stamps.max().strftime("%Y-%m-%d %H:%M:%S"),
+        "rows": len(df),
+    }
+
+
+def init_catalog(conn) -> None:
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS catalog ("
+        "key TEXT PRIMARY KEY, file TEXT NOT NULL, provider TEXT, symbol TEXT, interval TEXT, freq TEXT, "
+        "start TEXT, end TEXT, rows INTEGER NOT NULL, bytes INTEGER NOT NULL, checksum TEXT NOT NULL, "
+        "updated REAL NOT NULL)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_catalog_symbol ON catalog (symbol, freq, start)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_catalog_provider ON catalog (provider, symbol)")
+
+
+def record_entry(conn, key: str, filename: str, size: int, df: pd.DataFrame, meta: Optional[dict] = None) -> None:
+    """
+    写入或覆盖一个 catalog 条目。
+
+    Parameters:
+    -----------
+    conn : sqlite3.Connection
+        缓存索引的连接（与 entries 表在同一事务中更新）
+    key, filename : str
+        缓存 key 与实际文件名
+    size : int
+        文件字节数
+    df : pd.DataFrame
+        写入的数据
+    meta : dict
+        {"provider", "symbol", "interval"}，加载函数写缓存时传入；
+        为 None 时从 key 按旧命名规则解析，解析不出时三项留空
+    """
+    meta = meta if meta is not None else (parse_cache_key(key) or {})
+    coverage = describe(df)
+    conn.execute(
+        "INSERT OR REPLACE INTO catalog (key, file, provider, symbol, interval, freq, start, end, rows, bytes, "
+        "checksum, updated) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (key, filename, meta.get("provider"), meta.get("symbol"), meta.get("interval"),
+         normalize_interval(meta.get("interval")), coverage["start"], coverage["end"], coverage["rows"],
+         size, content_checksum(df), time.time()),
+    )
+
+
+class Catalog:
+    """
+    缓存目录的查询接口，通常通过 CacheManager.catalog 获得。
+
+    Parameters:
+    -----------
+    cache : CacheManager
+        所属的缓存
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def find(self, symbol: str = None, interval: str = None, provider: str = None, start=None, end=None) -> pd.DataFrame:
+        """
+        查询缓存中已有的数据。
+
+        Parameters:
+        -----------
+        symbol : str
+            代码，如 "600519.SH"、"BTCUSDT"
+        interval : str
+            频率，任一数据源的写法均可（查询前统一换算）
+        provider : str
+            数据源简称
+        start, end : str or datetime
+            只返回与 [start, end] 有重叠的条目
+
+        Returns:
+        --------
+        pd.DataFrame
+            每行一个缓存条目，按 symbol、freq、start 排序
+        """
+        clauses, args = [], []
+        for column, value in (("symbol", symbol), ("freq", normalize_interval(interval)), ("provider", provider)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                args.append(value)
+        if start is not None:
+            clauses.append("end >= ?")
+            args.append(pd.Timestamp(start).strftime("%Y-%m-%d %H:%M:%S"))
+        if end is not None:
+            clauses.append("start <= ?")
+            args.append(pd.Timestamp(end).strftime("%Y-%m-%d %H:%M:%S"))
+        sql = "SELECT * FROM catalog"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY symbol, freq, start"
+        with self.cache._connect() as conn:
+            return pd.read_sql_query(sql, conn, params=args)
+
+    def covering(self, symbol: str, interval: str, start, end) -> pd.DataFrame:
+        """
+        与 [start, end] 有重叠的同一品种、同一频率的全部条目（可能来自不同数据源、不同加载函数），
+        附带 overlap 列：该条目覆盖了所查区间的比例
+        """
+        df = self.find(symbol, interval, start=start, end=end)
+        if df.empty:
+            return df.assign(overlap=pd.Series(dtype=float))
+        lo, hi = pd.Timestamp(start), pd.Timestamp(end)
+        span = max((hi - lo).total_seconds(), 1.0)
+        begin = pd.to_datetime(df["start"]).clip(lower=lo)
+        finish = pd.to_datetime(df["end"]).clip(upper=hi)
+        return df.assign(overlap=((finish - begin).dt.total_seconds() / span).clip(0.0, 1.0))
+
+    def summary(self) -> pd.DataFrame:
+        """按 (数据源, 代码, 频率) 汇总条目数、覆盖区间、行数与占用字节"""
+        sql = (
+            "SELECT provider, symbol, freq, COUNT(*) AS entries, MIN(start) AS start, MAX(end) AS end, "
+            "SUM(rows) AS rows, SUM(bytes) AS bytes FROM catalog GROUP BY provider, symbol, freq "
+            "ORDER BY provider, symbol, freq"
+        )
+        with self.cache._connect() as conn:
+            return pd.read_sql_query(sql, conn)
+
+
+def migrate(cache, force: bool = False) -> dict:
+    """
+    一次性把缓存目录中已有的文件补录进 catalog：逐个读取文件，从旧文件名解析元数据。
+    已经在 catalog 中且文件未变（文件名与大小相同）的条目跳过，force=True 时全部重录。
+
+    Returns:
+    --------
+    dict
+        added：新录入条目数，skipped：跳过数，unparsed：无法从文件名识别元数据的 key，
+        failed：读取失败的文件
+    """
+    from .cache import _FORMATS
+
+    result = {"added": 0, "skipped": 0, "unparsed": [], "failed": []}
+    # 先补登记访问索引，迁移后的条目同样参与淘汰（淘汰时一并删除 catalog 条目）
+    cache.scan()
+    with cache._connect() as conn:
+        known = {row[0]: (row[1], row[2]) for row in conn.execute("SELECT key, file, bytes FROM catalog")}
+    for filename in sorted(os.listdir(cache.cache_dir)):
+        if filename.startswith(".tmp_"):
+            continue
+        for suffix, compression in _FORMATS:
+            if filename.endswith(suffix):
+                break
+        else:
+            continue
+        key = filename[:-len(suffix)]
+        path = os.path.join(cache.cache_dir, filename)
+        size = os.path.getsize(path)
+        if not force and known.get(key) == (filename, size):
+            result["skipped"] += 1
+            continue
+        try:
+            df = pd.read_pickle(path, compression=compression)
+        except Exception as e:
+            result["failed"].append(f"{filename}: {e}")
+            continue
+        if not isinstance(df, pd.DataFrame):
+            continue
+        meta = parse_cache_key(key)
+        if meta is None:
+            result["unparsed"].append(key)
+        with cache._connect() as conn:
+            record_entry(conn, key, filename, size, df, meta)
+        result["added"] += 1
+    return result
+
+
+def main(argv=None):
+    from .cache import DEFAULT_CACHE_DIR, CacheManager
+
+    parser = argparse.ArgumentParser(description="缓存目录（catalog）")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_migrate = sub.add_parser("migrate", help="补录已有的缓存文件")
+    p_migrate.add_argument("--force", action="store_true", help="全部重新读取并录入")
+    p_find = sub.add_parser("find", help="查询某个品种已有的数据")
+    p_find.add_argument("symbol", nargs="?")
+    p_find.add_argument("--interval")
+    p_find.add_argument("--provider")
+    p_find.add_argument("--start")
+    p_find.add_argument("--end")
+    sub.add_parser("summary", help="按品种与频率汇总")
+    parser.add_argument("--dir", default=DEFAULT_CACHE_DIR, help="缓存目录")
+    args = parser.parse_args(argv)
+
+    catalog = CacheManager(args.dir).catalog
+    if args.command == "migrate":
+        result = migrate(catalog.cache, force=args.force)
+        print(f"新录入 {result['added']} 个，跳过 {result['skipped']} 个，"
+              f"无法识别文件名 {len(result['unparsed'])} 个，读取失败 {len(result['failed'])} 个")
+        for key in result["unparsed"]:
+            print(f"  无法识别: {key}")
+        for line in result["failed"]:
+            print(f"  读取失败: {line}")
+        return
+    if args.command == "find":
+        df = catalog.find(args.symbol, args.interval, args.provider, args.start, args.end)
+        columns = ["provider", "symbol", "interval", "start", "end", "rows", "bytes", "file"]
+    else:
+        df = catalog.summary()
+        columns = list(df.columns)
+    with pd.option_context("display.width", 200, "display.max_columns", None, "display.max_rows", None):
+        print(df[columns].to_string(index=False) if not df.empty else "没有匹配的条目")
+
+
+if __name__ == "__main__":
+    main()
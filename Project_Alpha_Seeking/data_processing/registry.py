@@ -0,0 +1,110 @@
+"""
+数据源注册表：按需（惰性）加载各数据源模块，并提供统一的 load 入口。
+
+注册时只记录 "模块路径 + 函数名"，真正的 import 推迟到第一次调用；
+各数据源模块内部又把 yfinance / tushare / requests 等重量级 SDK
+推迟到真正联网下载时才导入，因此只读本地缓存的回测进程不会为这些 SDK 付出导入开销。
+"""
+
+import datetime
+import importlib
+from typing import Callable, Dict, Optional, Tuple
+
+
+# provider -> (模块路径, 适配函数名, 默认频率)
+_PROVIDERS: Dict[str, Tuple[str, str, str]] = {}
+# 已解析的适配函数缓存，避免重复 import / getattr
+_RESOLVED: Dict[str, Callable] = {}
+
+
+def register_provider(name: str, module: str, func: str, default_interval: str) -> None:
+    """
+    注册一个数据源。只记录位置信息，不会导入对应模块。
+
+    Parameters:
+    -----------
+    name : str
+        数据源简称，例如 "yf"
+    module : str
+        模块路径，例如 "data_processing.yahoo_finance"
+    func : str
+        模块内统一签名的加载函数名 (symbol, start, end, interval, **kwargs)
+    default_interval : str
+        调用方未指定 interval 时使用的默认频率
+    """
+    _PROVIDERS[name] = (module, func, default_interval)
+    _RESOLVED.pop(name, None)
+
+
+def available_providers() -> list:
+    """返回已注册的数据源简称列表"""
+    return sorted(_PROVIDERS)
+
+
+def get_loader(provider: str) -> Callable:
+    """解析（首次调用时导入）并返回数据源的加载函数"""
+    if provider not in _PROVIDERS:
+        raise ValueError(f"未注册的数据源: {provider}，可选值: {available_providers()}")
+    loader = _RESOLVED.get(provider)
+    if loader is None:
+        module, func, _ = _PROVIDERS[provider]
+        loader = getattr(importlib.import_module(module), func)
+        _RESOLVED[provider] = loader
+    return loader
+
+
+def load(provider: str, symbol: str, start: datetime.datetime, end: datetime.datetime, interval: Optional[str] = None, **kwargs):
+    """
+    统一的数据加载入口。
+
+    Parameters:
+    -----------
+    provider : str
+        数据源简称："yf" / "av" / "ts" / "bybit"
+    symbol : str
+        股票/合约代码
+    start, end : datetime
+        起止日期
+    interval : str
+        数据频率，取值沿用各数据源自己的写法（如 yf 的 "5m"、av 的 "5min"、
+        ts 的 "daily"/"30min"、bybit 的 "1d"/"30"），为 None 时使用数据源默认值
+    **kwargs :
+        透传给底层加载函数的其它参数（如 api_key）
+    """
+    loader = get_loader(provider)
+    if interval is None:
+        interval = _PROVIDERS[provider][2]
+    return loader(symbol, start, end, interval, **kwargs)
+
+
+# ---------------------------------------------------------------------------
+# 各数据源的统一签名适配函数
+# ---------------------------------------------------------------------------
+
+def _load_yf(symbol, start, end, interval, **kwargs):
+    from .yahoo_finance import load_data_yf
+    return load_data_yf(symbol, start, end, interval=interval, **kwargs)
+
+
+def _load_av(symbol, start, end, interval, **kwargs):
+    from .alpha_vantage import load_data_av
+    return load_data_av(symbol, start, end, interval=interval, **kwargs)
+
+
+def _load_ts(symbol, start, end, interval, **kwargs):
+    from .tu_share import load_data_ts, get_ts_data
+    if interval in ("daily", "weekly", "monthly"):
+        return load_data_ts(symbol, start, end, freq=interval, **kwargs)
+    # 分钟线走 pro_bar 接口，日期为字符串
+    return get_ts_data(symbol, start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'), freq=interval, **kwargs)
+
+
+def _load_bybit(symbol, start, end, interval, **kwargs):
+    from .bybit import load_data_bybit
+    return load_data_bybit(symbol, start, end, interval=interval, **kwargs)
+
+
+register_provider("yf", __name__, "_load_yf", "1d")
+register_provider("av", __name__, "_load_av", "5min")
+register_provider("ts", __name__, "_load_ts", "daily")
+register_provider("bybit", __name__, "_load_bybit", "1d")
@@ -1,8 +1,14 @@
 # -*- coding: utf-8 -*-
 import datetime
-import tushare as ts
 import pandas as pd
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from .cache import atomic_to_pickle, get_cache
+from .validation import validate_bars
 
 
 def load_data_ts(ts_code: str, start_date: datetime.datetime, end_date: datetime.datetime, freq: str = "D", api_key: str = None) -> pd.DataFrame:
@@ -21,58 +27,166 @@ def load_data_ts(ts_code: str, start_date: datetime.datetime, end_date: datetime
         api_key = os.getenv("TUSHARE_API_KEY")
         if api_key is None:
             raise ValueError("需要提供tushare API key")
-    
-    pro = ts.pro_api(api_key)
 
-    cache_dir = "cache"
-    if not os.path.exists(cache_dir):
-        os.makedirs(cache_dir)
-    cache_filename = f"ts_{ts_code}_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}_{freq}.pkl"
-    cache_path = os.path.join(cache_dir, cache_filename)
+    cache = get_cache()
+    cache_key = f"ts_{ts_code}_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}_{freq}"
 
-    # 尝试从本地缓存加载数据
-    if os.path.exists(cache_path):
-        try:
-            df = pd.read_pickle(cache_path)
+    with cache.lock(cache_key):
+        # 尝试从本地缓存加载数据
+        df = cache.get(cache_key)
+        if df is not None:
             print("从本地缓存加载数据")
             return df
+
+        # tushare 仅在真正联网时导入
+        import tushare as ts
+        pro = ts.pro_api(api_key)
+
+        # tushare日期格式为YYYYMMDD字符串
+        start_str = start_date.strftime('%Y%m%d')
+        end_str = end_date.strftime('%Y%m%d')
+
+        # tushare接口
+        if freq == "daily":
+            df = pro.daily(ts_code=ts_code, start_date=start_str, end_date=end_str)
+        elif freq == "weekly":
+            df = pro.weekly(ts_code=ts_code, start_date=start_str, end_date=end_str)
+        elif freq == "monthly":
+            df = pro.monthly(ts_code=ts_code, start_date=start_str, end_date=end_str)
+        else:
+            raise ValueError("不支持此freq")
+
+        if df is not None and not df.empty:
+            df.sort_values('trade_date', inplace=True)
+            df.reset_index(drop=True, inplace=True)
+        else:
+            df = pd.DataFrame()
+
+        # 入库前统一校验与清洗；日线对照交易日历统计整日缺失
+        trading_days = _trade_dates(pro, start_date, end_date) if freq == "daily" and not df.empty else None
+        df = validate_bars(df, freq, market="cn", trading_days=trading_days)
+
+        # 保存数据到本地缓存
+        try:
+            cache.put(cache_key, df, meta={"provider": "ts", "symbol": ts_code, "interval": freq})
+            print("数据已保存到本地缓存")
         except Exception as e:
-            print("加载缓存失败，准备重新下载数据:", e)
+            print("保存缓存失败:", e)
 
-    # tushare日期格式为YYYYMMDD字符串
-    start_str = start_date.strftime('%Y%m%d')
-    end_str = end_date.strftime('%Y%m%d')
+    return df
+
+# pro_bar 单次调用最多返回的行数，超出部分会被静默截断
+PRO_BAR_ROW_LIMIT = 8000
+# A股每个交易日的分钟K线根数（9:30-11:30, 13:00-15:00，1min 含开盘集合竞价 1 根）
+BARS_PER_DAY = {"1min": 241, "5min": 48, "15min": 16, "30min": 8, "60min": 4}
+
+
+class RateLimiter:
+    """线程安全的简单限速器：保证相邻两次调用间隔不小于 60 / calls_per_minute 秒"""
+
+    def __init__(self, calls_per_minute: int):
+        self.interval = 60.0 / calls_per_minute
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _split_ts_windows(start_date: str, end_date: str, freq: str, row_limit: int = PRO_BAR_ROW_LIMIT) -> list:
+    """
+    把 [start_date, end_date] 切分为若干自然日窗口，保证每个窗口的K线数不超过 row_limit。
+    自然日数 >= 交易日数，所以按自然日切分是保守安全的。
+    """
+    days_per_window = max(1, row_limit // BARS_PER_DAY[freq])
+    start = pd.Timestamp(start_date).normalize()
+    end = pd.Timestamp(end_date).normalize()
+    windows = []
+    while start <= end:
+        window_end = min(start + pd.Timedelta(days=days_per_window - 1), end)
+        windows.append((start.strftime('%Y-%m-%d'), window_end.strftime('%Y-%m-%d')))
+        start = window_end + pd.Timedelta(days=1)
+    return windows
+
+
+def _fetch_ts_window(ts, pro, ts_code, window_start, window_end, freq, limiter) -> pd.DataFrame:
+    """下载单个窗口的分钟线；已完结的窗口单独缓存，便于中断后续传"""
+    cache = get_cache()
+    # 窗口使用独立的 key 前缀：整个区间只有一个窗口时，窗口 key 与 get_ts_data 持有锁的
+    # 整区间 key 相同，再次对同一 key 加锁（另开文件句柄的 flock）会永远阻塞
+    cache_key = f"ts_win_{ts_code}-{window_start}-{window_end}-{freq}"
+    with cache.lock(cache_key):
+        df = cache.get(cache_key)
+        if df is not None:
+            return df
+
+        limiter.wait()
+        df = ts.pro_bar(
+            ts_code=ts_code,
+            api=pro,
+            start_date=f"{window_start} 00:00:00",
+            end_date=f"{window_end} 23:59:59",
+            freq=freq,
+            asset='E',
+            adj='qfq',
+        )
+        if df is None:
+            df = pd.DataFrame()
+        if len(df) >= PRO_BAR_ROW_LIMIT:
+            print(f"警告：窗口 {window_start}~{window_end} 返回 {len(df)} 行，可能已被截断")
 
-    # tushare接口
-    if freq == "daily":
-        df = pro.daily(ts_code=ts_code, start_date=start_str, end_date=end_str)
-    elif freq == "weekly":
-        df = pro.weekly(ts_code=ts_code, start_date=start_str, end_date=end_str)
-    elif freq == "monthly":
-        df = pro.monthly(ts_code=ts_code, start_date=start_str, end_date=end_str)
-    else:
-        raise ValueError("不支持此freq")
-
-    if df is not None and not df.empty:
-        df.sort_values('trade_date', inplace=True)
-        df.reset_index(drop=True, inplace=True)
-    else:
-        df = pd.DataFrame()
-
-    # 保存数据到本地缓存
+        # 窗口结束日早于今天才缓存，避免把盘中不完整的数据固化下来
+        if pd.Timestamp(window_end) < pd.Timestamp.today().normalize():
+            try:
+                cache.put(cache_key, df, meta={"provider": "ts", "symbol": ts_code, "interval": freq})
+            except Exception as e:
+                print("保存窗口缓存失败:", e)
+    return df
+
+
+def _trade_dates(pro, start_date, end_date) -> Optional[list]:
+    """上交所交易日历（YYYYMMDD 列表），获取失败时返回 None，只跳过整日缺失检查"""
     try:
-        df.to_pickle(cache_path)
-        print("数据已保存到本地缓存")
+        cal = pro.trade_cal(
+            exchange='SSE',
+            start_date=pd.Timestamp(start_date).strftime('%Y%m%d'),
+            end_date=pd.Timestamp(end_date).strftime('%Y%m%d'),
+            is_open='1',
+        )
     except Exception as e:
-        print("保存缓存失败:", e)
+        print("获取交易日历失败:", e)
+        return None
+    return [] if cal is None or cal.empty else sorted(cal['cal_date'].astype(str))
 
-    return df
 
-def get_ts_data(ts_code, start_date, end_date, freq='30min', api_key: str = None): 
+def check_ts_completeness(pro, df: pd.DataFrame, start_date: str, end_date: str, freq: str, trade_dates: list = None) -> dict:
+    """对比实际返回的K线数与交易日历推算的应有K线数；trade_dates 为已获取的交易日历，避免重复请求"""
+    if trade_dates is None:
+        trade_dates = _trade_dates(pro, start_date, end_date) or []
+    sessions = len(trade_dates)
+    expected = sessions * BARS_PER_DAY[freq]
+    report = {
+        "sessions": sessions,
+        "expected_bars": expected,
+        "actual_bars": len(df),
+        "missing_bars": max(expected - len(df), 0),
+    }
+    if report["missing_bars"]:
+        print(f"警告：应有 {expected} 根K线，实际 {len(df)} 根，缺少 {report['missing_bars']} 根（可能含停牌）")
+    return report
+
+
+def get_ts_data(ts_code, start_date, end_date, freq='30min', api_key: str = None, max_workers: int = 4, calls_per_minute: int = 100): 
     """
     使用 tushare 下载指定股票在特定时间区间和频率的行情数据。
     实现本地缓存功能，避免重复下载。
-    支持日线（D）、周线（W）、月线（M）。
+    pro_bar 单次调用有行数上限，长区间会按行数安全的窗口切分，
+    在有界线程池中限速并发下载，每个窗口单独缓存，最后合并去重并做完整性检查。
     freq : str
         数据频率，可选值：
         - "1min" : 1分钟
@@ -80,55 +194,65 @@ def get_ts_data(ts_code, start_date, end_date, freq='30min', api_key: str = None
         - "15min" : 15分钟
         - "30min" : 30分钟
         - "60min" : 60分钟
+    max_workers : int
+        并发下载的线程数
+    calls_per_minute : int
+        每分钟最多调用 pro_bar 的次数（按账号积分权限设置）
     """
+    if freq not in BARS_PER_DAY:
+        raise ValueError(f"不支持此freq: {freq}")
     
-    cache_dir = "cache"
-    if not os.path.exists(cache_dir):
-        os.makedirs(cache_dir)
-    cache_filename = f"ts_{ts_code}-{start_date}-{end_date}-{freq}.pkl"
-    cache_path = os.path.join(cache_dir, cache_filename)
-
-    # 尝试从本地缓存加载数据
-    if os.path.exists(cache_path):
-        try:
-            df = pd.read_pickle(cache_path)
+    cache = get_cache()
+    cache_key = f"ts_{ts_code}-{start_date}-{end_date}-{freq}"
+
+    with cache.lock(cache_key):
+        # 尝试从本地缓存加载数据
+        df = cache.get(cache_key)
+        if df is not None:
             print("从本地缓存加载数据")
             return df
-        except Exception as e:
-            print("加载缓存失败，准备重新下载数据:", e)
     
-    # 设置Tushare token
-    if api_key is None:
-        api_key = os.getenv("TUSHARE_API_KEY")
+        # 设置Tushare token
         if api_key is None:
-            raise ValueError("需要提供tushare API key")
+            api_key = os.getenv("TUSHARE_API_KEY")
+            if api_key is None:
+                raise ValueError("需要提供tushare API key")
     
-    pro = ts.pro_api(api_key)
+        import tushare as ts
+        pro = ts.pro_api(api_key)
 
-    
-    # 获取数据
-    df = ts.pro_bar( 
-        ts_code=ts_code,  
-        start_date=start_date, 
-        end_date=end_date,  
-        freq=freq,    
-        asset='E',     
-        adj='qfq',     
-    )  
-
-    if df is None or df.empty: 
-        print("从 Tushare 获取的数据为空，请检查权限或参数设置。")  
-        return None  
-
-    # 创建目录（如果不存在）
-    os.makedirs('./data', exist_ok=True)  
-
-    # 保存数据到本地缓存
-    try:
-        df.to_pickle(cache_path)
-        print("数据已保存到本地缓存")
-    except Exception as e:
-        print("保存缓存失败:", e)
+        # 按窗口并发获取数据
+        windows = _split_ts_windows(start_date, end_date, freq)
+        limiter = RateLimiter(calls_per_minute)
+        print(f"分 {len(windows)} 个窗口下载 {ts_code} {freq} 数据")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            chunks = list(executor.map(
+                lambda w: _fetch_ts_window(ts, pro, ts_code, w[0], w[1], freq, limiter),
+                windows,
+            ))
+        chunks = [c for c in chunks if not c.empty]
+
+        if not chunks: 
+            print("从 Tushare 获取的数据为空，请检查权限或参数设置。")  
+            return None  
+
+        # 合并后统一校验：按时间升序、去除窗口重叠造成的重复K线，对照交易日历统计整日缺失
+        df = pd.concat(chunks, ignore_index=True)
+        trading_days = _trade_dates(pro, start_date, end_date)
+        df = validate_bars(df, freq, market="cn", trading_days=trading_days).reset_index(drop=True)
+
+        try:
+            df.attrs['completeness'] = check_ts_completeness(pro, df, start_date, end_date, freq, trading_days)
+        except Exception as e:
+            print("完整性检查失败:", e)
+
+        # 与窗口缓存相同：区间结束日早于今天才缓存，避免把盘中不完整的数据固化下来
+        if pd.Timestamp(end_date).normalize() < pd.Timestamp.today().normalize():
+            try:
+                cache.put(cache_key, df, meta={"provider": "ts", "symbol": ts_code, "interval": freq})
+                print("数据已保存到本地缓存")
+            except Exception as e:
+                print("保存缓存失败:", e)
 
     return df  
 
@@ -150,4 +274,135 @@ def standardize_ts_columns(df: pd.DataFrame) -> pd.DataFrame:
         df['datetime'] = pd.to_datetime(df['datetime'])
         df = df.sort_values('datetime')
         df = df.set_index('datetime')
-    return df
\ No newline at end of file
+    return df
+
+def _read_ingested_dates(manifest_path: str) -> set:
+    """读取已入库的交易日清单（每行一个 YYYYMMDD）"""
+    if not os.path.exists(manifest_path):
+        return set()
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+def _pending_dir(store_dir: str) -> str:
+    return os.path.join(store_dir, "_pending")
+
+
+def _merge_pending(store_dir: str) -> int:
+    """
+    把 _pending 下各批次的全市场行情一次性按 ts_code 拆分，合并写入各股票自己的分区文件，
+    每只股票只读写一次；合并成功后删除批次文件。返回合并的批次数。
+
+    中断后重新下载的批次可能与已有数据重叠，同一 trade_date 只保留最后写入的一条。
+    """
+    pending = _pending_dir(store_dir)
+    if not os.path.isdir(pending):
+        return 0
+    paths = sorted(os.path.join(pending, name) for name in os.listdir(pending) if name.endswith(".pkl"))
+    if not paths:
+        return 0
+    df = pd.concat([pd.read_pickle(path) for path in paths], ignore_index=True)
+    for ts_code, part in df.groupby('ts_code', sort=False):
+        part_path = os.path.join(store_dir, f"{ts_code}.pkl")
+        if os.path.exists(part_path):
+            part = pd.concat([pd.read_pickle(part_path), part], ignore_index=True)
+        part = part.drop_duplicates(subset='trade_date', keep='last')
+        part = validate_bars(part, "daily", market="cn")
+        atomic_to_pickle(part.reset_index(drop=True), part_path)
+    for path in paths:
+        os.remove(path)
+    return len(paths)
+
+
+def ingest_daily_by_trade_date(start_date: datetime.datetime, end_date: datetime.datetime, store_dir: str = "data/ts_daily", api_key: str = None, batch_days: int = 20) -> list:
+    """
+    按交易日批量拉取全市场日线，并拆分写入本地按股票分区的存储。
+
+    每个交易日只调用一次 pro.daily(trade_date=...)，返回当日全部 A 股行情；
+    已入库的交易日记录在 store_dir/_ingested_dates.txt 中，重复运行只会请求缺失的交易日。
+    每个批次整体写入 store_dir/_pending 下的一个文件，全部下载完后再按股票合并，
+    每个分区文件在一次运行中只重写一次；上次中断时留下的批次在本次开始时先合并。
+
+    Parameters:
+    -----------
+    start_date, end_date : datetime
+        起止日期（含）
+    store_dir : str
+        本地存储目录，每只股票一个 {ts_code}.pkl 分区
+    api_key : str
+        tushare API key，如果为None则使用环境变量TUSHARE_API_KEY
+    batch_days : int
+        每累计多少个交易日写一个批次文件，控制下载时的内存占用，也让中断后的进度得以保留
+
+    Returns:
+    --------
+    list
+        本次新入库的交易日（YYYYMMDD）
+    """
+    if api_key is None:
+        api_key = os.getenv("TUSHARE_API_KEY")
+        if api_key is None:
+            raise ValueError("需要提供tushare API key")
+
+    os.makedirs(store_dir, exist_ok=True)
+    manifest_path = os.path.join(store_dir, "_ingested_dates.txt")
+    ingested = _read_ingested_dates(manifest_path)
+    merged = _merge_pending(store_dir)
+    if merged:
+        print(f"已合并上次运行遗留的 {merged} 个批次")
+
+    import tushare as ts
+    pro = ts.pro_api(api_key)
+
+    start_str = start_date.strftime('%Y%m%d')
+    end_str = end_date.strftime('%Y%m%d')
+    cal = pro.trade_cal(exchange='SSE', start_date=start_str, end_date=end_str, is_open='1')
+    trade_dates = sorted(cal['cal_date'].astype(str)) if cal is not None and not cal.empty else []
+    missing = [d for d in trade_dates if d not in ingested]
+    if not missing:
+        print("所有交易日均已入库，无需下载")
+        return []
+
+    print(f"需要下载 {len(missing)} 个交易日的全市场日线")
+    new_dates = []
+    for i in range(0, len(missing), batch_days):
+        batch = missing[i:i + batch_days]
+        frames, fetched = [], []
+        for trade_date in batch:
+            df_day = pro.daily(trade_date=trade_date)
+            if df_day is not None and not df_day.empty:
+                frames.append(df_day)
+                fetched.append(trade_date)
+            print(f"已下载 {trade_date} 全市场日线: {0 if df_day is None else len(df_day)} 条")
+        if frames:
+            os.makedirs(_pending_dir(store_dir), exist_ok=True)
+            batch_path = os.path.join(_pending_dir(store_dir), f"{batch[0]}_{batch[-1]}.pkl")
+            atomic_to_pickle(pd.concat(frames, ignore_index=True), batch_path)
+        # 批次文件写入成功后再记录交易日，中断时最多重复下载一个批次（合并时按 trade_date 去重）；
+        # 返回空数据的交易日（尚未发布、限流等）不记录，下次运行重新请求
+        with open(manifest_path, "a", encoding="utf-8") as f:
+            f.writelines(f"{d}\n" for d in fetched)
+        new_dates.extend(fetched)
+        skipped = len(batch) - len(fetched)
+        if skipped:
+            print(f"{skipped} 个交易日未返回数据，未记入清单，下次运行将重新下载")
+
+    _merge_pending(store_dir)
+    print(f"入库完成，共新增 {len(new_dates)} 个交易日")
+    return new_dates
+
+
+def load_daily_partition(ts_code: str, start_date: datetime.datetime = None, end_date: datetime.datetime = None, store_dir: str = "data/ts_daily") -> pd.DataFrame:
+    """
+    从 ingest_daily_by_trade_date 生成的本地分区读取单只股票日线，
+    返回格式与 load_data_ts(freq="daily") 相同（按 trade_date 升序）。
+    """
+    part_path = os.path.join(store_dir, f"{ts_code}.pkl")
+    if not os.path.exists(part_path):
+        return pd.DataFrame()
+    df = pd.read_pickle(part_path)
+    if start_date is not None:
+        df = df[df['trade_date'] >= start_date.strftime('%Y%m%d')]
+    if end_date is not None:
+        df = df[df['trade_date'] <= end_date.strftime('%Y%m%d')]
+    return df.reset_index(drop=True)
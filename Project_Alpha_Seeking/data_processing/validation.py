@@ -0,0 +1,200 @@
+"""
+入库时的K线数据校验与清洗。
+
+各数据源返回的原始数据各有问题：yfinance 分段下载的重叠时间戳、Bybit 字符串字段、
+Alpha Vantage 缺口、Tushare 时间降序等。validate_bars 在写入缓存前统一执行一次
+向量化检查与清洗，并把精简的质量报告挂在 df.attrs["quality_report"] 上，
+下游策略读取缓存后无需再做任何检查。
+"""
+
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# 各市场的日内交易时段，用于推算每个交易日应有的K线数
+SESSIONS = {
+    "cn": [("09:30", "11:30"), ("13:00", "15:00")],
+    "us": [("09:30", "16:00")],
+    "crypto": [("00:00", "24:00")],
+}
+
+# 各数据源频率写法 -> pandas 频率
+_FREQ_ALIASES = {
+    "1m": "1min", "2m": "2min", "5m": "5min", "15m": "15min", "30m": "30min",
+    "60m": "60min", "90m": "90min", "1h": "60min",
+    "1": "1min", "5": "5min", "15": "15min", "30": "30min", "60": "60min", "240": "240min",
+    "1d": "1D", "D": "1D", "daily": "1D",
+}
+
+_NS_PER_DAY = 86_400_000_000_000
+_TIME_COLUMNS = ("datetime", "trade_time", "trade_date", "timestamp", "date")
+_FIELD_ALIASES = {
+    "open": ("open",),
+    "high": ("high",),
+    "low": ("low",),
+    "close": ("close",),
+    "volume": ("volume", "vol"),
+}
+
+
+def interval_to_freq(interval: str) -> Optional[pd.Timedelta]:
+    """把各数据源的 interval 写法转换为 Timedelta；周线/月线等不定长频率返回 None"""
+    freq = _FREQ_ALIASES.get(interval, interval)
+    try:
+        delta = pd.Timedelta(freq)
+    except ValueError:
+        return None
+    return delta if delta <= pd.Timedelta(days=1) else None
+
+
+def _resolve_fields(df: pd.DataFrame) -> dict:
+    """找到 OHLCV 对应的实际列（兼容 yfinance 的 MultiIndex 与大小写不一的列名）"""
+    lookup = {}
+    for col in df.columns:
+        name = col[0] if isinstance(col, tuple) else col
+        lookup.setdefault(str(name).lower(), col)
+    fields = {}
+    for field, aliases in _FIELD_ALIASES.items():
+        for alias in aliases:
+            if alias in lookup:
+                fields[field] = lookup[alias]
+                break
+    return fields
+
+
+def _timestamps(df: pd.DataFrame) -> Optional[np.ndarray]:
+    """取出每根K线的时间戳（int64 纳秒），索引优先，其次常见的时间列"""
+    index = None
+    if isinstance(df.index, pd.DatetimeIndex):
+        index = df.index
+    else:
+        for col in _TIME_COLUMNS:
+            if col in df.columns:
+                values = df[col]
+                if col == "timestamp" and pd.api.types.is_numeric_dtype(values):
+                    values = pd.to_datetime(values.astype("int64"), unit="ms")
+                elif col == "trade_date":
+                    values = pd.to_datetime(values.astype(str), format="%Y%m%d")
+                index = pd.DatetimeIndex(pd.to_datetime(values))
+                break
+    if index is None:
+        return None
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.as_unit("ns").asi8
+
+
+def _bars_per_session_day(freq: pd.Timedelta, market: str) -> Optional[int]:
+    sessions = SESSIONS.get(market)
+    if sessions is None:
+        return None
+    total = pd.Timedelta(0)
+    for start, end in sessions:
+        total += pd.Timedelta(f"{end}:00") - pd.Timedelta(f"{start}:00")
+    return max(1, int(total // freq))
+
+
+def validate_bars(
+    df: pd.DataFrame,
+    interval: Optional[str] = None,
+    market: Optional[str] = None,
+    trading_days: Optional[Iterable] = None,
+    drop_invalid: bool = True,
+) -> pd.DataFrame:
+    """
+    对一段K线做一次性向量化校验与清洗。
+
+    检查项：时间戳单调性、重复时间戳、OHLC 一致性（low <= open/close <= high）、
+    价格缺失、零/负成交量，以及对照交易时段/交易日历的缺失K线。
+
+    清洗：按时间升序排列，重复时间戳保留最后一条；drop_invalid=True 时删除价格缺失、
+    OHLC 不一致与负成交量的K线。零成交量只计数不删除（停牌、盘前等可能是真实情况）。
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        任一数据源的原始返回，保持其原有列结构
+    interval : str
+        数据频率（各数据源原写法均可），用于推算缺失K线；为 None 时跳过该项
+    market : str
+        "cn" / "us" / "crypto"，决定日内交易时段；为 None 时跳过日内缺失检查
+    trading_days : iterable
+        应有的交易日列表，提供时统计整日缺失（missing_sessions）。crypto 全天候交易，
+        不提供时按自然日连续性统计；cn / us 没有可推算的日历，不提供时不检查整日缺失。
+        Tushare 加载函数会传入上交所 trade_cal；yfinance / Alpha Vantage 不提供交易所日历，
+        美股数据的整日缺失需要调用方自行传入日历
+    drop_invalid : bool
+        是否删除异常K线
+
+    Returns:
+    --------
+    pd.DataFrame
+        清洗后的数据，质量报告在 attrs["quality_report"]
+    """
+    report = {"rows_in": len(df)}
+    ts = _timestamps(df) if len(df) else None
+    if ts is None:
+        report["rows_out"] = len(df)
+        df = df.copy()
+        df.attrs["quality_report"] = report
+        return df
+
+    # 1. 单调性：统计时间倒退的次数，然后稳定排序
+    report["non_monotonic"] = int(np.count_nonzero(ts[1:] < ts[:-1]))
+    if report["non_monotonic"]:
+        order = np.argsort(ts, kind="stable")
+        df = df.iloc[order]
+        ts = ts[order]
+
+    # 2. 重复时间戳：保留最后一条
+    keep = np.ones(len(ts), dtype=bool)
+    keep[:-1] = ts[:-1] != ts[1:]
+    report["duplicates"] = int(len(ts) - np.count_nonzero(keep))
+
+    # 3. 价格与成交量检查（字符串字段统一转为数值）
+    fields = _resolve_fields(df)
+    bad = np.zeros(len(ts), dtype=bool)
+    if all(f in fields for f in ("open", "high", "low", "close")):
+        o, h, l, c = (pd.to_numeric(df[fields[f]], errors="coerce").to_numpy(dtype=float)
+                      for f in ("open", "high", "low", "close"))
+        nan_price = np.isnan(o) | np.isnan(h) | np.isnan(l) | np.isnan(c)
+        with np.errstate(invalid="ignore"):
+            ohlc_bad = (l > np.minimum(o, c)) | (h < np.maximum(o, c)) | (l > h)
+        report["nan_prices"] = int(np.count_nonzero(nan_price))
+        report["ohlc_violations"] = int(np.count_nonzero(ohlc_bad & ~nan_price))
+        bad |= nan_price | ohlc_bad
+    if "volume" in fields:
+        v = pd.to_numeric(df[fields["volume"]], errors="coerce").to_numpy(dtype=float)
+        report["negative_volume"] = int(np.count_nonzero(v < 0))
+        report["zero_volume"] = int(np.count_nonzero(v == 0))
+        bad |= v < 0
+
+    if drop_invalid:
+        keep &= ~bad
+    if not keep.all():
+        df = df.iloc[keep]
+        ts = ts[keep]
+
+    # 4. 缺失K线：日内按交易时段推算应有根数，整日按交易日历对比
+    freq = interval_to_freq(interval) if interval else None
+    days, counts = np.unique(ts // _NS_PER_DAY, return_counts=True)
+    if freq is not None and freq < pd.Timedelta(days=1) and market is not None:
+        per_day = _bars_per_session_day(freq, market)
+        if per_day is not None:
+            report["intraday_missing"] = int(np.clip(per_day - counts, 0, None).sum())
+    if trading_days is not None:
+        expected = pd.DatetimeIndex(pd.to_datetime(list(trading_days))).normalize().as_unit("ns").asi8 // _NS_PER_DAY
+        report["missing_sessions"] = int(np.count_nonzero(~np.isin(expected, days)))
+    elif market == "crypto" and freq is not None and len(days):
+        report["missing_sessions"] = int(days[-1] - days[0] + 1 - len(days))
+
+    report["rows_out"] = len(df)
+    # 复制一份再写入，避免修改调用方的原始数据；字符串类型的价格列（如 Bybit 原始分页）统一转为数值
+    df = df.copy()
+    for col in fields.values():
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    df.attrs["quality_report"] = report
+    return df
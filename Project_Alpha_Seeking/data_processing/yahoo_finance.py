@@ -1,10 +1,9 @@
 import datetime
-import yfinance as yf
 import pandas as pd
-import os
-import requests
 from datetime import timedelta
-import calendar
+
+from .cache import get_cache
+from .validation import validate_bars
 
 def load_data_yf(ticker: str, start_date: datetime.datetime, end_date: datetime.datetime, interval: str = "5m") -> pd.DataFrame:
     """
@@ -12,62 +11,60 @@ def load_data_yf(ticker: str, start_date: datetime.datetime, end_date: datetime.
     实现本地缓存功能，避免重复下载；若数据频率为 5m 且时间范围超过 30 天，
     则分段下载（每次最多 30 天）后合并数据并按日期排序返回。
     """
-    # 定义缓存目录和缓存文件名
-    cache_dir = "cache"
-    if not os.path.exists(cache_dir):
-        os.makedirs(cache_dir)
-    
-    cache_filename = f"yf_{ticker}_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}_{interval}.pkl"
-    cache_path = os.path.join(cache_dir, cache_filename)
-    
-    # 尝试从本地缓存加载数据
-    if os.path.exists(cache_path):
-        try:
-            df = pd.read_pickle(cache_path)
+    # 缓存键（沿用原有的缓存文件命名）
+    cache = get_cache()
+    cache_key = f"yf_{ticker}_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}_{interval}"
+    
+    with cache.lock(cache_key):
+        # 尝试从本地缓存加载数据
+        df = cache.get(cache_key)
+        if df is not None:
             print("从本地缓存加载数据")
             return df
-        except Exception as e:
-            print("加载缓存失败，准备重新下载数据:", e)
     
-    # 如果缓存不存在或加载失败，则从 yf 下载数据
-    if interval == "5m":
-        max_days = 30
-        data_chunks = []
-        current_start = start_date
-        while current_start < end_date:
-            current_end = current_start + timedelta(days=max_days)
-            if current_end > end_date:
-                current_end = end_date
-            print(f"下载数据段: {current_start.strftime('%Y-%m-%d')} 到 {current_end.strftime('%Y-%m-%d')}")
-            df_chunk = yf.download(
+        # 如果缓存不存在或加载失败，则从 yf 下载数据（yfinance 仅在真正联网时导入）
+        import yfinance as yf
+        if interval == "5m":
+            max_days = 30
+            data_chunks = []
+            current_start = start_date
+            while current_start < end_date:
+                current_end = current_start + timedelta(days=max_days)
+                if current_end > end_date:
+                    current_end = end_date
+                print(f"下载数据段: {current_start.strftime('%Y-%m-%d')} 到 {current_end.strftime('%Y-%m-%d')}")
+                df_chunk = yf.download(
+                    tickers=ticker,
+                    start=current_start.strftime('%Y-%m-%d'),
+                    end=current_end.strftime('%Y-%m-%d'),
+                    interval=interval
+                )
+                if not df_chunk.empty:
+                    data_chunks.append(df_chunk)
+                current_start = current_end
+            if data_chunks:
+                df = pd.concat(data_chunks)
+                df.sort_index(inplace=True)
+            else:
+                df = pd.DataFrame()
+        else:
+            # 如果不是 5m 频率，则直接下载
+            df = yf.download(
                 tickers=ticker,
-                start=current_start.strftime('%Y-%m-%d'),
-                end=current_end.strftime('%Y-%m-%d'),
+                start=start_date.strftime('%Y-%m-%d'),
+                end=end_date.strftime('%Y-%m-%d'),
                 interval=interval
             )
-            if not df_chunk.empty:
-                data_chunks.append(df_chunk)
-            current_start = current_end
-        if data_chunks:
-            df = pd.concat(data_chunks)
-            df.sort_index(inplace=True)
-        else:
-            df = pd.DataFrame()
-    else:
-        # 如果不是 5m 频率，则直接下载
-        df = yf.download(
-            tickers=ticker,
-            start=start_date.strftime('%Y-%m-%d'),
-            end=end_date.strftime('%Y-%m-%d'),
-            interval=interval
-        )
     
-    # 保存数据到本地缓存
-    try:
-        df.to_pickle(cache_path)
-        print("数据已保存到本地缓存")
-    except Exception as e:
-        print("保存缓存失败:", e)
+        # 入库前统一校验与清洗
+        df = validate_bars(df, interval, market="us")
+
+        # 保存数据到本地缓存
+        try:
+            cache.put(cache_key, df, meta={"provider": "yf", "symbol": ticker, "interval": interval})
+            print("数据已保存到本地缓存")
+        except Exception as e:
+            print("保存缓存失败:", e)
     
     return df
 
@@ -142,42 +139,40 @@ def load_data_yf_month(ticker: str, year: int, month: int) -> pd.DataFrame:
     else:
         end_date = datetime.datetime(year, month + 1, 1)
     
-    # 定义缓存目录和缓存文件名
-    cache_dir = "cache"
-    if not os.path.exists(cache_dir):
-        os.makedirs(cache_dir)
-    
-    cache_filename = f"yf_{ticker}_{year}{month:02d}_1d.pkl"
-    cache_path = os.path.join(cache_dir, cache_filename)
+    # 缓存键（沿用原有的缓存文件命名）
+    cache = get_cache()
+    cache_key = f"yf_{ticker}_{year}{month:02d}_1d"
     
-    # 尝试从本地缓存加载数据
-    if os.path.exists(cache_path):
-        try:
-            df = pd.read_pickle(cache_path)
+    with cache.lock(cache_key):
+        # 尝试从本地缓存加载数据
+        df = cache.get(cache_key)
+        if df is not None:
             print(f"从本地缓存加载{year}年{month}月的数据")
             return df
-        except Exception as e:
-            print(f"加载{year}年{month}月缓存失败，准备重新下载数据:", e)
     
-    # 下载数据
-    print(f"下载{year}年{month}月的数据...")
-    df = yf.download(
-        tickers=ticker,
-        start=start_date.strftime('%Y-%m-%d'),
-        end=end_date.strftime('%Y-%m-%d'),
-        interval='1d'  # 日线数据
-    )
+        # 下载数据
+        print(f"下载{year}年{month}月的数据...")
+        import yfinance as yf
+        df = yf.download(
+            tickers=ticker,
+            start=start_date.strftime('%Y-%m-%d'),
+            end=end_date.strftime('%Y-%m-%d'),
+            interval='1d'  # 日线数据
+        )
     
-    if df.empty:
-        print(f"警告：{year}年{month}月没有数据")
-        return df
+        if df.empty:
+            print(f"警告：{year}年{month}月没有数据")
+            return df
     
-    # 保存数据到本地缓存
-    try:
-        df.to_pickle(cache_path)
-        print(f"{year}年{month}月的数据已保存到本地缓存")
-    except Exception as e:
-        print(f"保存{year}年{month}月缓存失败:", e)
+        # 入库前统一校验与清洗
+        df = validate_bars(df, "1d", market="us")
+
+        # 保存数据到本地缓存
+        try:
+            cache.put(cache_key, df, meta={"provider": "yf", "symbol": ticker, "interval": "1d"})
+            print(f"{year}年{month}月的数据已保存到本地缓存")
+        except Exception as e:
+            print(f"保存{year}年{month}月缓存失败:", e)
     
     return df
 
@@ -197,43 +192,44 @@ def load_data_yf_year(ticker: str, year: int) -> pd.DataFrame:
     pd.DataFrame
         包含该年份所有日线数据的DataFrame
     """
-    # 定义缓存目录和缓存文件名
-    cache_dir = "cache"
-    cache_filename = f"yf_{ticker}_{year}_1d.pkl"
-    cache_path = os.path.join(cache_dir, cache_filename)
-    
-    # 尝试从本地缓存加载数据
-    if os.path.exists(cache_path):
-        try:
-            df = pd.read_pickle(cache_path)
+    # 缓存键（沿用原有的缓存文件命名）
+    cache = get_cache()
+    cache_key = f"yf_{ticker}_{year}_1d"
+    
+    with cache.lock(cache_key):
+        # 尝试从本地缓存加载数据
+        df = cache.get(cache_key)
+        if df is not None:
             print(f"从本地缓存加载{year}年的数据")
             return df
-        except Exception as e:
-            print(f"加载{year}年缓存失败，准备重新下载数据:", e)
     
-    # 设置年份的起止日期
-    start_date = datetime.datetime(year, 1, 1)
-    end_date = datetime.datetime(year + 1, 1, 1)
+        # 设置年份的起止日期
+        start_date = datetime.datetime(year, 1, 1)
+        end_date = datetime.datetime(year + 1, 1, 1)
     
-    # 直接下载整年数据
-    print(f"下载{year}年的数据...")
-    df = yf.download(
-        tickers=ticker,
-        start=start_date.strftime('%Y-%m-%d'),
-        end=end_date.strftime('%Y-%m-%d'),
-        interval='1d'  # 日线数据
-    )
+        # 直接下载整年数据
+        import yfinance as yf
+        print(f"下载{year}年的数据...")
+        df = yf.download(
+            tickers=ticker,
+            start=start_date.strftime('%Y-%m-%d'),
+            end=end_date.strftime('%Y-%m-%d'),
+            interval='1d'  # 日线数据
+        )
     
-    if df.empty:
-        print(f"警告：{year}年没有数据")
-        return df
+        if df.empty:
+            print(f"警告：{year}年没有数据")
+            return df
     
-    # 保存数据到本地缓存
-    try:
-        df.to_pickle(cache_path)
-        print(f"{year}年的数据已保存到本地缓存")
-    except Exception as e:
-        print(f"保存{year}年缓存失败:", e)
+        # 入库前统一校验与清洗
+        df = validate_bars(df, "1d", market="us")
+
+        # 保存数据到本地缓存
+        try:
+            cache.put(cache_key, df, meta={"provider": "yf", "symbol": ticker, "interval": "1d"})
+            print(f"{year}年的数据已保存到本地缓存")
+        except Exception as e:
+            print(f"保存{year}年缓存失败:", e)
     
     return df
 
@@ -258,43 +254,44 @@ def load_data_yf_years(ticker: str, start_year: int, end_year: int) -> pd.DataFr
     if start_year > end_year:
         raise ValueError("start_year必须小于或等于end_year")
     
-    # 定义缓存目录和缓存文件名
-    cache_dir = "cache"
-    cache_filename = f"yf_{ticker}_{start_year}_{end_year}_1d.pkl"
-    cache_path = os.path.join(cache_dir, cache_filename)
+    # 缓存键（沿用原有的缓存文件命名）
+    cache = get_cache()
+    cache_key = f"yf_{ticker}_{start_year}_{end_year}_1d"
     
-    # 尝试从本地缓存加载数据
-    if os.path.exists(cache_path):
-        try:
-            df = pd.read_pickle(cache_path)
+    with cache.lock(cache_key):
+        # 尝试从本地缓存加载数据
+        df = cache.get(cache_key)
+        if df is not None:
             print(f"从本地缓存加载{start_year}-{end_year}年的数据")
             return df
-        except Exception as e:
-            print(f"加载{start_year}-{end_year}年缓存失败，准备重新下载数据:", e)
     
-    # 设置日期范围
-    start_date = datetime.datetime(start_year, 1, 1)
-    end_date = datetime.datetime(end_year + 1, 1, 1)
+        # 设置日期范围
+        start_date = datetime.datetime(start_year, 1, 1)
+        end_date = datetime.datetime(end_year + 1, 1, 1)
     
-    # 直接下载多年数据
-    print(f"下载{start_year}-{end_year}年的数据...")
-    df = yf.download(
-        tickers=ticker,
-        start=start_date.strftime('%Y-%m-%d'),
-        end=end_date.strftime('%Y-%m-%d'),
-        interval='1d',  # 日线数据
-        auto_adjust=True
-    )
+        # 直接下载多年数据
+        import yfinance as yf
+        print(f"下载{start_year}-{end_year}年的数据...")
+        df = yf.download(
+            tickers=ticker,
+            start=start_date.strftime('%Y-%m-%d'),
+            end=end_date.strftime('%Y-%m-%d'),
+            interval='1d',  # 日线数据
+            auto_adjust=True
+        )
     
-    if df.empty:
-        print(f"警告：{start_year}-{end_year}年没有数据")
-        return df
+        if df.empty:
+            print(f"警告：{start_year}-{end_year}年没有数据")
+            return df
     
-    # 保存数据到本地缓存
-    try:
-        df.to_pickle(cache_path)
-        print(f"{start_year}-{end_year}年的数据已保存到本地缓存")
-    except Exception as e:
-        print(f"保存{start_year}-{end_year}年缓存失败:", e)
+        # 入库前统一校验与清洗
+        df = validate_bars(df, "1d", market="us")
+
+        # 保存数据到本地缓存
+        try:
+            cache.put(cache_key, df, meta={"provider": "yf", "symbol": ticker, "interval": "1d"})
+            print(f"{start_year}-{end_year}年的数据已保存到本地缓存")
+        except Exception as e:
+            print(f"保存{start_year}-{end_year}年缓存失败:", e)
     
     return df
@@ -0,0 +1,21 @@
+"""
+截面因子计算模块
+
+在 (bars × symbols) 面板上用惰性表达式描述因子，由 FactorEngine 统一求值并共享中间结果：
+    from factors import FactorEngine, field, rank, delta, delay, ts_mean, load_daily_panel
+
+    panel = load_daily_panel(fields=("close", "vol"))
+    close, vol = field("close"), field("vol")
+    engine = FactorEngine(panel)
+    out = engine.evaluate({
+        "mom20": rank(delta(close, 20) / delay(close, 20)),
+        "vol_ratio": vol / delay(ts_mean(vol, 5), 1),
+    })
+"""
+
+from .expr import (
+    Expr, FactorEngine, field,
+    ts_mean, ts_std, ts_sum, ts_rank, delay, delta,
+    rank, zscore, demean, winsorize,
+)
+from .panel import panel_from_frames, load_daily_panel
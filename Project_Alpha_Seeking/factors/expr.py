@@ -0,0 +1,256 @@
+"""
+惰性因子表达式与求值引擎。
+
+表达式只描述计算图，不做任何计算：
+    close = field("close")
+    vol = field("vol")
+    momentum = rank(delta(close, 20) / delay(close, 20))
+    vol_ratio = vol / delay(ts_mean(vol, 5), 1)
+
+FactorEngine.evaluate 一次接收多个因子，按结构键（算子名 + 子节点键 + 参数）去重，
+相同的子表达式（如上面两个因子共用的 delay(...)）只计算一次；中间结果在不再被引用时立即释放，
+因此全市场面板也只需同时保留少量 (bars × symbols) 数组。
+"""
+
+import numpy as np
+import pandas as pd
+
+from . import operators
+
+
+class Expr:
+    """因子表达式节点：op 为算子名，args 为子节点，params 为标量参数"""
+
+    __slots__ = ("op", "args", "params", "key")
+
+    def __init__(self, op: str, args: tuple = (), params: tuple = ()):
+        self.op = op
+        self.args = args
+        self.params = params
+        self.key = (op, tuple(a.key for a in args), params)
+
+    def __repr__(self):
+        if self.op == "field":
+            return self.params[0]
+        if self.op == "const":
+            return repr(self.params[0])
+        inner = [repr(a) for a in self.args] + [repr(p) for p in self.params]
+        return f"{self.op}({', '.join(inner)})"
+
+    def __add__(self, other):
+        return Expr("add", (self, _wrap(other)))
+
+    def __radd__(self, other):
+        return Expr("add", (_wrap(other), self))
+
+    def __sub__(self, other):
+        return Expr("sub", (self, _wrap(other)))
+
+    def __rsub__(self, other):
+        return Expr("sub", (_wrap(other), self))
+
+    def __mul__(self, other):
+        return Expr("mul", (self, _wrap(other)))
+
+    def __rmul__(self, other):
+        return Expr("mul", (_wrap(other), self))
+
+    def __truediv__(self, other):
+        return Expr("div", (self, _wrap(other)))
+
+    def __rtruediv__(self, other):
+        return Expr("div", (_wrap(other), self))
+
+    def __neg__(self):
+        return Expr("neg", (self,))
+
+    def __abs__(self):
+        return Expr("abs", (self,))
+
+
+def _wrap(value) -> Expr:
+    return value if isinstance(value, Expr) else Expr("const", (), (float(value),))
+
+
+def field(name: str) -> Expr:
+    """面板中的原始字段，如 close / vol"""
+    return Expr("field", (), (name,))
+
+
+def ts_mean(x: Expr, window: int) -> Expr:
+    return Expr("ts_mean", (x,), (int(window),))
+
+
+def ts_std(x: Expr, window: int) -> Expr:
+    return Expr("ts_std", (x,), (int(window),))
+
+
+def ts_sum(x: Expr, window: int) -> Expr:
+    return Expr("ts_sum", (x,), (int(window),))
+
+
+def ts_rank(x: Expr, window: int) -> Expr:
+    return Expr("ts_rank", (x,), (int(window),))
+
+
+def delay(x: Expr, periods: int = 1) -> Expr:
+    return Expr("delay", (x,), (int(periods),))
+
+
+def delta(x: Expr, periods: int = 1) -> Expr:
+    return Expr("delta", (x,), (int(periods),))
+
+
+def rank(x: Expr) -> Expr:
+    return Expr("rank", (x,))
+
+
+def zscore(x: Expr) -> Expr:
+    return Expr("zscore", (x,))
+
+
+def demean(x: Expr) -> Expr:
+    return Expr("demean", (x,))
+
+
+def winsorize(x: Expr, limit: float = 0.01) -> Expr:
+    return Expr("winsorize", (x,), (float(limit),))
+
+
+def _safe_divide(a, b):
+    """除以 0 得到 NaN 而不是 inf，与因子截面处理的习惯一致"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.divide(a, b)
+    if isinstance(out, np.ndarray):
+        out[~np.isfinite(out)] = np.nan
+    return out
+
+
+# 算子名 -> (子节点数组..., 参数...) 的计算函数
+_KERNELS = {
+    "add": np.add,
+    "sub": np.subtract,
+    "mul": np.multiply,
+    "div": _safe_divide,
+    "neg": np.negative,
+    "abs": np.abs,
+    "ts_mean": operators.ts_mean,
+    "ts_std": operators.ts_std,
+    "ts_sum": operators.ts_sum,
+    "ts_rank": operators.ts_rank,
+    "delay": operators.delay,
+    "delta": operators.delta,
+    "rank": operators.cs_rank,
+    "zscore": operators.cs_zscore,
+    "demean": operators.cs_demean,
+    "winsorize": operators.cs_winsorize,
+}
+
+
+class FactorEngine:
+    """
+    在 (bars × symbols) 面板上求值因子表达式。
+
+    Parameters:
+    -----------
+    panel : dict
+        字段名 -> DataFrame（index 为时间，columns 为股票代码），各字段须已对齐；
+        可由 factors.panel.load_daily_panel 构造
+    dtype : numpy dtype
+        计算精度，全市场长周期面板可用 np.float32 将内存减半
+    """
+
+    def __init__(self, panel: dict, dtype=np.float64):
+        first = next(iter(panel.values()))
+        self.index = first.index
+        self.columns = first.columns
+        self.dtype = np.dtype(dtype)
+        self._fields = {}
+        for name, frame in panel.items():
+            if not (frame.index.equals(self.index) and frame.columns.equals(self.columns)):
+                raise ValueError(f"字段 {name} 的时间或股票维度与其它字段不一致")
+            self._fields[name] = frame.to_numpy(dtype=self.dtype)
+        self._memo = {}
+
+    @property
+    def shape(self):
+        return len(self.index), len(self.columns)
+
+    def clear(self):
+        """清空跨调用保留的因子结果"""
+        self._memo.clear()
+
+    def evaluate(self, factors: dict, keep: bool = True) -> dict:
+        """
+        求值一组因子。
+
+        Parameters:
+        -----------
+        factors : dict
+            因子名 -> Expr
+        keep : bool
+            是否保留本次请求的因子结果，供后续 evaluate 直接复用
+
+        Returns:
+        --------
+        dict
+            因子名 -> DataFrame，形状与面板相同
+        """
+        roots = {expr.key for expr in factors.values()}
+        order, refcount = self._plan(factors.values())
+
+        values = {}
+        for expr in order:
+            if expr.key in self._memo:
+                values[expr.key] = self._memo[expr.key]
+                continue
+            values[expr.key] = self._compute(expr, values)
+            # 子节点的最后一个引用者已算完，释放中间结果
+            for child in expr.args:
+                refcount[child.key] -= 1
+                if refcount[child.key] == 0 and child.key not in roots:
+                    values.pop(child.key, None)
+
+        if keep:
+            for key in roots:
+                self._memo[key] = values[key]
+        return {
+            name: pd.DataFrame(values[expr.key], index=self.index, columns=self.columns)
+            for name, expr in factors.items()
+        }
+
+    def _plan(self, exprs):
+        """
+        后序遍历得到去重后的求值顺序（子节点总在父节点之前），
+        并统计每个节点被多少个父节点引用
+        """
+        order, seen, refcount = [], set(), {}
+        stack = [(expr, False) for expr in exprs]
+        while stack:
+            expr, expanded = stack.pop()
+            if expanded:
+                order.append(expr)
+                continue
+            if expr.key in seen:
+                continue
+            seen.add(expr.key)
+            stack.append((expr, True))
+            # 已保留的结果无需展开子节点
+            if expr.key not in self._memo:
+                for child in expr.args:
+                    refcount[child.key] = refcount.get(child.key, 0) + 1
+                    stack.append((child, False))
+        return order, refcount
+
+    def _compute(self, expr: Expr, values: dict) -> np.ndarray:
+        if expr.op == "field":
+            name = expr.params[0]
+            if name not in self._fields:
+                raise KeyError(f"面板中没有字段: {name}")
+            return self._fields[name]
+        if expr.op == "const":
+            return self.dtype.type(expr.params[0])
+        if expr.op not in _KERNELS:
+            raise ValueError(f"未知算子: {expr.op}")
+        args = [values[child.key] for child in expr.args]
+        return _KERNELS[expr.op](*args, *expr.params)
@@ -0,0 +1,131 @@
+"""
+面板算子：输入输出都是 (bars, symbols) 的二维 ndarray，时间沿第 0 维、股票沿第 1 维。
+
+时间序列算子与 pandas 的 rolling(window) 语义一致：窗口内只要有 NaN 或不足 window 根 bar，
+结果即为 NaN；截面算子对每个时间点的一行做计算，NaN 不参与统计并原样保留。
+"""
+
+import contextlib
+import warnings
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# ts_rank 每批处理的元素上限（bars × symbols × window），控制中间布尔数组的内存
+TS_RANK_CHUNK_ELEMENTS = 50_000_000
+
+
+@contextlib.contextmanager
+def _quiet_nan():
+    """屏蔽全 NaN 行触发的 RuntimeWarning（如停牌日全部缺失）"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        yield
+
+
+def _window_sums(x: np.ndarray, window: int):
+    """窗口内有效值个数、和；x 中 NaN 按 0 累加"""
+    valid = ~np.isnan(x)
+    filled = np.where(valid, x, 0.0)
+    csum = np.cumsum(filled, axis=0)
+    ccount = np.cumsum(valid, axis=0, dtype=np.int64)
+    sums = csum.copy()
+    counts = ccount.copy()
+    sums[window:] -= csum[:-window]
+    counts[window:] -= ccount[:-window]
+    return counts, sums, filled
+
+
+def _mask_incomplete(out: np.ndarray, counts: np.ndarray, window: int) -> np.ndarray:
+    out[counts < window] = np.nan
+    out[:window - 1] = np.nan
+    return out
+
+
+def ts_sum(x: np.ndarray, window: int) -> np.ndarray:
+    counts, sums, _ = _window_sums(x, window)
+    return _mask_incomplete(sums, counts, window)
+
+
+def ts_mean(x: np.ndarray, window: int) -> np.ndarray:
+    counts, sums, _ = _window_sums(x, window)
+    return _mask_incomplete(sums / window, counts, window)
+
+
+def ts_std(x: np.ndarray, window: int) -> np.ndarray:
+    """滚动样本标准差（ddof=1）"""
+    # 方差与平移无关，先减去各列均值，降低平方和相减时的精度损失
+    with _quiet_nan():
+        centered = x - np.nanmean(x, axis=0)
+    counts, sums, filled = _window_sums(centered, window)
+    sq = np.cumsum(filled * filled, axis=0)
+    sq[window:] -= sq[:-window].copy()
+    var = (sq - sums * sums / window) / (window - 1)
+    np.maximum(var, 0.0, out=var)
+    return _mask_incomplete(np.sqrt(var), counts, window)
+
+
+def delay(x: np.ndarray, periods: int) -> np.ndarray:
+    """向后平移 periods 根 bar，等同 shift(periods)"""
+    out = np.full_like(x, np.nan)
+    if periods < len(x):
+        out[periods:] = x[:len(x) - periods]
+    return out
+
+
+def delta(x: np.ndarray, periods: int) -> np.ndarray:
+    return x - delay(x, periods)
+
+
+def ts_rank(x: np.ndarray, window: int) -> np.ndarray:
+    """
+    当前值在最近 window 根 bar 中的百分位排名（平均秩 / window），
+    等同 rolling(window).rank(pct=True)；按股票分批以限制内存。
+    """
+    bars, symbols = x.shape
+    out = np.full_like(x, np.nan)
+    if bars < window:
+        return out
+    step = max(1, TS_RANK_CHUNK_ELEMENTS // (bars * window))
+    for lo in range(0, symbols, step):
+        block = x[:, lo:lo + step]
+        windows = sliding_window_view(block, window, axis=0)  # (bars-window+1, step, window)
+        last = windows[..., -1:]
+        below = (windows < last).sum(axis=-1)
+        equal = (windows == last).sum(axis=-1)
+        rank = (below + (equal + 1) / 2.0) / window
+        rank[np.isnan(windows).any(axis=-1)] = np.nan
+        out[window - 1:, lo:lo + step] = rank
+    return out
+
+
+def cs_rank(x: np.ndarray) -> np.ndarray:
+    """截面百分位排名，并列取平均秩，等同 rank(axis=1, pct=True)"""
+    return pd.DataFrame(x).rank(axis=1, pct=True).to_numpy(dtype=x.dtype)
+
+
+def cs_demean(x: np.ndarray) -> np.ndarray:
+    with _quiet_nan():
+        return x - np.nanmean(x, axis=1, keepdims=True)
+
+
+def cs_zscore(x: np.ndarray) -> np.ndarray:
+    """截面标准化，标准差取 ddof=1；截面标准差为 0 时结果为 NaN"""
+    with np.errstate(invalid="ignore", divide="ignore"), _quiet_nan():
+        mean = np.nanmean(x, axis=1, keepdims=True)
+        std = np.nanstd(x, axis=1, ddof=1, keepdims=True)
+        # 截面全部相等时 nanstd 会因均值舍入得到极小的非零值，按 0 处理
+        std[std <= 16 * np.finfo(x.dtype).eps * np.abs(mean)] = np.nan
+        out = (x - mean) / std
+    out[~np.isfinite(out)] = np.nan
+    return out
+
+
+def cs_winsorize(x: np.ndarray, limit: float = 0.01) -> np.ndarray:
+    """每个时间点把截面两端 limit 比例的极值截断到对应分位数"""
+    with _quiet_nan():
+        lower, upper = np.nanquantile(x, [limit, 1.0 - limit], axis=1, keepdims=True)
+    return np.clip(x, lower, upper)
+
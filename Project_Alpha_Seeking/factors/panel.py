@@ -0,0 +1,91 @@
+"""
+构造 (bars × symbols) 面板：每个字段一张 DataFrame，index 为时间，columns 为股票代码。
+"""
+
+import datetime
+import os
+
+import pandas as pd
+
+from data_processing.tu_share import load_daily_partition
+
+
+def panel_from_frames(frames: dict, fields=("open", "high", "low", "close", "vol"), date_col: str = None, dtype="float64") -> dict:
+    """
+    把多只股票各自的行情表拼成按字段组织的面板。
+
+    Parameters:
+    -----------
+    frames : dict
+        股票代码 -> 单只股票的 DataFrame
+    fields : iterable
+        需要的字段
+    date_col : str
+        时间所在列名；为 None 时使用各 DataFrame 的 index
+    dtype : str
+        面板数值类型
+
+    Returns:
+    --------
+    dict
+        字段名 -> DataFrame，所有字段共用同一个按时间排序的 index（各股票时间的并集）
+        与同一组 columns；停牌、未上市等缺失位置为 NaN
+    """
+    long = []
+    for symbol, df in frames.items():
+        if df is None or df.empty:
+            continue
+        part = df.set_index(date_col) if date_col else df
+        part = part[list(fields)].astype(dtype)
+        part.index = pd.to_datetime(part.index)
+        long.append(part.assign(symbol=symbol))
+    if not long:
+        return {f: pd.DataFrame(dtype=dtype) for f in fields}
+
+    stacked = pd.concat(long)
+    stacked.index.name = "date"
+    stacked = stacked.reset_index().drop_duplicates(["date", "symbol"], keep="last")
+    index = pd.DatetimeIndex(sorted(stacked["date"].unique()), name="date")
+    columns = pd.Index(sorted(stacked["symbol"].unique()), name="symbol")
+    panel = {}
+    for f in fields:
+        wide = stacked.pivot(index="date", columns="symbol", values=f)
+        panel[f] = wide.reindex(index=index, columns=columns)
+    return panel
+
+
+def load_daily_panel(ts_codes=None, fields=("open", "high", "low", "close", "vol", "amount"), start_date: datetime.datetime = None, end_date: datetime.datetime = None, store_dir: str = "data/ts_daily", dtype="float64") -> dict:
+    """
+    从 ingest_daily_by_trade_date 写入的本地分区读取多只股票日线并构造面板。
+
+    Parameters:
+    -----------
+    ts_codes : list
+        股票代码列表；为 None 时读取 store_dir 下的全部分区
+    fields : iterable
+        需要的字段
+    start_date, end_date : datetime
+        起止日期（含）
+    store_dir : str
+        分区目录
+    dtype : str
+        面板数值类型，全市场十年日线可用 "float32" 将内存减半
+
+    Returns:
+    --------
+    dict
+        字段名 -> DataFrame (trade_date × ts_code)
+    """
+    if ts_codes is None:
+        ts_codes = sorted(
+            name[:-len(".pkl")] for name in os.listdir(store_dir)
+            if name.endswith(".pkl") and not name.startswith(".tmp_")
+        )
+    frames = {
+        code: load_daily_partition(code, start_date, end_date, store_dir=store_dir)
+        for code in ts_codes
+    }
+    for code, df in frames.items():
+        if not df.empty:
+            frames[code] = df.assign(trade_date=pd.to_datetime(df["trade_date"], format="%Y%m%d"))
+    return panel_from_frames(frames, fields, date_col="trade_date", dtype=dtype)
@@ -1,4 +1,4 @@
 # __init__.py in the indicator folder
 
-from .mfi import MFI
-from .obv import OnBalanceVolume
\ No newline at end of file
+from .vwap import VWAP, vwap_channel
+from .timeframes import HigherTimeframe, completed_bar_index, resample_bars
@@ -0,0 +1,99 @@
+"""
+多周期对齐。
+
+backtrader 组合多个周期时要在运行时 resampledata，并逐 bar 同步各数据源。
+这里改为事先向量化：慢周期（如日线）上的指标一次性算好，再用 searchsorted 预先求出
+每根快周期 bar 对应的“最后一根已经结束的慢周期 bar”的序号，next 中按 bar 序号 O(1) 读取。
+
+K线时间戳均视为 bar 的起始时间：慢周期 bar [s, s+P) 只有在快周期 bar [t, t+p) 收盘时
+t+p >= s+P 才算已结束，因此不会用到未来数据。
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# backtrader 的日期数值以公元 1 年 1 月 1 日为第 1 天，1970-01-01 对应的序数
+_EPOCH_ORDINAL = 719163.0
+
+
+def infer_period(index: pd.DatetimeIndex) -> pd.Timedelta:
+    """相邻时间戳的最小间隔，作为K线周期（日线跳过周末不影响结果）"""
+    diffs = np.diff(pd.DatetimeIndex(index).as_unit("ns").asi8)
+    diffs = diffs[diffs > 0]
+    if len(diffs) == 0:
+        raise ValueError("至少需要两根时间不同的 bar 才能推断周期，请显式传入周期")
+    return pd.Timedelta(int(diffs.min()), unit="ns")
+
+
+def index_from_datenums(nums) -> pd.DatetimeIndex:
+    """
+    backtrader 的日期数值数组 -> DatetimeIndex。
+    日期数值是以天为单位的浮点数，只有约 10 微秒的精度，因此取整到毫秒。
+    """
+    days = np.asarray(nums, dtype=float) - _EPOCH_ORDINAL
+    return pd.DatetimeIndex(pd.to_datetime(np.round(days * 86400e3).astype("int64"), unit="ms"))
+
+
+def completed_bar_index(fast_index, slow_index, fast_period=None, slow_period=None) -> np.ndarray:
+    """
+    每根快周期 bar 收盘时，最后一根已经结束的慢周期 bar 的序号。
+
+    Parameters:
+    -----------
+    fast_index, slow_index : DatetimeIndex
+        快 / 慢周期 bar 的起始时间，均须升序
+    fast_period, slow_period : str or Timedelta
+        K线周期，为 None 时由相邻时间戳推断
+
+    Returns:
+    --------
+    np.ndarray
+        int64 序号数组，长度同 fast_index；还没有慢周期 bar 结束时为 -1
+    """
+    fast_index, slow_index = pd.DatetimeIndex(fast_index), pd.DatetimeIndex(slow_index)
+    fast_period = infer_period(fast_index) if fast_period is None else pd.Timedelta(fast_period)
+    slow_period = infer_period(slow_index) if slow_period is None else pd.Timedelta(slow_period)
+    fast_end = (fast_index + fast_period).as_unit("ns").asi8
+    slow_end = (slow_index + slow_period).as_unit("ns").asi8
+    return np.searchsorted(slow_end, fast_end, side="right") - 1
+
+
+def resample_bars(data: pd.DataFrame, rule: str) -> pd.DataFrame:
+    """快周期K线向量化合成为慢周期K线（没有成交的时段不生成 bar）"""
+    agg = {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+    if "notional" in data.columns:
+        agg["notional"] = "sum"
+    return data.resample(rule).agg(agg).dropna(subset=["close"])
+
+
+class HigherTimeframe:
+    """
+    慢周期伴随序列：慢周期上预先算好的各列，加上快周期 bar 序号 -> 慢周期 bar 序号的对齐表。
+
+    Parameters:
+    -----------
+    slow : pd.DataFrame
+        慢周期数据，index 为 bar 起始时间，各列为已经向量化算好的指标
+    fast_index : DatetimeIndex
+        快周期 bar 的起始时间
+    fast_period, slow_period : str or Timedelta
+        K线周期，为 None 时自动推断
+    """
+
+    def __init__(self, slow: pd.DataFrame, fast_index, fast_period=None, slow_period=None):
+        self.index_map = completed_bar_index(fast_index, slow.index, fast_period, slow_period)
+        self.columns = {col: slow[col].to_numpy(dtype=float) for col in slow.columns}
+
+    def value(self, column: str, bar: int) -> float:
+        """第 bar 根快周期 bar 收盘时可见的慢周期值，尚无已结束的慢周期 bar 时为 NaN"""
+        i = self.index_map[bar]
+        return self.columns[column][i] if i >= 0 else np.nan
+
+    def aligned(self, column: str) -> np.ndarray:
+        """整列对齐到快周期，供向量化信号使用"""
+        values = self.columns[column]
+        out = np.full(len(self.index_map), np.nan)
+        ok = self.index_map >= 0
+        out[ok] = values[self.index_map[ok]]
+        return out
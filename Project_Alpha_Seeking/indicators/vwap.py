@@ -1,5 +1,7 @@
 
 
+from collections import deque
+
 import backtrader as bt
 import numpy as np
 from datetime import time
@@ -14,6 +16,8 @@ class VWAP(bt.Indicator):
     2. 支持日内VWAP重置 - 符合日内交易惯例
     3. 支持使用典型价格为可选项 - 更符合市场实际
     4. numpy计算标准差
+    5. 数据带有逐笔成交聚合的 notional 线时（见 data_processing.trades），
+       可用精确成交额 Σ(成交价 × 成交量) 代替近似价格 × 成交量
 
     """
     lines = ('vwap', 'vwap_upper', 'vwap_lower',)
@@ -22,16 +26,17 @@ class VWAP(bt.Indicator):
         ('reset_daily', False), # 是否每日重置VWAP
         ('use_typical', True),  # 是否使用典型价格
         ('std_dev_mult', 2.0),  # 标准差倍数
+        ('use_notional', False), # 是否使用 notional 线（精确成交额），此时忽略 use_typical
     )
     
     def __init__(self):
         self.cum_vol = 0
         self.cum_vol_price = 0
         
-        # (price, volume) 队列
-        self.price_volume_queue = []
+        # (price × volume, volume) 队列
+        self.vol_price_queue = deque()
         # 用于标准差计算
-        self.daily_prices = []
+        self.daily_prices = deque()
         
         # 记录上一个交易日
         self.last_date = None
@@ -47,23 +52,28 @@ class VWAP(bt.Indicator):
             self.reset_vwap()
             self.last_date = current_date
         
-        # 计算当前 bar 的价格
-        if self.p.use_typical:
-            current_price = (self.data.high[0] + self.data.low[0] + self.data.close[0]) / 3
-        else:
-            current_price = self.data.close[0]
-        
         current_vol = self.data.volume[0]
-        current_vol_price = current_vol * current_price
+        
+        # 计算当前 bar 的价格与成交额
+        if self.p.use_notional:
+            current_vol_price = self.data.notional[0]
+            # bar 内成交均价；无成交时退回收盘价
+            current_price = current_vol_price / current_vol if current_vol > 0 else self.data.close[0]
+        else:
+            if self.p.use_typical:
+                current_price = (self.data.high[0] + self.data.low[0] + self.data.close[0]) / 3
+            else:
+                current_price = self.data.close[0]
+            current_vol_price = current_vol * current_price
         
         # 添加到队列
-        self.price_volume_queue.append((current_price, current_vol))
+        self.vol_price_queue.append((current_vol_price, current_vol))
         
         # 超过周期长度则弹出最早的
-        if len(self.price_volume_queue) > self.params.period:
-            old_price, old_vol = self.price_volume_queue.pop(0)
+        if len(self.vol_price_queue) > self.params.period:
+            old_vol_price, old_vol = self.vol_price_queue.popleft()
             self.cum_vol -= old_vol
-            self.cum_vol_price -= old_price * old_vol
+            self.cum_vol_price -= old_vol_price
         
         # 更新累计值
         self.cum_vol += current_vol
@@ -78,7 +88,7 @@ class VWAP(bt.Indicator):
         # 维护 daily_prices 用于计算 std
         self.daily_prices.append(current_price)
         if len(self.daily_prices) > self.params.period:
-            self.daily_prices.pop(0)
+            self.daily_prices.popleft()
         
         # 计算上/下轨
         if len(self.daily_prices) > 1:
@@ -93,6 +103,105 @@ class VWAP(bt.Indicator):
         """重置VWAP，用于日内场景"""
         self.cum_vol = 0
         self.cum_vol_price = 0
-        self.price_volume_queue = []
-        self.daily_prices = []
+        self.vol_price_queue = deque()
+        self.daily_prices = deque()
+
+    def get_state(self):
+        """滚动窗口与累计值的快照，用于断点续跑"""
+        return {
+            "cum_vol": self.cum_vol,
+            "cum_vol_price": self.cum_vol_price,
+            "vol_price_queue": list(self.vol_price_queue),
+            "daily_prices": list(self.daily_prices),
+            "last_date": self.last_date,
+        }
+
+    def set_state(self, state):
+        """从 get_state 的快照恢复，之后的计算与不中断运行逐位一致"""
+        self.cum_vol = state["cum_vol"]
+        self.cum_vol_price = state["cum_vol_price"]
+        self.vol_price_queue = deque(state["vol_price_queue"])
+        self.daily_prices = deque(state["daily_prices"])
+        self.last_date = state["last_date"]
+
+
+
+def _rolling_sum_sequential(values, period):
+    """
+    与 VWAP.next 完全相同的累加顺序：先减去滑出窗口的值，再加上当前值。
+    np.add.accumulate 按顺序逐项累加，因此结果与逐 bar 计算逐位一致。
+    """
+    n = len(values)
+    steps = np.empty(n + max(n - period, 0), dtype=float)
+    steps[:min(period, n)] = values[:period]
+    if n > period:
+        steps[period::2] = -values[:n - period]
+        steps[period + 1::2] = values[period:]
+    acc = np.add.accumulate(steps)
+    # 每根 bar 加入当前值之后的累计值
+    take = np.arange(n)
+    take[period:] = period + 1 + 2 * np.arange(n - period)
+    return acc[take]
+
+
+def _vwap_segment(price, volume, vol_price, period, std_dev_mult):
+    cum_vol = _rolling_sum_sequential(volume, period)
+    cum_vol_price = _rolling_sum_sequential(vol_price, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        vwap = np.where(cum_vol > 0, cum_vol_price / cum_vol, price)
+
+    std = np.zeros(len(price))
+    head = min(period, len(price))
+    for i in range(1, head):
+        std[i] = np.std(price[:i + 1])
+    if len(price) > period:
+        windows = np.lib.stride_tricks.sliding_window_view(price, period)
+        std[period:] = np.std(windows[1:], axis=-1)
+    upper = vwap + std_dev_mult * std
+    lower = vwap - std_dev_mult * std
+    # 只有一个价格时上下轨等于 VWAP
+    upper[0] = lower[0] = vwap[0]
+    return vwap, upper, lower
+
+
+def vwap_channel(high, low, close, volume, period=20, use_typical=True, std_dev_mult=2.0, dates=None, notional=None):
+    """
+    VWAP 指标的向量化版本，一次性计算整段数据的 vwap / 上轨 / 下轨，
+    结果与逐 bar 运行的 VWAP 指标一致，供快速回测内核预先计算信号使用。
+
+    Parameters:
+    -----------
+    high, low, close, volume : array-like
+        K线数据
+    period, use_typical, std_dev_mult :
+        与 VWAP 指标同名参数含义相同
+    dates : array-like
+        每根 bar 所属的交易日；提供时按日重置（对应 reset_daily=True）
+    notional : array-like
+        每根 bar 的精确成交额；提供时对应 use_notional=True，忽略 use_typical
+
+    Returns:
+    --------
+    tuple of np.ndarray
+        (vwap, vwap_upper, vwap_lower)
+    """
+    high, low, close, volume = (np.asarray(x, dtype=float) for x in (high, low, close, volume))
+    if notional is not None:
+        vol_price = np.asarray(notional, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            price = np.where(volume > 0, vol_price / volume, close)
+    else:
+        price = (high + low + close) / 3 if use_typical else close
+        vol_price = volume * price
+
+    if dates is None:
+        return _vwap_segment(price, volume, vol_price, period, std_dev_mult)
 
+    dates = np.asarray(dates)
+    starts = np.flatnonzero(np.r_[True, dates[1:] != dates[:-1]])
+    ends = np.r_[starts[1:], len(price)]
+    out = [np.empty(len(price)) for _ in range(3)]
+    for s, e in zip(starts, ends):
+        for arr, seg in zip(out, _vwap_segment(price[s:e], volume[s:e], vol_price[s:e], period, std_dev_mult)):
+            arr[s:e] = seg
+    return tuple(out)
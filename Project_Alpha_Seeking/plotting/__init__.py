@@ -0,0 +1,10 @@
+"""
+可视化模块
+
+decimate 提供 minmax / LTTB 降采样与买卖点抽稀，charts 在此基础上提供随缩放
+重新降采样的 matplotlib 折线与散点，以及回测结果的价格 + 资金曲线图，
+千万根 bar 的回测结果也能在约一秒内绘出。
+"""
+
+from .decimate import lttb_indices, minmax_indices, thin_markers
+from .charts import DecimatedLine, DecimatedMarkers, plot_backtest, plot_line, plot_markers
@@ -0,0 +1,194 @@
+"""
+降采样的 matplotlib 图表。
+
+DecimatedLine / DecimatedMarkers 保存完整数据，但交给 matplotlib 的只有当前可见区间内
+降采样后的点（约为坐标轴像素宽度的两倍）；坐标轴缩放、平移（xlim_changed）时
+按新的可见区间重新降采样，放大后细节逐步出现。
+
+用法：
+    fig, axes = plot_backtest(results["close"], results["equity"],
+                              buys=results["buy_execute"], sells=results["sell_execute"])
+"""
+
+import matplotlib.dates as mdates
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from .decimate import finite_subset, lttb_indices, minmax_indices, thin_markers
+
+
+def to_plot_x(index) -> np.ndarray:
+    """
+    DatetimeIndex -> matplotlib 日期数值（距 mdates 纪元的天数）；其他情况直接转为浮点数组。
+    直接用整数纳秒换算，千万级时间戳比 mdates.date2num 快数倍
+    """
+    if isinstance(index, pd.DatetimeIndex):
+        epoch = pd.Timestamp(mdates.get_epoch()).as_unit("ns").value
+        return (index.as_unit("ns").asi8 - epoch) / 86400e9
+    return np.asarray(index, dtype=float)
+
+
+def _keep_alive(ax, artist):
+    """matplotlib 的回调只保存弱引用，挂在坐标轴上防止对象被回收后缩放不再重新降采样"""
+    ax._decimated = getattr(ax, "_decimated", []) + [artist]
+
+
+def _axes_pixels(ax) -> int:
+    """坐标轴的像素宽度，作为降采样的桶数"""
+    return max(int(ax.get_window_extent().width), 100)
+
+
+class DecimatedLine:
+    """
+    按可见区间与像素宽度动态降采样的折线。
+
+    Parameters:
+    -----------
+    ax : matplotlib.axes.Axes
+        绘制的坐标轴
+    x, y : array-like
+        完整数据，x 须升序（DatetimeIndex 自动转换）
+    method : str
+        "minmax"（默认，保留极值）或 "lttb"
+    kwargs :
+        传给 ax.plot 的样式参数
+    """
+
+    def __init__(self, ax, x, y, method: str = "minmax", **kwargs):
+        if method not in ("minmax", "lttb"):
+            raise ValueError(f"未知的降采样方法: {method}")
+        self.ax = ax
+        self.method = method
+        self.x, self.y = finite_subset(to_plot_x(x), np.asarray(y, dtype=float))
+        self._last = None
+        idx = self._indices(0, len(self.x))
+        (self.line,) = ax.plot(self.x[idx], self.y[idx], **kwargs)
+        self._cid = ax.callbacks.connect("xlim_changed", self._on_xlim)
+        _keep_alive(ax, self)
+
+    def _indices(self, lo: int, hi: int) -> np.ndarray:
+        pixels = _axes_pixels(self.ax)
+        self._last = (lo, hi, pixels)
+        if self.method == "lttb":
+            return lttb_indices(self.y, 2 * pixels, self.x, lo, hi)
+        return minmax_indices(self.y, pixels, lo, hi)
+
+    def _on_xlim(self, ax):
+        x0, x1 = ax.get_xlim()
+        # 可见区间两侧各多取一个点，折线才能连到坐标轴边缘
+        lo = max(int(np.searchsorted(self.x, x0, side="left")) - 1, 0)
+        hi = min(int(np.searchsorted(self.x, x1, side="right")) + 1, len(self.x))
+        # 自动缩放、共享 x 轴、tight_layout 会多次触发回调，区间与像素宽度不变时跳过
+        if hi - lo < 2 or (lo, hi, _axes_pixels(ax)) == self._last:
+            return
+        idx = self._indices(lo, hi)
+        self.line.set_data(self.x[idx], self.y[idx])
+
+    def remove(self):
+        self.ax.callbacks.disconnect(self._cid)
+        self.ax._decimated.remove(self)
+        self.line.remove()
+
+
+class DecimatedMarkers:
+    """
+    按可见区间抽稀的散点标记（买卖点），每个像素列最多画一个。
+
+    Parameters:
+    -----------
+    ax : matplotlib.axes.Axes
+        绘制的坐标轴
+    x, y : array-like
+        标记的位置，x 须升序
+    kwargs :
+        传给 ax.scatter 的样式参数
+    """
+
+    def __init__(self, ax, x, y, **kwargs):
+        self.ax = ax
+        self.x = to_plot_x(x)
+        self.y = np.asarray(y, dtype=float)
+        idx = thin_markers(self.x, _axes_pixels(ax))
+        self.collection = ax.scatter(self.x[idx], self.y[idx], **kwargs)
+        self._cid = ax.callbacks.connect("xlim_changed", self._on_xlim)
+        _keep_alive(ax, self)
+
+    def _on_xlim(self, ax):
+        x0, x1 = ax.get_xlim()
+        idx = thin_markers(self.x, _axes_pixels(ax), x0, x1)
+        self.collection.set_offsets(np.column_stack([self.x[idx], self.y[idx]]))
+
+    def remove(self):
+        self.ax.callbacks.disconnect(self._cid)
+        self.ax._decimated.remove(self)
+        self.collection.remove()
+
+
+def plot_line(ax, x, y, method: str = "minmax", **kwargs) -> DecimatedLine:
+    """ax.plot 的降采样版本"""
+    return DecimatedLine(ax, x, y, method=method, **kwargs)
+
+
+def plot_markers(ax, x, y, **kwargs) -> DecimatedMarkers:
+    """ax.scatter 的抽稀版本"""
+    return DecimatedMarkers(ax, x, y, **kwargs)
+
+
+def plot_backtest(close, equity, buys=None, sells=None, baseline=None, title: str = "", method: str = "minmax", figsize=(14, 10)):
+    """
+    价格 + 买卖点、资金曲线两幅子图（与 notebooks 中的布局相同），全部降采样绘制。
+
+    Parameters:
+    -----------
+    close : pd.Series
+        收盘价，index 为时间
+    equity : pd.Series or array-like
+        资金曲线，与 close 等长
+    buys, sells : pd.Series of bool
+        买入 / 卖出执行标记，与 close 对齐
+    baseline : float
+        资金曲线的基准线，默认为初始资金
+    title : str
+        图标题前缀
+    method : str
+        折线降采样方法，"minmax" 或 "lttb"
+
+    Returns:
+    --------
+    tuple
+        (fig, axes)
+    """
+    close = pd.Series(close)
+    dates = isinstance(close.index, pd.DatetimeIndex)
+    # 只换算一次横坐标，两幅子图共用
+    x = to_plot_x(close.index)
+    equity = np.asarray(equity, dtype=float)
+
+    fig, axes = plt.subplots(2, 1, figsize=figsize, sharex=True, gridspec_kw={'height_ratios': [2, 1]})
+    plot_line(axes[0], x, close.to_numpy(dtype=float), method=method, label='收盘价', color='blue', alpha=0.6)
+    for flags, marker, color, label in ((buys, '^', 'green', '买入'), (sells, 'v', 'red', '卖出')):
+        if flags is None:
+            continue
+        mask = np.asarray(flags, dtype=bool)
+        plot_markers(axes[0], x[mask], close.to_numpy(dtype=float)[mask], marker=marker, color=color, s=100, label=label)
+    axes[0].set_title(f'{title} - 交易信号' if title else '交易信号')
+    axes[0].set_ylabel('价格')
+    axes[0].legend(loc='upper left')
+    axes[0].grid(True)
+
+    plot_line(axes[1], x, equity, method=method, label='资产', color='green')
+    baseline = equity[0] if baseline is None else baseline
+    axes[1].axhline(baseline, linestyle='--', color='gray', alpha=0.5, label='基准线')
+    axes[1].set_title(f'{title}：资产曲线' if title else '资产曲线')
+    axes[1].set_xlabel('日期')
+    axes[1].set_ylabel('资产(元)')
+    axes[1].legend(loc='upper left')
+    axes[1].grid(True)
+    if dates:
+        axes[1].xaxis_date()
+        # 缩放后刻度随可见区间变化，固定的 '%Y-%m' 格式不再适用
+        axes[1].xaxis.set_major_formatter(mdates.ConciseDateFormatter(axes[1].xaxis.get_major_locator()))
+        fig.autofmt_xdate()
+    fig.tight_layout()
+    return fig, axes
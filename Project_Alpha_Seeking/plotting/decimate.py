@@ -0,0 +1,139 @@
+"""
+长序列降采样。
+
+百万根以上的K线直接交给 matplotlib 会逐点绘制，屏幕宽度只有一两千像素，多余的点只是
+拖慢渲染、占满内存。这里只返回要绘制的点的下标：
+- minmax：每个像素列保留区间内的最小值和最大值，尖峰与回撤一个不丢，最快；
+- lttb：Largest-Triangle-Three-Buckets，按视觉面积挑点，输出更平滑，点数可精确控制；
+- thin_markers：买卖点标记每个像素列最多保留一个。
+"""
+
+import numpy as np
+
+
+def _bucket_edges(lo: int, hi: int, n_buckets: int) -> np.ndarray:
+    """把 [lo, hi) 均分成 n_buckets 段的边界"""
+    return np.unique(np.linspace(lo, hi, n_buckets + 1).astype(np.int64))
+
+
+def minmax_indices(y, n_buckets: int, lo: int = 0, hi: int = None) -> np.ndarray:
+    """
+    每个桶内最小值、最大值所在的下标（按先后顺序），外加区间首尾两点。
+
+    Parameters:
+    -----------
+    y : np.ndarray
+        待绘制序列，不能含 NaN（见 finite_subset）
+    n_buckets : int
+        桶数，通常取坐标轴的像素宽度
+    lo, hi : int
+        只处理 y[lo:hi]，用于缩放后的可见区间
+
+    Returns:
+    --------
+    np.ndarray
+        升序、去重的 int64 下标
+    """
+    hi = len(y) if hi is None else hi
+    n = hi - lo
+    if n <= 2 * n_buckets:
+        return np.arange(lo, hi)
+
+    # 等长分桶后 reshape 成二维，一次 argmin / argmax；末尾不足一桶的部分单独处理
+    size = -(-n // n_buckets)
+    full = n // size
+    body = y[lo:lo + full * size].reshape(full, size)
+    offsets = lo + np.arange(full) * size
+    picks = [offsets + body.argmin(axis=1), offsets + body.argmax(axis=1)]
+    if full * size < n:
+        tail = y[lo + full * size:hi]
+        start = lo + full * size
+        picks.append(np.array([start + tail.argmin(), start + tail.argmax()]))
+    picks.append(np.array([lo, hi - 1]))
+    return np.unique(np.concatenate(picks))
+
+
+def lttb_indices(y, n_out: int, x=None, lo: int = 0, hi: int = None) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets 降采样，返回 n_out 个点的下标（含首尾）。
+
+    Parameters:
+    -----------
+    y : np.ndarray
+        待绘制序列，不能含 NaN
+    n_out : int
+        输出点数
+    x : np.ndarray
+        横坐标，为 None 时按等间距处理
+    lo, hi : int
+        只处理 y[lo:hi]
+    """
+    hi = len(y) if hi is None else hi
+    n = hi - lo
+    if n <= n_out or n_out < 3:
+        return np.arange(lo, hi)
+
+    ys = np.asarray(y[lo:hi], dtype=float)
+    xs = np.arange(n, dtype=float) if x is None else np.asarray(x[lo:hi], dtype=float)
+    # 中间 n-2 个点分成 n_out-2 个桶，首尾两点固定保留
+    edges = _bucket_edges(1, n - 1, n_out - 2)
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(xs[:-1], edges[:-1]) / counts
+    mean_y = np.add.reduceat(ys[:-1], edges[:-1]) / counts
+
+    out = np.empty(len(edges) + 1, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(len(edges) - 1):
+        s, e = edges[i], edges[i + 1]
+        # 下一个桶的均值点；最后一个桶以末尾点代替
+        if i + 1 < len(counts):
+            cx, cy = mean_x[i + 1], mean_y[i + 1]
+        else:
+            cx, cy = xs[-1], ys[-1]
+        ax, ay = xs[a], ys[a]
+        area = np.abs((ax - cx) * (ys[s:e] - ay) - (ax - xs[s:e]) * (cy - ay))
+        a = s + int(area.argmax())
+        out[i + 1] = a
+    return lo + out
+
+
+def thin_markers(x, n_buckets: int, lo: float = None, hi: float = None) -> np.ndarray:
+    """
+    标记点抽稀：横坐标落在 [lo, hi] 内的点，每个桶（像素列）只保留第一个。
+
+    Parameters:
+    -----------
+    x : np.ndarray
+        升序横坐标
+    n_buckets : int
+        桶数，通常取坐标轴的像素宽度
+    lo, hi : float
+        可见区间，默认为全部
+
+    Returns:
+    --------
+    np.ndarray
+        保留的下标
+    """
+    x = np.asarray(x, dtype=float)
+    if len(x) == 0:
+        return np.arange(0)
+    lo = x[0] if lo is None else lo
+    hi = x[-1] if hi is None else hi
+    start = np.searchsorted(x, lo, side="left")
+    stop = np.searchsorted(x, hi, side="right")
+    if stop - start <= n_buckets:
+        return np.arange(start, stop)
+    span = (hi - lo) or 1.0
+    buckets = ((x[start:stop] - lo) / span * n_buckets).astype(np.int64)
+    first = np.r_[True, buckets[1:] != buckets[:-1]]
+    return start + np.flatnonzero(first)
+
+
+def finite_subset(x, y):
+    """去掉 y 中的 NaN / inf（没有时不复制）"""
+    ok = np.isfinite(y)
+    if ok.all():
+        return x, y
+    return x[ok], y[ok]
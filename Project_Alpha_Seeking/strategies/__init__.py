@@ -1,2 +1,3 @@
 from .buy_and_hold import BuyAndHoldStrategy
 from .vwap_channel import VWAPChannelStrategy
+from .mtf_vwap_channel import MTFVWAPChannelStrategy
@@ -4,8 +4,12 @@
 这个模块包含了不同类型的交易策略实现。
 """
 
+from collections import deque
+
 import backtrader as bt
 
+from indicators.timeframes import HigherTimeframe, index_from_datenums, infer_period
+
 class BaseStrategy(bt.Strategy):
     """
     通用基础策略类，封装资金管理、日志、订单、交易通知等常用功能。
@@ -13,7 +17,12 @@ class BaseStrategy(bt.Strategy):
     """
 
     params = ()
-    
+
+    # 市值历史只保留最近多少条，None 为全部保留；流式长历史回放时设为有限值使内存不随历史增长
+    value_history_maxlen = None
+
+    # 从断点续跑时由 backtest.checkpoint 设置：各慢周期伴随序列登记时解析出的快周期
+    restored_fast_periods = None
 
     def log(self, txt, dt=None):
         """标准化日志输出，可重载为写文件等"""
@@ -23,8 +32,13 @@ class BaseStrategy(bt.Strategy):
     def __init__(self):
         self.dataclose = self.datas[0].close
         self.order = None
-        self.value_history_dates = []
-        self.value_history_values = []
+        self.fast_periods = []
+        if self.value_history_maxlen is None:
+            self.value_history_dates = []
+            self.value_history_values = []
+        else:
+            self.value_history_dates = deque(maxlen=self.value_history_maxlen)
+            self.value_history_values = deque(maxlen=self.value_history_maxlen)
 
     def notify_order(self, order):
         if order.status in [order.Submitted, order.Accepted]:
@@ -52,6 +66,92 @@ class BaseStrategy(bt.Strategy):
         self.log(f"[买入] 价格={close_price:.2f}, 数量={size}")
         self.order = self.buy(size=size)
 
+    def add_higher_timeframe(self, slow, fast_period=None, slow_period=None, fast_index=None):
+        """
+        登记一个慢周期伴随序列，在子类 __init__ 中调用。
+        next 中用 htf.value(列名, len(self) - 1) 读取当前 bar 收盘时已经结束的慢周期 bar 的值。
+
+        Parameters:
+        -----------
+        slow : pd.DataFrame
+            慢周期数据，各列为已经向量化算好的指标
+        fast_period, slow_period : str or Timedelta
+            快 / 慢周期，为 None 时自动推断
+        fast_index : DatetimeIndex
+            快周期 bar 的时间；为 None 时取自预加载的主数据源（流式回放时须显式传入）
+
+        Returns:
+        --------
+        HigherTimeframe
+        """
+        if fast_index is None:
+            dt = self.datas[0].datetime
+            if len(dt.array) == 0:
+                raise ValueError("主数据源未预加载（preload=False），请显式传入 fast_index")
+            fast_index = index_from_datenums(dt.array)
+        if fast_period is None:
+            # 续跑时主数据源可能只有一根新 bar，无法推断周期，沿用断点中保存的值
+            restored = self.restored_fast_periods
+            fast_period = restored[len(self.fast_periods)] if restored else infer_period(fast_index)
+        self.fast_periods.append(fast_period)
+        return HigherTimeframe(slow, fast_index, fast_period, slow_period)
+
+    def stateless_indicators(self):
+        """没有实现 get_state / set_state 的指标（类名列表），存在时无法断点续跑"""
+        return [
+            type(ind).__name__ for ind in self.getindicators()
+            if not (hasattr(ind, "get_state") and hasattr(ind, "set_state"))
+        ]
+
+    def get_state(self):
+        """
+        策略自身的断点状态：市值历史、各指标的内部状态、最后一根 bar 上发出但尚未成交的订单。
+        账户资金与持仓由 backtest.checkpoint 负责。
+        任一指标不能保存内部状态时抛出 TypeError：续跑时它会从零预热，结果与完整重跑不一致。
+        """
+        stateless = self.stateless_indicators()
+        if stateless:
+            raise TypeError(f"指标未实现 get_state / set_state，无法保存断点: {stateless}")
+        order = self.order if self.order is not None and self.order.alive() else None
+        return {
+            "value_history_dates": list(self.value_history_dates),
+            "value_history_values": list(self.value_history_values),
+            "indicators": [ind.get_state() for ind in self.getindicators()],
+            "fast_periods": list(self.fast_periods),
+            "pending_order": None if order is None else {
+                "isbuy": order.isbuy(),
+                "size": abs(order.created.size),
+                "price": order.created.price,
+                "dt": order.created.dt,
+            },
+        }
+
+    def set_state(self, state):
+        """在 start() 中调用，恢复 get_state 保存的状态并重新提交未成交订单"""
+        self.value_history_dates.clear()
+        self.value_history_dates.extend(state["value_history_dates"])
+        self.value_history_values.clear()
+        self.value_history_values.extend(state["value_history_values"])
+        indicators = self.getindicators()
+        if len(indicators) != len(state["indicators"]) or any(s is None for s in state["indicators"]):
+            raise ValueError("断点中的指标状态与当前策略的指标不匹配，无法续跑")
+        for ind, ind_state in zip(indicators, state["indicators"]):
+            ind.set_state(ind_state)
+
+        pending = state["pending_order"]
+        if pending is not None:
+            # 此时还没有加载任何 bar，用 simulated 跳过构造时对当前 bar 的读取，
+            # 创建价、创建时间直接取自快照，随后恢复为普通订单以便正常撮合与通知
+            order_cls = bt.BuyOrder if pending["isbuy"] else bt.SellOrder
+            order = order_cls(owner=self, data=self.datas[0], size=pending["size"],
+                              price=pending["price"], exectype=bt.Order.Market, simulated=True)
+            order.p.simulated = False
+            order.created.dt = pending["dt"]
+            order.addcomminfo(self.broker.getcommissioninfo(self.datas[0]))
+            # 与 broker.buy / sell 相同的登记步骤
+            self.broker._ocoize(order, None)
+            self.order = self.broker.submit(order)
+
     def stop(self):
         """回测结束时输出最终市值和收益率"""
         portfolio_value = self.broker.getvalue()
@@ -0,0 +1,53 @@
+import pandas as pd
+
+from .base_strategy import BaseStrategy
+from indicators.vwap import vwap_channel
+
+
+def slow_vwap_bands(slow_data: pd.DataFrame, vwap_period=20, use_typical=True, std_dev_mult=2.0) -> pd.DataFrame:
+    """慢周期K线上一次性算出 VWAP 通道"""
+    vwap, upper, lower = vwap_channel(
+        slow_data["high"], slow_data["low"], slow_data["close"], slow_data["volume"],
+        period=vwap_period, use_typical=use_typical, std_dev_mult=std_dev_mult,
+    )
+    return pd.DataFrame({"vwap": vwap, "vwap_upper": upper, "vwap_lower": lower}, index=slow_data.index)
+
+
+class MTFVWAPChannelStrategy(BaseStrategy):
+    """
+    多周期 VWAP 通道策略，继承BaseStrategy：
+    在快周期（如 5 分钟线）上交易，通道取自慢周期（如日线）上已经结束的最后一根 bar
+    """
+    params = (
+        ('target_percent', 0.95),
+        ('slow_data', None),     # 慢周期K线 DataFrame，可用 indicators.resample_bars 生成
+        ('slow_period', None),   # 慢周期，None 时自动推断
+        ('fast_period', None),   # 快周期，None 时自动推断
+        ('vwap_period', 20),
+        ('use_typical', True),
+        ('std_dev_mult', 2.0),
+    )
+
+    def __init__(self):
+        super().__init__()
+        if self.p.slow_data is None:
+            raise ValueError("MTFVWAPChannelStrategy 需要传入慢周期数据 slow_data")
+        bands = slow_vwap_bands(self.p.slow_data, self.p.vwap_period, self.p.use_typical, self.p.std_dev_mult)
+        self.slow = self.add_higher_timeframe(bands, self.p.fast_period, self.p.slow_period)
+
+    def next(self):
+        if self.order:
+            return
+        bar = len(self) - 1
+        vwap_lower = self.slow.value("vwap_lower", bar)
+        vwap_upper = self.slow.value("vwap_upper", bar)
+        close = self.dataclose[0]
+        self.log(f"close={close:.2f}, vwap_lower={vwap_lower:.2f}, vwap_upper={vwap_upper:.2f}, position={self.position.size}")
+        if not self.position and close < vwap_lower:
+            self.buy_with_sizing()
+        elif self.position and close > vwap_upper:
+            self.log(f"[卖出] 慢周期VWAP上轨卖出: 价格={close:.2f}, VWAP上轨={vwap_upper:.2f}")
+            self.order = self.sell(size=self.position.size)
+        dt = self.data.datetime.date(0)
+        self.value_history_dates.append(dt)
+        self.value_history_values.append(self.broker.getvalue())
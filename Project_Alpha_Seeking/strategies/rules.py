@@ -0,0 +1,429 @@
+"""
+声明式交易信号规则。
+
+notebooks 中的策略函数（strategy_ma_volume 等）每次都 data.copy() 整张表，再用一连串
+.shift() 生成若干中间布尔列，只为得到 buy_signal / sell_signal 两列。这里把条件声明成
+惰性规则，由 RuleEngine 直接在原始列的 ndarray 上求值：
+
+    above = col("ma5") > col("ma10")
+    vol_below = col("vol") < col("vol_ma5")
+    buy = turned_true(above) & (col("vol") > col("vol_ma5") * 1.0)
+    sell = turned_false(above) | consecutive(vol_below, 3)
+    entries, exits = RuleEngine(data).signals(buy, sell)
+
+与 factors.expr 相同，规则按结构键（算子名 + 子节点键 + 参数）去重，一次求值多条规则
+（如一组参数变体，见 evaluate_variants）时共用的子条件只计算一次，不再被引用的中间结果立即释放。
+
+结果与 pandas 写法逐位一致，包括布尔列 shift 后的 NaN 语义：
+- shift 后开头的缺失值在 != 中为 True、== 中为 False；
+- & 中缺失值按 False 处理；| 中右侧缺失按 False，左侧缺失时结果为 False（pandas object 列的行为）；
+- 对含缺失值的布尔列取反（~）与 pandas 一样抛出 TypeError。
+"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+
+class Rule:
+    """
+    规则节点：op 为算子名，args 为子节点，params 为标量参数。
+    kind 为 "num"（数值序列）或 "bool"（条件）；missing 为布尔序列开头缺失值（shift 产生）的个数
+    """
+
+    __slots__ = ("op", "args", "params", "kind", "missing", "key")
+
+    def __init__(self, op: str, args: tuple = (), params: tuple = (), kind: str = "num", missing: int = 0):
+        self.op = op
+        self.args = args
+        self.params = params
+        self.kind = kind
+        self.missing = missing
+        self.key = (op, tuple(a.key for a in args), params)
+
+    def __repr__(self):
+        if self.op == "col":
+            return self.params[0]
+        if self.op == "const":
+            return repr(self.params[0])
+        inner = [repr(a) for a in self.args] + [repr(p) for p in self.params]
+        return f"{self.op}({', '.join(inner)})"
+
+    def __add__(self, other):
+        return _arith("add", self, other)
+
+    def __radd__(self, other):
+        return _arith("add", other, self)
+
+    def __sub__(self, other):
+        return _arith("sub", self, other)
+
+    def __rsub__(self, other):
+        return _arith("sub", other, self)
+
+    def __mul__(self, other):
+        return _arith("mul", self, other)
+
+    def __rmul__(self, other):
+        return _arith("mul", other, self)
+
+    def __truediv__(self, other):
+        return _arith("div", self, other)
+
+    def __rtruediv__(self, other):
+        return _arith("div", other, self)
+
+    def __gt__(self, other):
+        return _compare("gt", self, other)
+
+    def __lt__(self, other):
+        return _compare("lt", self, other)
+
+    def __ge__(self, other):
+        return _compare("ge", self, other)
+
+    def __le__(self, other):
+        return _compare("le", self, other)
+
+    def __and__(self, other):
+        return _logic("and", self, other)
+
+    def __or__(self, other):
+        return _logic("or", self, other)
+
+    def __invert__(self):
+        _require(self, "bool", "~")
+        return Rule("not", (self,), kind="bool")
+
+
+def _wrap(value) -> Rule:
+    return value if isinstance(value, Rule) else Rule("const", (), (float(value),))
+
+
+def _require(rule: Rule, kind: str, op: str):
+    if rule.kind != kind:
+        expected = "条件" if kind == "bool" else "数值序列"
+        raise TypeError(f"{op} 的操作数须为{expected}: {rule!r}")
+
+
+def _arith(op: str, a, b) -> Rule:
+    a, b = _wrap(a), _wrap(b)
+    _require(a, "num", op)
+    _require(b, "num", op)
+    return Rule(op, (a, b))
+
+
+def _compare(op: str, a, b) -> Rule:
+    a, b = _wrap(a), _wrap(b)
+    _require(a, "num", op)
+    _require(b, "num", op)
+    return Rule(op, (a, b), kind="bool")
+
+
+def _logic(op: str, a: Rule, b: Rule) -> Rule:
+    if not isinstance(b, Rule):
+        raise TypeError(f"{op} 的操作数须为条件: {b!r}")
+    _require(a, "bool", op)
+    _require(b, "bool", op)
+    return Rule(op, (a, b), kind="bool")
+
+
+def col(name: str) -> Rule:
+    """数据中的原始列，如 close / vol / ma5"""
+    return Rule("col", (), (name,))
+
+
+def shift(x: Rule, periods: int = 1) -> Rule:
+    """取 periods 根 bar 之前的值，等同 Series.shift(periods)；只允许向过去平移"""
+    periods = int(periods)
+    if periods < 1:
+        raise ValueError(f"shift 的 periods 须为正整数: {periods}")
+    missing = x.missing + periods if x.kind == "bool" else 0
+    return Rule("shift", (x,), (periods,), kind=x.kind, missing=missing)
+
+
+def eq(a, b) -> Rule:
+    """a == b（数值或条件）"""
+    return _equality("eq", a, b)
+
+
+def ne(a, b) -> Rule:
+    """a != b（数值或条件）"""
+    return _equality("ne", a, b)
+
+
+def _equality(op: str, a, b) -> Rule:
+    a, b = _wrap(a), _wrap(b)
+    if a.kind != b.kind:
+        raise TypeError(f"{op} 两侧须同为数值序列或同为条件: {a!r}, {b!r}")
+    return Rule(op, (a, b), kind="bool")
+
+
+def consecutive(cond: Rule, n: int) -> Rule:
+    """连续 n 根 bar 满足条件，等同 cond & cond.shift(1) & ... & cond.shift(n-1)"""
+    _require(cond, "bool", "consecutive")
+    n = int(n)
+    if n < 1:
+        raise ValueError(f"consecutive 的 n 须为正整数: {n}")
+    if n == 1:
+        return cond
+    return Rule("consecutive", (cond,), (n,), kind="bool")
+
+
+def turned_true(cond: Rule) -> Rule:
+    """条件由不满足变为满足（如金叉），等同 (cond != cond.shift(1)) & cond"""
+    return ne(cond, shift(cond)) & cond
+
+
+def turned_false(cond: Rule) -> Rule:
+    """条件由满足变为不满足（如死叉），等同 (cond != cond.shift(1)) & ~cond"""
+    return ne(cond, shift(cond)) & ~cond
+
+
+def crossed_above(a, b) -> Rule:
+    """a 上穿 b，等同 (a > b) & (a.shift(1) <= b.shift(1))"""
+    a, b = _wrap(a), _wrap(b)
+    return (a > b) & (shift(a) <= shift(b))
+
+
+def crossed_below(a, b) -> Rule:
+    """a 下穿 b，等同 (a < b) & (a.shift(1) >= b.shift(1))"""
+    a, b = _wrap(a), _wrap(b)
+    return (a < b) & (shift(a) >= shift(b))
+
+
+# ----------------------------------------------------------------------
+# 求值
+# ----------------------------------------------------------------------
+
+def _shift(x, periods: int, kind: str):
+    # 布尔序列开头的缺失值按 False 存放，缺失个数由节点的 missing 静态记录
+    out = np.full_like(x, np.nan if kind == "num" else False)
+    if periods < len(x):
+        out[periods:] = x[:len(x) - periods]
+    return out
+
+
+def _consecutive(x, n: int):
+    out = x.copy()
+    for k in range(1, n):
+        out[k:] &= x[:-k]
+    out[:n - 1] = False
+    return out
+
+
+_ARITH = {"add": np.add, "sub": np.subtract, "mul": np.multiply, "div": np.divide}
+_COMPARE = {"gt": np.greater, "lt": np.less, "ge": np.greater_equal, "le": np.less_equal}
+# 可以写回第一个操作数数组的逐元素逻辑运算
+_IN_PLACE = ("and", "or", "not")
+
+
+class RuleEngine:
+    """
+    在单个品种的K线数据上求值规则。
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        K线及指标列（如 notebooks 中 calculate_indicators 的输出）；只读取规则用到的列，不复制整表
+    """
+
+    def __init__(self, data: pd.DataFrame):
+        self.data = data
+        self._columns = {}
+        self._memo = {}
+
+    def clear(self):
+        """清空跨调用保留的规则结果"""
+        self._memo.clear()
+
+    def column(self, name: str) -> np.ndarray:
+        values = self._columns.get(name)
+        if values is None:
+            if name not in self.data.columns:
+                raise KeyError(f"数据中没有列: {name}")
+            # float64 列直接返回底层数组的视图
+            values = self.data[name].to_numpy(dtype=float)
+            self._columns[name] = values
+        return values
+
+    def evaluate(self, rules: dict, keep: bool = True) -> dict:
+        """
+        求值一组规则。
+
+        Parameters:
+        -----------
+        rules : dict
+            名称 -> Rule
+        keep : bool
+            是否保留本次请求的规则结果，供后续 evaluate 直接复用
+
+        Returns:
+        --------
+        dict
+            名称 -> ndarray（条件为 bool 数组，数值为 float 数组）
+        """
+        roots = {rule.key for rule in rules.values()}
+        order, refcount = self._plan(rules.values())
+
+        values = {}
+        for rule in order:
+            if rule.key in self._memo:
+                values[rule.key] = self._memo[rule.key]
+                continue
+            # 逻辑运算的第一个子节点此后不再被引用时，直接在它的数组上原地计算
+            first = rule.args[0] if rule.op in _IN_PLACE else None
+            reuse = (
+                first is not None and refcount[first.key] == 1
+                and first.key not in roots and first.key not in self._memo
+            )
+            values[rule.key] = self._compute(rule, values, reuse)
+            for child in rule.args:
+                refcount[child.key] -= 1
+                if refcount[child.key] == 0 and child.key not in roots:
+                    values.pop(child.key, None)
+
+        if keep:
+            for key in roots:
+                self._memo[key] = values[key]
+        return {name: values[rule.key] for name, rule in rules.items()}
+
+    def signals(self, buy: Rule, sell: Rule):
+        """(entries, exits) 两个布尔数组，与 backtest.signals 中各函数的返回值相同"""
+        out = self.evaluate({"buy": buy, "sell": sell}, keep=False)
+        return out["buy"], out["sell"]
+
+    def _plan(self, rules):
+        """后序遍历得到去重后的求值顺序，并统计每个节点被多少个父节点引用"""
+        order, seen, refcount = [], set(), {}
+        stack = [(rule, False) for rule in rules]
+        while stack:
+            rule, expanded = stack.pop()
+            if expanded:
+                order.append(rule)
+                continue
+            if rule.key in seen:
+                continue
+            seen.add(rule.key)
+            stack.append((rule, True))
+            if rule.key not in self._memo:
+                for child in rule.args:
+                    refcount[child.key] = refcount.get(child.key, 0) + 1
+                    stack.append((child, False))
+        return order, refcount
+
+    def _compute(self, rule: Rule, values: dict, reuse: bool):
+        op = rule.op
+        if op == "col":
+            return self.column(rule.params[0])
+        if op == "const":
+            return rule.params[0]
+        args = [values[child.key] for child in rule.args]
+        out = args[0] if reuse else None
+        if op in _ARITH:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return _ARITH[op](*args)
+        if op in _COMPARE:
+            return _COMPARE[op](*args)
+        if op == "shift":
+            return _shift(args[0], rule.params[0], rule.kind)
+        if op in ("eq", "ne"):
+            result = np.equal(*args) if op == "eq" else np.not_equal(*args)
+            # NaN == x 为 False、NaN != x 为 True
+            head = max(child.missing for child in rule.args)
+            result[:head] = op == "ne"
+            return result
+        if op == "and":
+            return np.logical_and(*args, out=out)
+        if op == "or":
+            result = np.logical_or(*args, out=out)
+            result[:rule.args[0].missing] = False
+            return result
+        if op == "not":
+            if rule.args[0].missing and len(args[0]):
+                raise TypeError(f"不能对含缺失值（shift 产生）的条件取反: {rule.args[0]!r}")
+            return np.logical_not(args[0], out=out)
+        if op == "consecutive":
+            return _consecutive(args[0], rule.params[0])
+        raise ValueError(f"未知算子: {op}")
+
+
+def evaluate_variants(data: pd.DataFrame, builder, grid: dict) -> list:
+    """
+    一次求值一组参数变体的买卖规则，各变体共用的子条件只计算一次。
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        K线及指标列
+    builder : callable
+        builder(**params) -> (buy_rule, sell_rule)，如 ma_volume_rules
+    grid : dict
+        参数名 -> 取值列表，取笛卡尔积
+
+    Returns:
+    --------
+    list
+        [(params, entries, exits), ...]，顺序与参数组合的展开顺序相同
+    """
+    combos = [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+    rules = {}
+    for i, params in enumerate(combos):
+        rules[(i, "buy")], rules[(i, "sell")] = builder(**params)
+    out = RuleEngine(data).evaluate(rules, keep=False)
+    return [(params, out[(i, "buy")], out[(i, "sell")]) for i, params in enumerate(combos)]
+
+
+def rule_strategy(buy: Rule, sell: Rule):
+    """
+    包装成 notebooks 中 backtest(data, strategy_func) 所需的策略函数：
+    返回附加 buy_signal / sell_signal 两列的表（不再生成中间列）
+    """
+    def strategy(data: pd.DataFrame) -> pd.DataFrame:
+        entries, exits = RuleEngine(data).signals(buy, sell)
+        return data.assign(buy_signal=entries, sell_signal=exits)
+    return strategy
+
+
+# ----------------------------------------------------------------------
+# notebooks/1_Initial_Strategies.ipynb 中的三个策略
+# ----------------------------------------------------------------------
+
+def ma_volume_rules(fast: str = "ma5", slow: str = "ma10", vol_ma: str = "vol_ma5", vol_mult: float = 1.0, shrink_days: int = 3):
+    """
+    MA金叉/死叉 + 成交量确认（strategy_ma_volume）
+
+    买入：fast 上穿 slow，且成交量大于 vol_ma 的 vol_mult 倍
+    卖出：fast 下穿 slow，或连续 shrink_days 天成交量低于 vol_ma
+    """
+    above = col(fast) > col(slow)
+    vol, avg = col("vol"), col(vol_ma)
+    buy = turned_true(above) & (vol > avg * vol_mult)
+    sell = turned_false(above) | consecutive(vol < avg, shrink_days)
+    return buy, sell
+
+
+def obv_ma_rules(price_ma: str = "ma20", obv_ma: str = "obv_ma10"):
+    """
+    OBV + MA（strategy_obv_ma）
+
+    买入：收盘价站上 price_ma 且 OBV 大于 obv_ma
+    卖出：收盘价跌破 price_ma 或 OBV 跌破 obv_ma
+    """
+    price_up = col("close") > col(price_ma)
+    obv_up = col("obv") > col(obv_ma)
+    return price_up & obv_up, ~price_up | ~obv_up
+
+
+def volume_ratio_breakout_rules(ratio: float = 2.0, breakout_ma: str = "ma60", exit_ma: str = "ma10", vol_ma: str = "vol_ma5", shrink_days: int = 3):
+    """
+    量比突增 + 价格突破（strategy_volume_ratio_breakout）
+
+    买入：量比大于 ratio 且收盘价上穿 breakout_ma
+    卖出：收盘价跌破 exit_ma，或连续 shrink_days 天成交量低于 vol_ma
+    """
+    close = col("close")
+    buy = (col("vol_ratio") > ratio) & crossed_above(close, col(breakout_ma))
+    sell = (close < col(exit_ma)) | consecutive(col("vol") < col(vol_ma), shrink_days)
+    return buy, sell
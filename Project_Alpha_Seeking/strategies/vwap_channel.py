@@ -13,6 +13,7 @@ class VWAPChannelStrategy(BaseStrategy):
         ('reset_daily', False),
         ('use_typical', True),
         ('std_dev_mult', 2.0),
+        ('use_notional', False),
     )
 
     def __init__(self):
@@ -22,7 +23,8 @@ class VWAPChannelStrategy(BaseStrategy):
             period=self.p.vwap_period,
             reset_daily=self.p.reset_daily,
             use_typical=self.p.use_typical,
-            std_dev_mult=self.p.std_dev_mult
+            std_dev_mult=self.p.std_dev_mult,
+            use_notional=self.p.use_notional,
         )
 
     def next(self):